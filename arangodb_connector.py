@@ -1,199 +1,530 @@
 import time
+import threading
+import aiohttp
 from arango import ArangoClient
+from arango.exceptions import AQLCacheClearError
+from arango.http import DefaultHTTPClient
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from tracing import span
+from connector_base import BaseConnector, ResultSink
+from result_digest import ResultDigest
 
-# Variabili globali per mantenere la connessione
-_client = None
-_database = None
+# Connector usato dalle funzioni a livello di modulo (connect_arangodb, close_arangodb, ...)
+_default_connector = None
 
-def connect_arangodb(host, port, username, password, database_name):
+# Sessione HTTP asincrona verso l'API REST di ArangoDB (load generator open-loop)
+_async_session = None
+_async_base_url = None
+
+class PooledHTTPClient(DefaultHTTPClient):
+    """
+    Client HTTP di python-arango con pool di connessioni keep-alive configurabile.
+
+    La sessione usa un HTTPAdapter di requests con pool_maxsize=pool_size e
+    pool_block=True (retry della libreria, request_timeout su ogni richiesta): le
+    richieste oltre pool_size attendono una connessione libera. requests non limita
+    questa attesa, quindi un semaforo di pool_size permessi la limita a pool_timeout
+    secondi, poi la richiesta fallisce con TimeoutError; con pool_timeout=None il pool
+    non è bloccante e apre connessioni extra che non vengono riusate.
+
+    Con keep_alive=False ogni richiesta chiude la propria connessione (Connection: close),
+    quindi ogni batch del cursore paga un nuovo handshake TCP. compression="gzip" chiede
+    risposte compresse (Accept-Encoding: gzip), altrimenti si chiede "identity"; il server
+    comprime solo oltre --http.compress-response-threshold.
+    """
+
+    def __init__(self, pool_size=10, pool_timeout=None, request_timeout=60, keep_alive=True, compression=None):
+        super().__init__(request_timeout=request_timeout, pool_maxsize=pool_size, pool_timeout=pool_timeout)
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.keep_alive = keep_alive
+        self.compression = compression
+        self._slots = threading.BoundedSemaphore(pool_size) if pool_timeout is not None else None
+
+    def create_session(self, host):
+        session = super().create_session(host)
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_timeout is not None,
+            max_retries=session.get_adapter(host).max_retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def send_request(self, session, method, url, headers=None, params=None, data=None, auth=None):
+        # requests chiede "gzip, deflate" per default: l'header va sempre fissato esplicitamente
+        headers = {**(headers or {}), 'Accept-Encoding': self.compression or 'identity'}
+        if not self.keep_alive:
+            headers['Connection'] = 'close'
+        if self._slots is None:
+            return super().send_request(session, method=method, url=url, headers=headers,
+                                        params=params, data=data, auth=auth)
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise TimeoutError(f"Nessuna connessione libera nel pool HTTP di ArangoDB entro {self.pool_timeout} s")
+        try:
+            return super().send_request(session, method=method, url=url, headers=headers,
+                                        params=params, data=data, auth=auth)
+        finally:
+            self._slots.release()
+
+
+class ArangoDBConnector(BaseConnector):
+    """
+    Connector ArangoDB basato su un'istanza di ArangoClient con il proprio pool HTTP.
+
+    python-arango usa una sessione requests thread-safe: più thread possono usare la
+    stessa istanza con fino a pool_config.size richieste in volo.
+    """
+
+    dbms_type = "arangodb"
+
+    def __init__(self, host, port, username, password, database_name, pool_config=None, transport_options=None):
+        """
+        Args:
+            host (str): Host di ArangoDB (es. "localhost")
+            port (int): Porta di ArangoDB (es. 8529)
+            username (str): Username per l'autenticazione
+            password (str): Password per l'autenticazione
+            database_name (str): Nome del database
+            pool_config (PoolConfig): configurazione del pool (opzionale)
+            transport_options (dict): opzioni HTTP di PooledHTTPClient
+                (keep_alive, compression, request_timeout)
+        """
+        super().__init__(pool_config)
+        self.hosts = f'http://{host}:{port}'
+        self.username = username
+        self.password = password
+        self.database_name = database_name
+        self.transport_options = dict(transport_options or {})
+        self._client = None
+        self._database = None
+
+    @property
+    def is_connected(self):
+        return self._database is not None
+
+    @property
+    def database(self):
+        return self._database
+
+    def connect(self):
+        """
+        Crea il client con il pool HTTP, verifica la connessione ed esegue il prewarm.
+
+        acquire_timeout_s diventa il pool_timeout di PooledHTTPClient. idle_timeout_s non ha
+        equivalente in urllib3: le connessioni inattive restano nel pool finché il server
+        non le chiude (keep-alive timeout di arangod) e vengono riaperte alla richiesta successiva.
+
+        Returns:
+            bool: True se la connessione è riuscita
+        """
+        pool = self.pool_config
+        http_client = PooledHTTPClient(pool_size=pool.size, pool_timeout=pool.acquire_timeout_s,
+                                       **self.transport_options)
+        with span("driver construction", "arangodb"):
+            self._client = ArangoClient(hosts=self.hosts, http_client=http_client)
+            self._database = self._client.db(self.database_name, username=self.username, password=self.password)
+        # Test della connessione
+        with span("properties", "arangodb"):
+            self._database.properties()
+        if pool.prewarm:
+            self._prewarm(min(pool.prewarm, pool.size))
+        print(f"Connessione ad ArangoDB stabilita: {self.database_name}")
+        return True
+
+    def _prewarm(self, connections):
+        # N richieste concorrenti aprono N connessioni keep-alive, che restano nel pool
+        with span("prewarm", "arangodb", connections=connections):
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(lambda _: self._database.properties(), range(connections)))
+
+    def close(self):
+        """Chiude il client e le connessioni del pool HTTP"""
+        if self._client is not None:
+            with span("close", "arangodb"):
+                self._client.close()
+            self._client = None
+            self._database = None
+            print("Connessione ad ArangoDB chiusa")
+
+    def _require_database(self):
+        if self._database is None:
+            raise Exception("Connessione non stabilita. Chiamare connect() prima")
+        return self._database
+
+    def execute(self, query, bind_vars=None, server_timing=False, digest=False, consume="materialize",
+                spill_dir=None, batch_size=None, stream=False):
+        """
+        Esegue una query AQL su ArangoDB e restituisce i risultati con informazioni sui tempi
+        Args:
+            query (str): Query AQL da eseguire
+            bind_vars (dict): Variabili di bind per la query (opzionale)
+            server_timing (bool): Esegue con profile=True e aggiunge il tempo server-side
+                (executionTime delle statistiche) e il profilo per fase della stessa esecuzione
+            digest (bool): Calcola durante il fetch il digest del risultato (result_digest)
+            consume (str): 'materialize', 'count', 'count_bytes' o 'spill' (vedi connector_base.CONSUME_MODES);
+                con count/count_bytes/spill documents è vuota e la memoria resta costante
+            spill_dir (str): cartella del file temporaneo in modalità spill
+            batch_size (int): documenti per batch del cursore; default del server se None
+            stream (bool): cursore streaming (risultati prodotti on-demand invece che
+                calcolati interamente prima del primo batch)
+        Returns:
+            dict: Dizionario contenente risultati, tempi di esecuzione e statistiche
+        """
+        database = self._require_database()
+
+        start_time = time.perf_counter()
+        with span("execute", "arangodb"):
+            cursor = database.aql.execute(query, bind_vars=bind_vars or {}, profile=server_timing,
+                                          batch_size=batch_size, stream=stream)
+        # Consuma un batch per round-trip (POST /_api/cursor, poi una fetch per batch)
+        sink = ResultSink(consume, spill_dir)
+        first_row_time = None
+        round_trips = 1
+        result_digest = ResultDigest() if digest else None
+        try:
+            with span("fetch", "arangodb") as span_args:
+                while True:
+                    batch = cursor.batch()
+                    if batch and first_row_time is None:
+                        first_row_time = time.perf_counter()
+                    sink.extend(batch)
+                    if result_digest is not None:
+                        for doc in batch:
+                            result_digest.update(doc)
+                    batch.clear()
+                    if not cursor.has_more():
+                        break
+                    cursor.fetch()
+                    round_trips += 1
+                span_args["rows"] = sink.row_count
+                span_args["round_trips"] = round_trips
+        finally:
+            sink.close()
+        end_time = time.perf_counter()
+        total_time = (end_time - start_time) * 1000  # in millisecondi
+
+        server_times = {}
+        if server_timing:
+            # Statistiche e profilo arrivano con l'ultimo batch
+            execution_time = (cursor.statistics() or {}).get('execution_time')
+            server_times = {
+                'server_time_ms': execution_time * 1000 if execution_time is not None else None,
+                'server_profile': cursor.profile(),
+            }
+
+        # Serializza i risultati
+        with span("serialize", "arangodb", rows=len(sink.rows)):
+            serializable_results = []
+            for doc in sink.rows:
+                if isinstance(doc, dict):
+                    serializable_doc = {}
+                    for key, value in doc.items():
+                        serializable_doc[key] = str(value) if not isinstance(value, (str, int, float, bool, list, dict, type(None))) else value
+                    serializable_results.append(serializable_doc)
+                else:
+                    serializable_results.append(str(doc))
+
+        return {
+            'documents': serializable_results,
+            'total_documents': sink.row_count,
+            'execution_time_ms': total_time,
+            'time_to_first_row_ms': ((first_row_time or end_time) - start_time) * 1000,
+            'time_to_last_row_ms': total_time,
+            'fetch_round_trips': round_trips,
+            'rows_per_round_trip': sink.row_count / round_trips,
+            **sink.metrics(),
+            **server_times,
+            **({'result_digest': result_digest.hexdigest()} if result_digest is not None else {}),
+            'query': query,
+            'bind_vars': bind_vars,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def clear_caches(self):
+        """
+        Svuota la cache dei risultati AQL e, su ArangoDB >= 3.12, la cache dei piani.
+        La block cache di RocksDB non ha un comando equivalente: serve un riavvio.
+        """
+        query_cache = self._require_database().aql.cache
+        query_cache.clear()
+        levels = ["arangodb_query_results_cache"]
+        if hasattr(query_cache, 'clear_plan'):
+            try:
+                query_cache.clear_plan()
+                levels.append("arangodb_plan_cache")
+            except AQLCacheClearError:
+                # Server senza plan cache (< 3.12)
+                pass
+        return levels
+
+    def stream(self, query, parameters=None, **options):
+        """
+        Esegue una query AQL e restituisce i documenti uno alla volta: i batch
+        successivi vengono richiesti al server durante l'iterazione.
+        """
+        database = self._require_database()
+        with database.aql.execute(query, bind_vars=parameters or {}, **options) as cursor:
+            yield from cursor
+
+    def execute_with_profile(self, query, bind_vars=None):
+        """
+        Esegue una query AQL con profiling per ottenere statistiche dettagliate
+        Args:
+            query (str): Query AQL da eseguire
+            bind_vars (dict): Variabili di bind per la query (opzionale)
+        Returns:
+            dict: Dizionario con risultati e informazioni di profiling
+        """
+        database = self._require_database()
+
+        start_time = time.time()
+        cursor = database.aql.execute(query, bind_vars=bind_vars or {}, profile=True)
+        results = list(cursor)
+        profile_info = cursor.profile()
+        end_time = time.time()
+        total_time = (end_time - start_time) * 1000
+
+        return {
+            'documents': results,
+            'total_documents': len(results),
+            'execution_time_ms': total_time,
+            'profile_info': profile_info,
+            'query': query,
+            'bind_vars': bind_vars,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def benchmark_query(self, query, bind_vars=None, iterations=5):
+        """
+        Esegue una query ArangoDB multiple volte per ottenere statistiche di benchmark
+        Args:
+            query (str): Query AQL da testare
+            bind_vars (dict): Variabili di bind per la query
+            iterations (int): Numero di iterazioni
+        Returns:
+            dict: Statistiche aggregate del benchmark
+        """
+        results = []
+        for i in range(iterations):
+            result = self.execute(query, bind_vars)
+            results.append(result['execution_time_ms'])
+
+        return {
+            'query': query,
+            'bind_vars': bind_vars,
+            'iterations': len(results),
+            'avg_time_ms': sum(results) / len(results),
+            'min_time_ms': min(results),
+            'max_time_ms': max(results),
+            'all_times_ms': results,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def get_stats(self):
+        """
+        Ottiene statistiche generali del database ArangoDB
+        Returns:
+            dict: Statistiche del database
+        """
+        if self._database is None:
+            return {'error': 'Connessione non stabilita'}
+        database = self._database
+
+        db_properties = database.properties()
+        collections = database.collections()
+        stats = {
+            'database_name': db_properties.get('name'),
+            'collections': [col['name'] for col in collections],
+            'collection_counts': {},
+            'database_properties': db_properties
+        }
+        for collection_info in collections:
+            collection_name = collection_info['name']
+            if not collection_name.startswith('_'):
+                count_query = f"RETURN LENGTH({collection_name})"
+                result = self.execute(count_query)
+                if result['documents']:
+                    stats['collection_counts'][collection_name] = result['documents'][0]
+                else:
+                    stats['collection_counts'][collection_name] = 0
+        return stats
+
+    def document_operation_with_timing(self, collection_name, operation, document_key=None, document_data=None):
+        """
+        Esegue operazioni CRUD sui documenti con timing
+        Args:
+            collection_name (str): Nome della collection
+            operation (str): Tipo di operazione ('insert', 'get', 'update', 'delete')
+            document_key (str): Chiave del documento (per get, update, delete)
+            document_data (dict): Dati del documento (per insert, update)
+        Returns:
+            dict: Risultato dell'operazione con timing
+        """
+        database = self._require_database()
+
+        start_time = time.time()
+        collection = database.collection(collection_name)
+
+        if operation == 'insert':
+            result = collection.insert(document_data)
+        elif operation == 'get':
+            result = collection.get(document_key)
+        elif operation == 'update':
+            result = collection.update({'_key': document_key}, document_data)
+        elif operation == 'delete':
+            result = collection.delete(document_key)
+        else:
+            raise ValueError(f"Operazione non supportata: {operation}")
+
+        end_time = time.time()
+        total_time = (end_time - start_time) * 1000
+
+        return {
+            'result': result,
+            'operation': operation,
+            'collection': collection_name,
+            'execution_time_ms': total_time,
+            'timestamp': datetime.now().isoformat()
+        }
+
+def _require_default_connector():
+    if _default_connector is None:
+        raise Exception("Connessione non stabilita. Chiamare connect_arangodb() prima")
+    return _default_connector
+
+def connect_arangodb(host, port, username, password, database_name, pool_config=None, transport_options=None):
     """
-    Stabilisce la connessione ad ArangoDB
+    Stabilisce la connessione ad ArangoDB tramite il connector di default del modulo
     Args:
         host (str): Host di ArangoDB (es. "localhost")
         port (int): Porta di ArangoDB (es. 8529)
         username (str): Username per l'autenticazione
         password (str): Password per l'autenticazione
         database_name (str): Nome del database
+        pool_config (PoolConfig): configurazione del pool (opzionale)
+        transport_options (dict): opzioni HTTP (vedi ArangoDBConnector)
     Returns:
         bool: True se la connessione è riuscita, False altrimenti
     """
-    global _client, _database
-    _client = ArangoClient(hosts=f'http://{host}:{port}')
-    _database = _client.db(database_name, username=username, password=password)
-    # Test della connessione
-    _database.properties()
-    print(f"Connessione ad ArangoDB stabilita: {database_name}")
-    return True
+    global _default_connector
+    _default_connector = ArangoDBConnector(host, port, username, password, database_name, pool_config, transport_options)
+    return _default_connector.connect()
 
 def close_arangodb():
     """Chiude la connessione al database ArangoDB"""
-    global _client, _database
-    if _client is not None:
-        _client = None
-        _database = None
-        print("Connessione ad ArangoDB chiusa")
+    global _default_connector
+    if _default_connector is not None:
+        _default_connector.close()
+        _default_connector = None
 
-def execute_arangodb_aql_with_timing(query, bind_vars=None):
-    """
-    Esegue una query AQL su ArangoDB e restituisce i risultati con informazioni sui tempi
-    Args:
-        query (str): Query AQL da eseguire
-        bind_vars (dict): Variabili di bind per la query (opzionale)
-    Returns:
-        dict: Dizionario contenente risultati, tempi di esecuzione e statistiche
-    """
-    global _database
-    if _database is None:
-        raise Exception("Connessione non stabilita. Chiamare connect_arangodb() prima")
+def get_default_connector():
+    """Restituisce il connector aperto da connect_arangodb() (None se non connesso)"""
+    return _default_connector
 
-    start_time = time.time()
-    cursor = _database.aql.execute(query, bind_vars=bind_vars or {})
-    results = list(cursor)
-    end_time = time.time()
-    total_time = (end_time - start_time) * 1000  # in millisecondi
+def clear_arangodb_caches():
+    """Vedi ArangoDBConnector.clear_caches"""
+    return _require_default_connector().clear_caches()
 
-    # Serializza i risultati
-    serializable_results = []
-    for doc in results:
-        if isinstance(doc, dict):
-            serializable_doc = {}
-            for key, value in doc.items():
-                serializable_doc[key] = str(value) if not isinstance(value, (str, int, float, bool, list, dict, type(None))) else value
-            serializable_results.append(serializable_doc)
-        else:
-            serializable_results.append(str(doc))
-
-    return {
-        'documents': serializable_results,
-        'total_documents': len(serializable_results),
-        'execution_time_ms': total_time,
-        'query': query,
-        'bind_vars': bind_vars,
-        'timestamp': datetime.now().isoformat()
-    }
+def execute_arangodb_aql_with_timing(query, bind_vars=None, **options):
+    """Esegue una query AQL sul connector di default (opzioni: vedi ArangoDBConnector.execute)"""
+    return _require_default_connector().execute(query, bind_vars, **options)
 
 def execute_arangodb_aql_with_profile(query, bind_vars=None):
-    """
-    Esegue una query AQL con profiling per ottenere statistiche dettagliate
-    Args:
-        query (str): Query AQL da eseguire
-        bind_vars (dict): Variabili di bind per la query (opzionale)
-    Returns:
-        dict: Dizionario con risultati e informazioni di profiling
-    """
-    global _database
-    if _database is None:
-        raise Exception("Connessione non stabilita. Chiamare connect_arangodb() prima")
+    """Vedi ArangoDBConnector.execute_with_profile"""
+    return _require_default_connector().execute_with_profile(query, bind_vars)
 
-    start_time = time.time()
-    cursor = _database.aql.execute(query, bind_vars=bind_vars or {}, profile=True)
-    results = list(cursor)
-    profile_info = cursor.profile
-    end_time = time.time()
-    total_time = (end_time - start_time) * 1000
+def benchmark_arangodb_query(query, bind_vars=None, iterations=5):
+    """Vedi ArangoDBConnector.benchmark_query"""
+    return _require_default_connector().benchmark_query(query, bind_vars, iterations)
 
-    return {
-        'documents': results,
-        'total_documents': len(results),
-        'execution_time_ms': total_time,
-        'profile_info': profile_info,
-        'query': query,
-        'bind_vars': bind_vars,
-        'timestamp': datetime.now().isoformat()
-    }
+def get_arangodb_stats():
+    """Vedi ArangoDBConnector.get_stats"""
+    if _default_connector is None:
+        return {'error': 'Connessione non stabilita'}
+    return _default_connector.get_stats()
 
-def benchmark_arangodb_query(query, bind_vars=None, iterations=5):
-    """
-    Esegue una query ArangoDB multiple volte per ottenere statistiche di benchmark
-    Args:
-        query (str): Query AQL da testare
-        bind_vars (dict): Variabili di bind per la query
-        iterations (int): Numero di iterazioni
-    Returns:
-        dict: Statistiche aggregate del benchmark
-    """
-    results = []
-    for i in range(iterations):
-        result = execute_arangodb_aql_with_timing(query, bind_vars)
-        results.append(result['execution_time_ms'])
+def execute_arangodb_document_operation_with_timing(collection_name, operation, document_key=None, document_data=None):
+    """Vedi ArangoDBConnector.document_operation_with_timing"""
+    return _require_default_connector().document_operation_with_timing(
+        collection_name, operation, document_key, document_data)
 
-    return {
-        'query': query,
-        'bind_vars': bind_vars,
-        'iterations': len(results),
-        'avg_time_ms': sum(results) / len(results),
-        'min_time_ms': min(results),
-        'max_time_ms': max(results),
-        'all_times_ms': results,
-        'timestamp': datetime.now().isoformat()
-    }
 
-def get_arangodb_stats():
+async def connect_arangodb_async(host, port, username, password, database_name):
     """
-    Ottiene statistiche generali del database ArangoDB
+    Stabilisce la connessione asincrona ad ArangoDB tramite l'API HTTP (aiohttp)
+    Args:
+        host (str): Host di ArangoDB (es. "localhost")
+        port (int): Porta di ArangoDB (es. 8529)
+        username (str): Username per l'autenticazione
+        password (str): Password per l'autenticazione
+        database_name (str): Nome del database
     Returns:
-        dict: Statistiche del database
+        bool: True se la connessione è riuscita
     """
-    global _database
-    if _database is None:
-        return {'error': 'Connessione non stabilita'}
+    global _async_session, _async_base_url
+    _async_session = aiohttp.ClientSession(auth=aiohttp.BasicAuth(username, password))
+    _async_base_url = f"http://{host}:{port}/_db/{database_name}"
+    # Test della connessione
+    async with _async_session.get(f"{_async_base_url}/_api/database/current") as response:
+        response.raise_for_status()
+    print(f"Connessione asincrona ad ArangoDB stabilita: {database_name}")
+    return True
 
-    db_properties = _database.properties()
-    collections = _database.collections()
-    stats = {
-        'database_name': db_properties.get('name'),
-        'collections': [col['name'] for col in collections],
-        'collection_counts': {},
-        'database_properties': db_properties
-    }
-    for collection_info in collections:
-        collection_name = collection_info['name']
-        if not collection_name.startswith('_'):
-            count_query = f"RETURN LENGTH({collection_name})"
-            result = execute_arangodb_aql_with_timing(count_query)
-            if result['documents']:
-                stats['collection_counts'][collection_name] = result['documents'][0]
-            else:
-                stats['collection_counts'][collection_name] = 0
-    return stats
+async def close_arangodb_async():
+    """Chiude la sessione HTTP asincrona verso ArangoDB"""
+    global _async_session, _async_base_url
+    if _async_session is not None:
+        await _async_session.close()
+        _async_session = None
+        _async_base_url = None
+        print("Connessione asincrona ad ArangoDB chiusa")
 
-def execute_arangodb_document_operation_with_timing(collection_name, operation, document_key=None, document_data=None):
+async def execute_arangodb_aql_async(query, bind_vars=None):
     """
-    Esegue operazioni CRUD sui documenti con timing
+    Variante asincrona di execute_arangodb_aql_with_timing: usa l'endpoint
+    /_api/cursor e segue i batch successivi finché hasMore è vero.
     Args:
-        collection_name (str): Nome della collection
-        operation (str): Tipo di operazione ('insert', 'get', 'update', 'delete')
-        document_key (str): Chiave del documento (per get, update, delete)
-        document_data (dict): Dati del documento (per insert, update)
+        query (str): Query AQL da eseguire
+        bind_vars (dict): Variabili di bind per la query (opzionale)
     Returns:
-        dict: Risultato dell'operazione con timing
+        dict: Dizionario contenente numero di documenti e tempi di esecuzione
     """
-    global _database
-    if _database is None:
-        raise Exception("Connessione non stabilita. Chiamare connect_arangodb() prima")
-
-    start_time = time.time()
-    collection = _database.collection(collection_name)
-
-    if operation == 'insert':
-        result = collection.insert(document_data)
-    elif operation == 'get':
-        result = collection.get(document_key)
-    elif operation == 'update':
-        result = collection.update({'_key': document_key}, document_data)
-    elif operation == 'delete':
-        result = collection.delete(document_key)
-    else:
-        raise ValueError(f"Operazione non supportata: {operation}")
+    global _async_session, _async_base_url
+    if _async_session is None:
+        raise Exception("Connessione non stabilita. Chiamare connect_arangodb_async() prima")
 
-    end_time = time.time()
-    total_time = (end_time - start_time) * 1000
+    start_time = time.perf_counter()
+    async with _async_session.post(
+        f"{_async_base_url}/_api/cursor",
+        json={"query": query, "bindVars": bind_vars or {}}
+    ) as response:
+        response.raise_for_status()
+        body = await response.json()
+    total_documents = len(body.get("result", []))
+    try:
+        while body.get("hasMore"):
+            # POST /_api/cursor/{id}: PUT è deprecato da ArangoDB 3.11
+            async with _async_session.post(f"{_async_base_url}/_api/cursor/{body['id']}") as response:
+                response.raise_for_status()
+                body = await response.json()
+            total_documents += len(body.get("result", []))
+    finally:
+        # Un cursore interrotto (errore, cancellazione del task) resterebbe aperto sul server fino al TTL
+        if body.get("hasMore"):
+            async with _async_session.delete(f"{_async_base_url}/_api/cursor/{body['id']}"):
+                pass
+    end_time = time.perf_counter()
+    total_time = (end_time - start_time) * 1000  # in millisecondi
 
     return {
-        'result': result,
-        'operation': operation,
-        'collection': collection_name,
+        'total_documents': total_documents,
         'execution_time_ms': total_time,
+        'query': query,
+        'bind_vars': bind_vars,
         'timestamp': datetime.now().isoformat()
     }
@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+
+
+def build_plan(dbms_types, query_ids, scales, modes, repeats=1):
+    """
+    Costruisce il piano del benchmark come lista di celle (dbms, query, scale, mode, repeat).
+
+    L'ordine è scale -> repeat -> dbms -> query -> mode, così che le celle di una
+    stessa scala (un solo dataset caricato alla volta) siano contigue.
+
+    Args:
+        dbms_types (list): DBMS da testare (es. ['mongodb', 'neo4j', 'arangodb'])
+        query_ids (list): indici delle query (es. [1, 2, 3, 4])
+        scales (list): scale del dataset (es. ['25', '50', '75', '100'])
+        modes (list): modalità (es. ['cold', 'warm'])
+        repeats (int): ripetizioni dell'intera matrice
+
+    Returns:
+        list: celle del piano (dict)
+    """
+    return [
+        {'dbms': dbms, 'query': query, 'scale': str(scale), 'mode': mode, 'repeat': repeat}
+        for scale in scales
+        for repeat in range(1, repeats + 1)
+        for dbms in dbms_types
+        for query in query_ids
+        for mode in modes
+    ]
+
+
+def cell_id(cell):
+    """Identificativo stabile di una cella (es. 'mongodb/query1/25/cold/r1')"""
+    return f"{cell['dbms']}/query{cell['query']}/{cell['scale']}/{cell['mode']}/r{cell['repeat']}"
+
+
+def save_plan(path, cells):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'created_at': datetime.now().isoformat(), 'cells': cells}, f, indent=2)
+    print(f"[PLAN] Salvato piano di {len(cells)} celle: {path}")
+
+
+def load_plan(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)['cells']
+
+
+def parse_shard(text):
+    """
+    Interpreta una specifica di shard 'i/n' (i da 0 a n-1).
+
+    Returns:
+        tuple: (shard_index, shard_count)
+    """
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard non valido '{text}': formato atteso 'i/n'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard non valido '{text}': serve 0 <= i < n")
+    return index, count
+
+
+def shard_cells(cells, shard_index, shard_count):
+    """
+    Assegna le celle agli shard: le celle vengono ordinate per hash stabile (CRC32)
+    del loro id e distribuite in round-robin su quell'ordine. Le parti hanno la
+    stessa dimensione (±1) e mescolano modalità, DBMS e query, mentre un round-robin
+    sull'ordine del piano manderebbe tutte le cold run sullo stesso worker quando il
+    numero di modalità è multiplo del numero di shard. Lo stesso piano produce
+    sempre la stessa suddivisione; le celle restituite mantengono l'ordine del piano.
+    """
+    by_hash = sorted(cells, key=lambda cell: (zlib.crc32(cell_id(cell).encode()), cell_id(cell)))
+    assigned = {cell_id(cell) for position, cell in enumerate(by_hash) if position % shard_count == shard_index}
+    return [cell for cell in cells if cell_id(cell) in assigned]
+
+
+def load_completed(checkpoint_path):
+    """Restituisce gli id delle celle già completate registrate nel checkpoint"""
+    completed = set()
+    if not os.path.exists(checkpoint_path):
+        return completed
+    with open(checkpoint_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                completed.add(json.loads(line)['cell_id'])
+            except (ValueError, KeyError):
+                # Riga troncata da un crash durante la scrittura: la cella verrà rieseguita
+                continue
+    return completed
+
+
+def mark_completed(checkpoint_path, cell, duration_s):
+    """
+    Registra una cella completata nel checkpoint (JSON lines, append + fsync).
+    Va chiamata solo dopo che i CSV della cella sono stati scritti.
+    """
+    entry = {'cell_id': cell_id(cell), **cell, 'duration_s': duration_s,
+             'completed_at': datetime.now().isoformat()}
+    with open(checkpoint_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_plan(cells, run_cell, checkpoint_path, scale=None):
+    """
+    Esegue le celle non ancora completate, registrando ognuna nel checkpoint.
+
+    Una cella che fallisce non viene registrata e sarà rieseguita al riavvio;
+    le celle successive vengono comunque eseguite.
+
+    Args:
+        cells (list): celle da eseguire (già filtrate per shard)
+        run_cell (callable): funzione (cell) che esegue una cella e ne scrive i risultati
+        checkpoint_path (str): file di checkpoint JSON lines
+        scale (str): se indicata, esegue solo le celle di questa scala (il dataset caricato)
+
+    Returns:
+        dict: id delle celle completate, saltate e fallite
+    """
+    completed = load_completed(checkpoint_path)
+    summary = {'completed': [], 'skipped': [], 'failed': []}
+
+    pending = [c for c in cells if scale is None or c['scale'] == str(scale)]
+    print(f"[PLAN] {len(pending)} celle per questo worker, {len(completed)} già nel checkpoint")
+
+    for position, cell in enumerate(pending, 1):
+        current_id = cell_id(cell)
+        if current_id in completed:
+            summary['skipped'].append(current_id)
+            continue
+        print(f"[PLAN] Cella {position}/{len(pending)}: {current_id}")
+        start = time.perf_counter()
+        try:
+            run_cell(cell)
+        except Exception as e:
+            print(f"[PLAN] [ERROR] Cella {current_id} fallita: {type(e).__name__}: {e}")
+            summary['failed'].append(current_id)
+            continue
+        mark_completed(checkpoint_path, cell, time.perf_counter() - start)
+        summary['completed'].append(current_id)
+
+    print(f"[PLAN] Completate: {len(summary['completed'])} | già fatte: {len(summary['skipped'])} "
+          f"| fallite: {len(summary['failed'])}")
+    return summary
+
+
+def merge_results(input_dirs, output_dir):
+    """
+    Unisce i risultati di più worker nella struttura letta dagli script di plot.
+
+    Ogni worker scrive {results_dir}/{scale}/repeat{r}/{file}.csv; i file con lo
+    stesso nome e la stessa scala vengono concatenati in {output_dir}/{scale}/{file}.csv
+    aggiungendo la colonna 'repeat'.
+
+    Args:
+        input_dirs (list): cartelle dei risultati dei worker
+        output_dir (str): cartella di destinazione (es. '.')
+
+    Returns:
+        list: file scritti
+    """
+    groups = {}
+    for input_dir in input_dirs:
+        for scale in sorted(os.listdir(input_dir)):
+            scale_dir = os.path.join(input_dir, scale)
+            if not os.path.isdir(scale_dir):
+                continue
+            for repeat_dir in sorted(os.listdir(scale_dir)):
+                if not repeat_dir.startswith("repeat"):
+                    continue
+                repeat = int(repeat_dir[len("repeat"):])
+                for fname in sorted(os.listdir(os.path.join(scale_dir, repeat_dir))):
+                    if fname.endswith(".csv"):
+                        path = os.path.join(scale_dir, repeat_dir, fname)
+                        groups.setdefault((scale, fname), []).append((repeat, path))
+
+    written = []
+    for (scale, fname), sources in sorted(groups.items()):
+        rows, fieldnames = [], []
+        for repeat, path in sorted(sources):
+            with open(path, newline="") as f:
+                reader = csv.DictReader(f)
+                for name in reader.fieldnames or []:
+                    if name not in fieldnames:
+                        fieldnames.append(name)
+                rows.extend({**row, 'repeat': repeat} for row in reader)
+        fieldnames.append('repeat')
+
+        os.makedirs(os.path.join(output_dir, scale), exist_ok=True)
+        out_path = os.path.join(output_dir, scale, fname)
+        with open(out_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+            writer.writeheader()
+            writer.writerows(rows)
+        written.append(out_path)
+
+    print(f"[MERGE] Scritti {len(written)} file in {output_dir}")
+    return written
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import time
+
+from tracing import span
+
+
+# Livelli di cache registrati nella colonna 'flushed_levels' dei CSV
+OS_PAGE_CACHE = "os_page_cache"
+SERVER_RESTART = "server_restart"
+
+
+def drop_os_page_cache():
+    """
+    Svuota la page cache di Linux (sync + echo 3 > /proc/sys/vm/drop_caches).
+
+    Richiede root: senza permessi non fa nulla.
+
+    Returns:
+        bool: True se la cache è stata svuotata
+    """
+    if not hasattr(os, "geteuid") or os.geteuid() != 0:
+        return False
+    os.sync()
+    try:
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError as e:
+        print(f"[CACHE] Impossibile svuotare la page cache: {e}")
+        return False
+    return True
+
+
+class CacheFlusher:
+    """
+    Invalida le cache prima di ogni cold run, così che la misura corrisponda a un
+    primo accesso dopo riavvio o failover.
+
+    Le cache di query/piani si svuotano con i comandi del DBMS (clear_caches_func).
+    Per i buffer pool (page cache di Neo4j, cache di WiredTiger, block cache di
+    RocksDB) non esiste un comando: l'unico modo è riavviare il server con
+    restart_command. La page cache del sistema operativo si svuota con
+    drop_os_cache (solo root).
+
+    Il runner chiama before_connect() prima di connettersi e after_connect() subito
+    prima della query; entrambi restituiscono i livelli di cache svuotati.
+    """
+
+    def __init__(self, clear_caches_func=None, drop_os_cache=False, restart_command=None,
+                 connect_func=None, close_func=None, restart_timeout_s=120.0):
+        """
+        Args:
+            clear_caches_func (callable): svuota le cache del DBMS sulla connessione aperta,
+                restituisce la lista dei livelli svuotati
+            drop_os_cache (bool): svuota anche la page cache del sistema operativo
+            restart_command (str): comando shell che riavvia il server (es. "sudo systemctl restart neo4j")
+            connect_func (callable): usata per attendere che il server torni disponibile dopo il riavvio
+            close_func (callable): chiude la connessione di prova
+            restart_timeout_s (float): attesa massima del server dopo il riavvio
+        """
+        self.clear_caches_func = clear_caches_func
+        self.drop_os_cache = drop_os_cache
+        self.restart_command = restart_command
+        self.connect_func = connect_func
+        self.close_func = close_func
+        self.restart_timeout_s = restart_timeout_s
+
+    def before_connect(self):
+        if not self.restart_command:
+            return []
+        with span("restart", "cache"):
+            subprocess.run(self.restart_command, shell=True, check=True)
+            self._wait_for_server()
+        return [SERVER_RESTART]
+
+    def _wait_for_server(self):
+        if self.connect_func is None:
+            return
+        deadline = time.perf_counter() + self.restart_timeout_s
+        while True:
+            try:
+                self.connect_func()
+                self.close_func()
+                return
+            except Exception:
+                if time.perf_counter() > deadline:
+                    raise
+                time.sleep(1.0)
+
+    def after_connect(self):
+        levels = []
+        if self.clear_caches_func is not None:
+            with span("clear caches", "cache"):
+                levels.extend(self.clear_caches_func())
+        if self.drop_os_cache:
+            with span("drop os page cache", "cache"):
+                if drop_os_page_cache():
+                    levels.append(OS_PAGE_CACHE)
+        return levels
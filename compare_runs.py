@@ -0,0 +1,195 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from results_store import load_execution_times, ALL_RUNS, CELL_KEYS
+
+
+# Campioni minimi per lato: sotto questa soglia la cella è 'insufficient'
+MIN_SAMPLES = 5
+
+# Soglie di |delta di Cliff| per l'entità dell'effetto (Romano et al., 2006)
+CLIFFS_DELTA_THRESHOLDS = ((0.147, "negligible"), (0.33, "small"), (0.474, "medium"))
+
+
+def bootstrap_median_ratio(baseline, candidate, n_boot=2000, confidence=0.95, rng=None):
+    """
+    Intervallo di confidenza bootstrap (percentile) del rapporto tra le mediane
+    candidate / baseline, ricampionando i due lati in modo indipendente.
+
+    Returns:
+        tuple: (ci_low, ci_high)
+    """
+    rng = rng or np.random.default_rng(0)
+    base_medians = np.median(baseline[rng.integers(0, len(baseline), (n_boot, len(baseline)))], axis=1)
+    cand_medians = np.median(candidate[rng.integers(0, len(candidate), (n_boot, len(candidate)))], axis=1)
+    ratios = cand_medians / base_medians
+    tail = (1 - confidence) / 2 * 100
+    return float(np.percentile(ratios, tail)), float(np.percentile(ratios, 100 - tail))
+
+
+def cliffs_delta_magnitude(delta):
+    for limit, label in CLIFFS_DELTA_THRESHOLDS:
+        if abs(delta) < limit:
+            return label
+    return "large"
+
+
+def benjamini_hochberg(p_values):
+    """q-value di Benjamini-Hochberg (controllo del false discovery rate tra le celle)."""
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if m == 0:
+        return p_values
+    order = np.argsort(p_values)
+    ranked = p_values[order] * m / np.arange(1, m + 1)
+    q_sorted = np.minimum.accumulate(ranked[::-1])[::-1]
+    q_values = np.empty(m)
+    q_values[order] = np.minimum(q_sorted, 1.0)
+    return q_values
+
+
+def compare_runs(baseline, candidate, threshold=0.05, alpha=0.05, n_boot=2000, seed=0):
+    """
+    Confronta baseline e candidate cella per cella (dbms, scale, query, mode).
+
+    Per ogni cella: test di Mann-Whitney U bilaterale, CI bootstrap del rapporto tra
+    le mediane e delta di Cliff (P(cand > base) - P(cand < base): positivo se il
+    candidate è più lento). I p-value sono corretti con Benjamini-Hochberg.
+
+    Una cella è 'regression' se il q-value è sotto alpha, il rapporto delle mediane
+    supera 1 + threshold e il CI esclude 1; 'improvement' nel caso simmetrico
+    (rapporto sotto 1 / (1 + threshold)); altrimenti 'unchanged'.
+
+    Args:
+        baseline (pandas.DataFrame): tempi del run di riferimento (vedi results_store.load_execution_times)
+        candidate (pandas.DataFrame): tempi del run da verificare
+        threshold (float): variazione relativa minima della mediana da segnalare
+        alpha (float): soglia sul q-value
+        n_boot (int): ricampionamenti bootstrap
+        seed (int): seed del bootstrap
+
+    Returns:
+        pandas.DataFrame: una riga per cella presente in entrambi i run
+    """
+    rng = np.random.default_rng(seed)
+    base_groups = {key: group['execution_time_ms'].to_numpy() for key, group in baseline.groupby(CELL_KEYS)}
+    cand_groups = {key: group['execution_time_ms'].to_numpy() for key, group in candidate.groupby(CELL_KEYS)}
+
+    rows = []
+    for key in sorted(set(base_groups) & set(cand_groups)):
+        base, cand = base_groups[key], cand_groups[key]
+        row = dict(zip(CELL_KEYS, key))
+        row.update({
+            'n_baseline': len(base),
+            'n_candidate': len(cand),
+            'median_baseline_ms': float(np.median(base)) if len(base) else None,
+            'median_candidate_ms': float(np.median(cand)) if len(cand) else None,
+        })
+        if len(base) < MIN_SAMPLES or len(cand) < MIN_SAMPLES:
+            rows.append({**row, 'status': 'insufficient'})
+            continue
+        u_statistic, p_value = stats.mannwhitneyu(cand, base, alternative='two-sided')
+        delta = 2 * u_statistic / (len(cand) * len(base)) - 1
+        ci_low, ci_high = bootstrap_median_ratio(base, cand, n_boot=n_boot, rng=rng)
+        rows.append({
+            **row,
+            'median_ratio': row['median_candidate_ms'] / row['median_baseline_ms'],
+            'ratio_ci_low': ci_low,
+            'ratio_ci_high': ci_high,
+            'p_value': float(p_value),
+            'cliffs_delta': float(delta),
+            'effect_size': cliffs_delta_magnitude(delta),
+        })
+
+    report = pd.DataFrame(rows)
+    if report.empty:
+        return report
+    tested = report['status'].isna() if 'status' in report else pd.Series(True, index=report.index)
+    # Colonne dei test presenti anche quando tutte le celle sono 'insufficient'
+    report = report.reindex(columns=list(report.columns) + [
+        column for column in ('median_ratio', 'ratio_ci_low', 'ratio_ci_high', 'p_value', 'q_value',
+                              'cliffs_delta', 'effect_size') if column not in report.columns
+    ])
+    if tested.any():
+        report.loc[tested, 'q_value'] = benjamini_hochberg(report.loc[tested, 'p_value'])
+
+    def classify(row):
+        if isinstance(row.get('status'), str):
+            return row['status']
+        if row['q_value'] < alpha and row['median_ratio'] > 1 + threshold and row['ratio_ci_low'] > 1:
+            return 'regression'
+        if row['q_value'] < alpha and row['median_ratio'] < 1 / (1 + threshold) and row['ratio_ci_high'] < 1:
+            return 'improvement'
+        return 'unchanged'
+
+    report['status'] = report.apply(classify, axis=1)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rileva regressioni di performance tra due run del benchmark (baseline vs candidate)"
+    )
+    parser.add_argument("baseline", help="store, cartella dei risultati o albero di CSV del run di riferimento")
+    parser.add_argument("candidate", help="store, cartella dei risultati o albero di CSV del run da verificare")
+    parser.add_argument("--baseline-run-id",
+                        help=f"run_id del baseline nello store (default: l'ultimo run di ogni cella; "
+                             f"'{ALL_RUNS}' per tutti)")
+    parser.add_argument("--candidate-run-id",
+                        help=f"run_id del candidate nello store (default: l'ultimo run di ogni cella; "
+                             f"'{ALL_RUNS}' per tutti)")
+    parser.add_argument("--baseline-git-revision", help="revisione git del baseline nello store")
+    parser.add_argument("--candidate-git-revision", help="revisione git del candidate nello store")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="variazione relativa minima della mediana (default: 0.05 = 5%%)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="soglia sul q-value (default: 0.05)")
+    parser.add_argument("--bootstrap", type=int, default=2000, help="ricampionamenti bootstrap (default: 2000)")
+    parser.add_argument("--output", default="comparison.csv", help="report completo (default: comparison.csv)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Returns:
+        int: 0 senza regressioni, 1 con almeno una regressione, 2 se i run non hanno celle
+            in comune o se nessuna cella ha campioni sufficienti per il test
+    """
+    args = parse_args(argv)
+    baseline = load_execution_times(args.baseline, args.baseline_run_id, args.baseline_git_revision)
+    candidate = load_execution_times(args.candidate, args.candidate_run_id, args.candidate_git_revision)
+    report = compare_runs(baseline, candidate, threshold=args.threshold, alpha=args.alpha, n_boot=args.bootstrap)
+    if report.empty:
+        print("[COMPARE] Nessuna cella (dbms, scale, query, mode) in comune tra i due run")
+        return 2
+
+    report.to_csv(args.output, index=False)
+    counts = report['status'].value_counts()
+    print(f"[COMPARE] {len(report)} celle confrontate: " +
+          ", ".join(f"{status} {count}" for status, count in counts.items()))
+
+    if counts.get('insufficient', 0) == len(report):
+        print(f"[COMPARE] Nessuna cella con almeno {MIN_SAMPLES} campioni per lato: confronto non possibile")
+        print(f"[COMPARE] Report: {args.output}")
+        return 2
+
+    significant = report[report['status'].isin(['regression', 'improvement'])]
+    if not significant.empty:
+        columns = CELL_KEYS + ['median_baseline_ms', 'median_candidate_ms', 'median_ratio', 'ratio_ci_low',
+                               'ratio_ci_high', 'q_value', 'cliffs_delta', 'effect_size', 'status']
+        print(significant[columns].sort_values('median_ratio', ascending=False)
+              .to_string(index=False, float_format=lambda value: f"{value:.4g}"))
+    print(f"[COMPARE] Report: {args.output}")
+
+    regressions = int(counts.get('regression', 0))
+    if regressions:
+        print(f"[COMPARE] [FAIL] {regressions} regressioni oltre il {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import json
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PoolConfig:
+    """
+    Configurazione del pool di connessioni di un connector.
+
+    Attributes:
+        size: connessioni massime aperte verso il server (query in volo contemporaneamente)
+        idle_timeout_s: connessioni inattive da più di questo tempo vengono chiuse
+            o verificate prima del riuso (None = comportamento di default del driver)
+        prewarm: connessioni da aprire subito in connect(), fuori dalle misure
+        acquire_timeout_s: attesa massima per ottenere una connessione dal pool pieno
+    """
+    size: int = 100
+    idle_timeout_s: Optional[float] = None
+    prewarm: int = 0
+    acquire_timeout_s: float = 60.0
+
+
+# Modalità di consumo dei risultati:
+#   materialize - tutte le righe in memoria (comportamento storico)
+#   count       - iterazione lazy del cursore, solo conteggio delle righe
+#   count_bytes - come count, più i byte delle righe codificate in JSON (costo nel tempo misurato)
+#   spill       - righe scritte su un file temporaneo, memoria costante
+CONSUME_MODES = ("materialize", "count", "count_bytes", "spill")
+
+
+class ResultSink:
+    """
+    Destinazione delle righe lette da un cursore, secondo la modalità di consumo.
+
+    In modalità count, count_bytes e spill la memoria del client resta costante al
+    crescere del risultato: nessuna riga viene trattenuta. result_bytes misura il volume
+    letto quando è disponibile senza lavoro extra (BSON ricevuto per MongoDB, file di
+    spill); in modalità count le righe decodificate non vengono ricodificate, così il
+    tempo misurato resta quello del solo conteggio, e count_bytes le codifica in JSON.
+    """
+
+    def __init__(self, mode="materialize", spill_dir=None):
+        """
+        Args:
+            mode (str): una di CONSUME_MODES
+            spill_dir (str): cartella del file temporaneo in modalità spill (default: quella di sistema)
+        """
+        if mode not in CONSUME_MODES:
+            raise ValueError(f"Modalità di consumo non supportata: {mode}")
+        self.mode = mode
+        self.rows = []
+        self.row_count = 0
+        self.byte_count = 0
+        self._encode = mode in ("count_bytes", "spill")
+        # result_bytes è riportato solo se misurato (righe codificate o blocchi grezzi)
+        self._bytes_measured = self._encode
+        self._file = tempfile.TemporaryFile(dir=spill_dir) if mode == "spill" else None
+
+    @property
+    def materialize(self):
+        return self.mode == "materialize"
+
+    @property
+    def encodes(self):
+        """True se le righe aggiunte vengono codificate in JSON (count_bytes, spill)."""
+        return self._encode
+
+    def add(self, row):
+        self.row_count += 1
+        if self.materialize:
+            self.rows.append(row)
+            return
+        if not self._encode:
+            return
+        encoded = json.dumps(row, default=str, separators=(",", ":")).encode() + b"\n"
+        self.byte_count += len(encoded)
+        if self._file is not None:
+            self._file.write(encoded)
+
+    def extend(self, rows):
+        if self.materialize:
+            self.rows.extend(rows)
+            self.row_count += len(rows)
+            return
+        if not self._encode:
+            self.row_count += len(rows)
+            return
+        for row in rows:
+            self.add(row)
+
+    def add_raw(self, data, row_count):
+        """Aggiunge un blocco già codificato (es. un batch BSON) senza decodificarlo."""
+        self.row_count += row_count
+        self.byte_count += len(data)
+        self._bytes_measured = True
+        if self._file is not None:
+            self._file.write(data)
+
+    def close(self):
+        # Il file temporaneo viene eliminato alla chiusura
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def metrics(self):
+        """Colonne aggiuntive del risultato (result_bytes, se misurato)."""
+        if not self._bytes_measured:
+            return {}
+        return {'result_bytes': self.byte_count}
+
+
+class BaseConnector(ABC):
+    """
+    Interfaccia comune dei connector per DBMS.
+
+    Ogni istanza possiede il proprio driver/client e il proprio pool: più istanze
+    (anche verso database diversi) possono convivere nello stesso processo e
+    un'istanza può essere usata da più thread contemporaneamente.
+
+    Esempio:
+        with Neo4jConnector(uri, user, password, pool_config=PoolConfig(size=32, prewarm=8)) as db:
+            result = db.execute("MATCH (n) RETURN count(n)")
+    """
+
+    dbms_type = None
+
+    def __init__(self, pool_config=None):
+        self.pool_config = pool_config or PoolConfig()
+
+    @abstractmethod
+    def connect(self):
+        """Crea driver/client e pool, verifica la connessione ed esegue il prewarm."""
+
+    @abstractmethod
+    def close(self):
+        """Chiude tutte le connessioni del pool."""
+
+    @abstractmethod
+    def execute(self, query, parameters=None, **options):
+        """
+        Esegue una query consumando tutti i risultati.
+
+        Returns:
+            dict: risultati ed execution_time_ms con le metriche del connector
+        """
+
+    @abstractmethod
+    def stream(self, query, parameters=None, **options):
+        """Esegue una query e restituisce le righe una alla volta (generatore)."""
+
+    def clear_caches(self):
+        """
+        Svuota le cache di query/piani del DBMS che hanno un comando dedicato.
+
+        Returns:
+            list: livelli di cache svuotati (vuota se il connector non ne gestisce)
+        """
+        return []
+
+    @property
+    @abstractmethod
+    def is_connected(self):
+        """True se connect() è stato chiamato e close() non ancora."""
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,501 @@
+import os
+import sys
+import csv
+import json
+import shutil
+import time
+from datetime import date, datetime
+from contextlib import contextmanager
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+
+# Concurrent sessions, id-range partitions per worker, ids fetched per page
+EXPORT_WORKERS = 8
+PARTITIONS_PER_WORKER = 4
+EXPORT_PAGE_SIZE = 5000
+
+# Id seeks pay for every id in [min, max], also those of other labels/types. When
+# fewer than this fraction of them belong to the label (interleaved labels, scaled
+# copies appended at the end of the store), the partitions use a label/type scan
+# filtered by id range instead.
+MIN_SEEK_DENSITY = 0.5
+
+# "arrow": typed Arrow IPC file ({name}.arrow), one column per property
+# "csv": {name}.csv with all properties in a JSON "properties" column
+EXPORT_FORMAT = "arrow"
+EXPORT_SUFFIXES = {"arrow": ".arrow", "csv": ".csv"}
+
+# Arrow IPC buffer compression (None, "lz4" or "zstd"). Uncompressed files are read
+# zero-copy from the memory map, but edge files (ids only) end up larger than the CSV;
+# lz4 keeps every file smaller at a small decompression cost per batch on read.
+ARROW_COMPRESSION = "lz4"
+
+NODE_HEADER = ["_id", "properties"]
+EDGE_HEADER = ["_id", "from_id", "to_id", "properties"]
+NODE_KEYS = ["_id"]
+EDGE_KEYS = ["_id", "from_id", "to_id"]
+
+# Neo4j property types (db.schema.*TypeProperties) -> Arrow. Only the declared types
+# are used: a String property stays a string even if its values look numeric. Dates and
+# datetimes are stored as date32/timestamp and turned back into ISO strings by
+# read_export, so the loaded documents do not change (DateTime comes back in UTC).
+NEO4J_ARROW_TYPES = {
+    "String": pa.string(), "Long": pa.int64(), "Double": pa.float64(), "Boolean": pa.bool_(),
+    "Date": pa.date32(), "DateTime": pa.timestamp("us", tz="UTC"), "LocalDateTime": pa.timestamp("us"),
+    "Time": pa.string(), "LocalTime": pa.string(), "Duration": pa.string(),
+    "StringArray": pa.list_(pa.string()), "LongArray": pa.list_(pa.int64()),
+    "DoubleArray": pa.list_(pa.float64()), "BooleanArray": pa.list_(pa.bool_()),
+    "DateArray": pa.list_(pa.date32()), "DateTimeArray": pa.list_(pa.timestamp("us", tz="UTC")),
+    "LocalDateTimeArray": pa.list_(pa.timestamp("us")),
+}
+
+def serialize_properties(props):
+    if props is None:
+        return {}
+    def convert(v):
+        if isinstance(v, dict):
+            return {k: convert(val) for k, val in v.items()}
+        elif hasattr(v, "iso_format"):  # Neo4j Date/DateTime
+            return v.iso_format()
+        elif hasattr(v, "isoformat"):   # Python Date/DateTime
+            return v.isoformat()
+        elif isinstance(v, list):
+            return [convert(val) for val in v]
+        else:
+            return v
+    return convert(props)
+
+def _is_temporal(arrow_type):
+    if pa.types.is_list(arrow_type):
+        arrow_type = arrow_type.value_type
+    return pa.types.is_date(arrow_type) or pa.types.is_timestamp(arrow_type)
+
+def _temporal_columns(schema):
+    return {field.name for field in schema if _is_temporal(field.type)}
+
+def _native(value):
+    """Neo4j temporal value (or list of them) as Python date/datetime, for Arrow."""
+    if isinstance(value, list):
+        return [_native(v) for v in value]
+    return value.to_native() if hasattr(value, "to_native") else value
+
+def _iso_format(value):
+    """
+    ISO string of a date/datetime read back from Arrow, in the format of Neo4j's
+    iso_format (nanosecond fraction, +HH:MM offset), as written by the CSV export.
+    """
+    if isinstance(value, list):
+        return [_iso_format(v) for v in value]
+    if isinstance(value, datetime):
+        text = f"{value:%Y-%m-%dT%H:%M:%S}.{value.microsecond * 1000:09d}"
+        offset = value.strftime("%z")
+        return f"{text}{offset[:3]}:{offset[3:]}" if offset else text
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def _arrow_type(neo4j_types):
+    """Arrow type of a property; Long+Double widen to float64, other mixes fall back to string."""
+    types = {NEO4J_ARROW_TYPES.get(name, pa.string()) for name in neo4j_types}
+    if len(types) == 1:
+        return types.pop()
+    if types <= {pa.int64(), pa.float64()}:
+        return pa.float64()
+    if types <= {pa.list_(pa.int64()), pa.list_(pa.float64())}:
+        return pa.list_(pa.float64())
+    return pa.string()
+
+def property_schemas(driver, kind, keys):
+    """
+    Arrow schema per label (kind="nodes") or relationship type (kind="edges"), from
+    db.schema.nodeTypeProperties / db.schema.relTypeProperties: key columns first,
+    then one column per property in name order.
+    """
+    if kind == "nodes":
+        query = "CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName, propertyTypes"
+    else:
+        query = ("CALL db.schema.relTypeProperties() YIELD relType, propertyName, propertyTypes "
+                 "RETURN [substring(relType, 2, size(relType) - 3)] AS nodeLabels, propertyName, propertyTypes")
+    types = {}
+    with driver.session() as session:
+        for record in session.run(query):
+            if record["propertyName"] is None:
+                continue
+            for name in record["nodeLabels"]:
+                types.setdefault(name, {}).setdefault(record["propertyName"], set()).update(record["propertyTypes"] or [])
+    return {
+        name: pa.schema([pa.field(key, pa.string()) for key in keys] +
+                        [pa.field(prop, _arrow_type(prop_types)) for prop, prop_types in sorted(props.items())])
+        for name, props in types.items()
+    }
+
+def _text_coercer(schema, keys):
+    """Converts non-string values of string property columns (mixed-type properties)."""
+    text_columns = [field.name for field in schema if field.type == pa.string() and field.name not in keys]
+    def coerce(row):
+        for name in text_columns:
+            value = row.get(name)
+            if value is not None and not isinstance(value, str):
+                row[name] = json.dumps(value)
+        return row
+    return coerce
+
+def _arrow_writer(path, schema):
+    return pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION))
+
+def bounds_query(id_match, partitions):
+    """
+    Id bounds, count and the ids at the 1/partitions quantiles of one label or type,
+    in one scan of its ids (id_match binds them as eid).
+    """
+    cuts = ", ".join(f"percentileDisc(eid, {i / partitions!r})" for i in range(1, partitions))
+    return f"{id_match} RETURN min(eid) AS low, max(eid) AS high, count(eid) AS total, [{cuts}] AS cuts"
+
+def id_partitions(low, high, cuts):
+    """
+    Splits [low, high] at the given ids (quantiles of the label's own ids), so that
+    every range holds about the same number of entities however the ids are spread.
+    """
+    starts = [low] + sorted({cut for cut in cuts if cut is not None and low < cut <= high})
+    return [(start, end - 1) for start, end in zip(starts, starts[1:])] + [(starts[-1], high)]
+
+def _node_queries(label):
+    id_match = f"MATCH (n:`{label}`) WITH id(n) AS eid"
+    # UNWIND + equality on id() is planned as a NodeByIdSeek: each page touches only its own ids
+    page = (
+        f"UNWIND range($low, $high) AS nid MATCH (n) WHERE id(n) = nid AND n:`{label}` "
+        "RETURN elementId(n) AS _id, properties(n) AS properties ORDER BY nid"
+    )
+    # Keyset page of a label scan restricted to one id range, for sparse labels
+    scan = (
+        f"MATCH (n:`{label}`) WHERE id(n) > $last AND id(n) <= $high "
+        "RETURN id(n) AS eid, elementId(n) AS _id, properties(n) AS properties ORDER BY id(n) LIMIT $page"
+    )
+    return id_match, page, scan
+
+def _edge_queries(rel_type):
+    id_match = f"MATCH ()-[r:`{rel_type}`]->() WITH id(r) AS eid"
+    page = (
+        f"UNWIND range($low, $high) AS rid MATCH (a)-[r:`{rel_type}`]->(b) WHERE id(r) = rid "
+        "RETURN elementId(r) AS _id, elementId(a) AS from_id, elementId(b) AS to_id, "
+        "properties(r) AS properties ORDER BY rid"
+    )
+    scan = (
+        f"MATCH (a)-[r:`{rel_type}`]->(b) WHERE id(r) > $last AND id(r) <= $high "
+        "RETURN id(r) AS eid, elementId(r) AS _id, elementId(a) AS from_id, elementId(b) AS to_id, "
+        "properties(r) AS properties ORDER BY id(r) LIMIT $page"
+    )
+    return id_match, page, scan
+
+def _node_row(record):
+    return [record["_id"], json.dumps(serialize_properties(record["properties"]))]
+
+def _edge_row(record):
+    return [record["_id"], record["from_id"], record["to_id"], json.dumps(serialize_properties(record["properties"]))]
+
+def _typed_row(keys, coerce, temporal=frozenset()):
+    """
+    Row builder for the Arrow export: key columns plus one entry per property; the
+    properties of temporal columns are passed as Python date/datetime values.
+    """
+    def to_row(record):
+        properties = record["properties"] or {}
+        row = serialize_properties({k: v for k, v in properties.items() if k not in temporal})
+        row.update({k: _native(properties[k]) for k in temporal if k in properties})
+        row.update({key: record[key] for key in keys})
+        return coerce(row)
+    return to_row
+
+@contextmanager
+def _part_writer(path, schema):
+    """Yields a function writing one page of rows: CSV rows (schema None) or Arrow record batches."""
+    if schema is None:
+        with open(path, "w", newline="", encoding="utf-8") as csvfile:
+            yield csv.writer(csvfile).writerows
+    else:
+        with _arrow_writer(path, schema) as writer:
+            def write_page(rows):
+                if rows:
+                    writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            yield write_page
+
+def _export_partition(driver, page_query, to_row, low, high, part_path, page_size, schema=None):
+    """
+    Keyset pagination over one id range on its own session; rows go to a part file
+    (headerless CSV, or Arrow IPC with the label schema).
+    """
+    exported = 0
+    with driver.session() as session, _part_writer(part_path, schema) as write_page:
+        for page_low in range(low, high + 1, page_size):
+            page_high = min(page_low + page_size - 1, high)
+            rows = [to_row(record) for record in session.run(page_query, low=page_low, high=page_high)]
+            write_page(rows)
+            exported += len(rows)
+    return exported
+
+def _export_scan_partition(driver, scan_query, to_row, low, high, part_path, page_size, schema=None):
+    """
+    Keyset pagination of a label/type scan over one id range on its own session: each
+    page restarts after the last id read (id(n) > $last), so no id outside the label is
+    visited one by one as with the seeks of _export_partition.
+    """
+    exported = 0
+    last = low - 1
+    with driver.session() as session, _part_writer(part_path, schema) as write_page:
+        while True:
+            records = list(session.run(scan_query, last=last, high=high, page=page_size))
+            write_page([to_row(record) for record in records])
+            exported += len(records)
+            if len(records) < page_size:
+                return exported
+            last = records[-1]["eid"]
+
+def _concatenate_parts(filename, part_paths, header, schema):
+    """Concatenates part files in order; Arrow parts are memory-mapped and copied batch by batch."""
+    if schema is None:
+        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+            csv.writer(csvfile).writerow(header)
+            for part_path in part_paths:
+                with open(part_path, newline="", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, csvfile)
+                os.remove(part_path)
+        return
+    with _arrow_writer(filename, schema) as writer:
+        for part_path in part_paths:
+            with pa.memory_map(part_path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    writer.write_batch(reader.get_batch(i))
+            os.remove(part_path)
+
+def export_partitioned(driver, name, queries, header, to_row, export_folder,
+                       workers=EXPORT_WORKERS, page_size=EXPORT_PAGE_SIZE, schema=None):
+    """
+    Exports one label or relationship type to {export_folder}/{name}.csv, or to
+    {export_folder}/{name}.arrow when an Arrow schema is given (to_row then returns dicts).
+
+    The internal id range is split at quantiles of the label's own ids into partitions
+    exported concurrently, each on its own session; part files are concatenated in id
+    order, so the output is the same as a single-session export ordered by id. When
+    the label holds fewer than MIN_SEEK_DENSITY of the ids in its range, id seeks would
+    mostly miss: the same partitions then page through a label/type scan filtered by id.
+
+    Returns:
+        int: rows exported
+    """
+    id_match, seek_query, scan_query = queries
+    fmt = "csv" if schema is None else "arrow"
+    suffix = EXPORT_SUFFIXES[fmt]
+    filename = os.path.join(export_folder, f"{name}{suffix}")
+    # A stale export in the other format would shadow or confuse the loaders
+    for other in EXPORT_SUFFIXES.values():
+        if other != suffix and os.path.exists(os.path.join(export_folder, f"{name}{other}")):
+            os.remove(os.path.join(export_folder, f"{name}{other}"))
+    start = time.perf_counter()
+    with driver.session() as session:
+        bounds = session.run(bounds_query(id_match, workers * PARTITIONS_PER_WORKER)).single()
+    if not bounds or not bounds["total"]:
+        _concatenate_parts(filename, [], header, schema)
+        print(f"Exported {name}: 0")
+        return 0
+
+    density = bounds["total"] / (bounds["high"] - bounds["low"] + 1)
+    if density < MIN_SEEK_DENSITY:
+        export_part, page_query, method = _export_scan_partition, scan_query, f"scan, id density {density:.2f}"
+    else:
+        export_part, page_query, method = _export_partition, seek_query, "id seeks"
+    ranges = id_partitions(bounds["low"], bounds["high"], bounds["cuts"])
+    part_paths = [os.path.join(export_folder, f".{name}.part{i:04d}{suffix}") for i in range(len(ranges))]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(export_part, driver, page_query, to_row, low, high, part_path, page_size, schema)
+            for (low, high), part_path in zip(ranges, part_paths)
+        ]
+        exported = sum(future.result() for future in futures)
+    strategy = f"{len(ranges)} partitions, {method}"
+
+    _concatenate_parts(filename, part_paths, header, schema)
+
+    elapsed = time.perf_counter() - start
+    print(f"Exported {name}: {exported} ({strategy}, {elapsed:.1f} s)")
+    if exported != bounds["total"]:
+        print(f"Warning: {name} changed during the export ({bounds['total']} expected, {exported} exported)")
+    return exported
+
+def _export_all(driver, kind, names, export_folder, workers, page_size, fmt):
+    queries, header, keys, csv_row = {
+        "nodes": (_node_queries, NODE_HEADER, NODE_KEYS, _node_row),
+        "edges": (_edge_queries, EDGE_HEADER, EDGE_KEYS, _edge_row),
+    }[kind]
+    if fmt not in EXPORT_SUFFIXES:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    schemas = property_schemas(driver, kind, keys) if fmt == "arrow" else {}
+    for name in names:
+        schema = None
+        to_row = csv_row
+        if fmt == "arrow":
+            # Labels without properties have no entry in the schema procedures
+            schema = schemas.get(name) or pa.schema([pa.field(key, pa.string()) for key in keys])
+            to_row = _typed_row(keys, _text_coercer(schema, keys), _temporal_columns(schema))
+        export_partitioned(driver, name, queries(name), header, to_row, export_folder,
+                           workers, page_size, schema)
+
+def export_nodes(driver, labels, export_folder, workers=EXPORT_WORKERS, page_size=EXPORT_PAGE_SIZE,
+                 fmt=EXPORT_FORMAT):
+    _export_all(driver, "nodes", labels, export_folder, workers, page_size, fmt)
+
+def export_edges(driver, rel_types, export_folder, workers=EXPORT_WORKERS, page_size=EXPORT_PAGE_SIZE,
+                 fmt=EXPORT_FORMAT):
+    _export_all(driver, "edges", rel_types, export_folder, workers, page_size, fmt)
+
+def find_export(export_folder, name):
+    """Path of the export of a label or type, preferring Arrow over CSV (None if missing)."""
+    for suffix in (EXPORT_SUFFIXES["arrow"], EXPORT_SUFFIXES["csv"]):
+        path = os.path.join(export_folder, f"{name}{suffix}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def _split_record(row, keys, temporal):
+    record = {key: row[key] for key in keys}
+    record["properties"] = {k: _iso_format(v) if k in temporal else v
+                            for k, v in row.items() if k not in keys and v is not None}
+    return record
+
+def read_export(path, chunk_size=10000):
+    """
+    Streams an export as lists of at most chunk_size records
+    {"_id", ["from_id", "to_id"], "properties": dict}.
+
+    Arrow files are memory-mapped and sliced without copies; only the Python dicts
+    handed to the drivers are materialized. Null columns are dropped from the
+    properties (Neo4j has no null properties) and dates/datetimes are returned as ISO
+    strings, as in the CSV export. CSV exports are parsed as before.
+    """
+    if path.endswith(EXPORT_SUFFIXES["arrow"]):
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            keys = [key for key in EDGE_KEYS if key in reader.schema.names]
+            temporal = _temporal_columns(reader.schema)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, chunk_size):
+                    yield [_split_record(row, keys, temporal) for row in batch.slice(offset, chunk_size).to_pylist()]
+        return
+    with open(path, encoding="utf-8") as csvfile:
+        chunk = []
+        for row in csv.DictReader(csvfile):
+            record = {key: row[key] for key in EDGE_KEYS if key in row}
+            properties = row["properties"]
+            record["properties"] = json.loads(properties) if properties and properties != "{}" else {}
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def read_ids(path):
+    """All _id values of an export; for Arrow files only the _id column is read."""
+    if path.endswith(EXPORT_SUFFIXES["arrow"]):
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            ids = []
+            for i in range(reader.num_record_batches):
+                ids.extend(reader.get_batch(i).column("_id").to_pylist())
+            return ids
+    with open(path, encoding="utf-8") as csvfile:
+        return [row["_id"] for row in csv.DictReader(csvfile)]
+
+def _widen(current, new):
+    """Common Arrow type of two inferred column types, with the rules of _arrow_type."""
+    if current is None:
+        return new
+    for unknown, other in ((current, new), (new, current)):
+        # All-null columns and lists that were always empty take the other type
+        if pa.types.is_null(unknown) or (unknown == pa.list_(pa.null()) and pa.types.is_list(other)):
+            return other
+    if new == current:
+        return current
+    if {current, new} <= {pa.int64(), pa.float64()}:
+        return pa.float64()
+    if {current, new} <= {pa.list_(pa.int64()), pa.list_(pa.float64())}:
+        return pa.list_(pa.float64())
+    return pa.string()
+
+def _infer_types(rows, keys):
+    """Arrow type of every property of a chunk, over all rows (properties can be sparse)."""
+    names = {name for row in rows for name in row if name not in keys}
+    types = {}
+    for name in names:
+        try:
+            types[name] = pa.array([row.get(name) for row in rows]).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            types[name] = pa.string()
+    return types
+
+def csv_to_arrow(csv_path, chunk_size=50000):
+    """
+    Converts an existing CSV export to {name}.arrow, inferring one typed column per
+    property from the JSON values of all rows (two passes: schema, then data). The CSV
+    holds no Neo4j types: JSON strings (dates, numeric-looking values) stay strings.
+
+    Returns:
+        str: path of the Arrow file
+    """
+    with open(csv_path, encoding="utf-8") as csvfile:
+        keys = [key for key in next(csv.reader(csvfile)) if key != "properties"]
+    types = {}
+    for records in read_export(csv_path, chunk_size):
+        for name, arrow_type in _infer_types([r["properties"] for r in records], keys).items():
+            types[name] = _widen(types.get(name), arrow_type)
+    def finalize(arrow_type):
+        if pa.types.is_null(arrow_type):
+            return pa.string()
+        if pa.types.is_list(arrow_type) and pa.types.is_null(arrow_type.value_type):
+            return pa.list_(pa.string())
+        return arrow_type
+    schema = pa.schema([pa.field(key, pa.string()) for key in keys] +
+                       [pa.field(name, finalize(types[name])) for name in sorted(types)])
+    coerce = _text_coercer(schema, keys)
+    arrow_path = os.path.splitext(csv_path)[0] + EXPORT_SUFFIXES["arrow"]
+    with _arrow_writer(arrow_path, schema) as writer:
+        for records in read_export(csv_path, chunk_size):
+            rows = [coerce({**r["properties"], **{key: r[key] for key in keys}}) for r in records]
+            writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+    return arrow_path
+
+def verify_conversion(csv_path, arrow_path, chunk_size=50000):
+    """
+    Reads both exports back and checks that every record keeps its keys and the names
+    of its properties (values may be widened, e.g. Long to Double).
+
+    Returns:
+        int: records checked
+
+    Raises:
+        ValueError: at the first record that differs
+    """
+    csv_records = (record for chunk in read_export(csv_path, chunk_size) for record in chunk)
+    arrow_records = (record for chunk in read_export(arrow_path, chunk_size) for record in chunk)
+    checked = 0
+    for expected, actual in zip_longest(csv_records, arrow_records):
+        if expected is None or actual is None:
+            raise ValueError(f"{arrow_path}: record count differs from {csv_path}")
+        same_keys = all(actual[key] == value for key, value in expected.items() if key != "properties")
+        names = {name for name, value in expected["properties"].items() if value is not None}
+        if not same_keys or set(actual["properties"]) != names:
+            raise ValueError(f"{arrow_path}: record {checked} differs from {csv_path}")
+        checked += 1
+    return checked
+
+if __name__ == "__main__":
+    # Converts the CSV exports of a folder (default dbms_converter/export_csv) to Arrow
+    folder = sys.argv[1] if len(sys.argv) > 1 else "dbms_converter/export_csv"
+    for entry in sorted(os.listdir(folder)):
+        if entry.endswith(EXPORT_SUFFIXES["csv"]):
+            csv_path = os.path.join(folder, entry)
+            arrow_path = csv_to_arrow(csv_path)
+            verify_conversion(csv_path, arrow_path)
+            print(f"Converted {entry}: {os.path.getsize(csv_path):,} -> {os.path.getsize(arrow_path):,} bytes")
@@ -1,7 +1,10 @@
 import os
-import csv
-import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
+from neo4j_export import export_nodes, export_edges, find_export, read_export, read_ids
 from arango import ArangoClient
 
 NEO4J_URI = "bolt://localhost:7687"
@@ -13,6 +16,17 @@ ARANGO_DB = "test"
 ARANGO_USER = "root"
 ARANGO_PASS = "secretpass"
 
+# Bulk import: documents per import_bulk call, concurrent calls, duplicate _key handling
+# (error | update | replace | ignore)
+IMPORT_BATCH_SIZE = 10000
+IMPORT_WORKERS = 8
+ON_DUPLICATE = "error"
+
+# Secondary indexes added to every edge collection once the data is loaded, e.g.
+# [["_from", "_to"]]. Empty by default: the built-in _from/_to edge index is always
+# maintained during the import and already serves the traversals of the queries.
+EDGE_INDEXES = []
+
 NODE_LABELS = ["Case", "Drug", "Therapy", "Manufacturer", "Reaction", "Outcome", "ReportSource", "AgeGroup"]
 EDGE_TYPES = [
     "IS_PRIMARY_SUSPECT", "IS_SECONDARY_SUSPECT", "IS_CONCOMITANT", "IS_INTERACTING",
@@ -23,116 +37,120 @@ def ensure_export_dir():
     if not os.path.exists(EXPORT_FOLDER):
         os.makedirs(EXPORT_FOLDER, exist_ok=True)
 
-def serialize_properties(props):
-    if props is None:
-        return {}
-    def convert(v):
-        if isinstance(v, dict):
-            return {k: convert(val) for k, val in v.items()}
-        elif hasattr(v, "iso_format"):
-            return v.iso_format()
-        elif hasattr(v, "isoformat"):
-            return v.isoformat()
-        elif isinstance(v, list):
-            return [convert(val) for val in v]
-        else:
-            return v
-    return convert(props)
-
-def export_nodes(session):
-    for label in NODE_LABELS:
-        query = f"MATCH (n:`{label}`) RETURN elementId(n) AS _id, properties(n) AS properties"
-        filename = os.path.join(EXPORT_FOLDER, f"{label}.csv")
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["_id", "properties"])
-            for record in session.run(query):
-                properties = serialize_properties(record["properties"])
-                writer.writerow([record["_id"], json.dumps(properties)])
-
-def export_edges(session):
-    for rel_type in EDGE_TYPES:
-        query = (
-            f"MATCH (a)-[r:`{rel_type}`]->(b) "
-            "RETURN elementId(r) AS _id, elementId(a) AS from_id, elementId(b) AS to_id, properties(r) AS properties"
-        )
-        filename = os.path.join(EXPORT_FOLDER, f"{rel_type}.csv")
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["_id", "from_id", "to_id", "properties"])
-            for record in session.run(query):
-                properties = serialize_properties(record["properties"])
-                writer.writerow([record["_id"], record["from_id"], record["to_id"], json.dumps(properties)])
-
 def build_id_label_mapping():
     """Costruisce una mappa elementId → label per tutti i nodi esportati"""
     mapping = {}
     for label in NODE_LABELS:
-        path = os.path.join(EXPORT_FOLDER, f"{label}.csv")
-        if not os.path.exists(path): continue
-        with open(path, encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                mapping[row["_id"]] = label
+        path = find_export(EXPORT_FOLDER, label)
+        if path is None: continue
+        for node_id in read_ids(path):
+            mapping[node_id] = label
     return mapping
 
-def import_to_arango():
+def iter_chunks(path, to_doc, chunk_size=IMPORT_BATCH_SIZE):
+    """Streams an export (Arrow or CSV, see neo4j_export.read_export) as lists of documents."""
+    for records in read_export(path, chunk_size):
+        yield [to_doc(record) for record in records]
+
+def node_doc(row):
+    doc = {"_key": row["_id"]}
+    doc.update(row["properties"])
+    return doc
+
+def edge_doc_builder(id_to_label):
+    def edge_doc(row):
+        from_label = id_to_label.get(row["from_id"], "UNKNOWN")
+        to_label = id_to_label.get(row["to_id"], "UNKNOWN")
+        doc = {
+            "_key": row["_id"],
+            "_from": f"{from_label}/{row['from_id']}",
+            "_to": f"{to_label}/{row['to_id']}"
+        }
+        doc.update(row["properties"])
+        return doc
+    return edge_doc
+
+def connect_arango():
     client = ArangoClient(hosts=ARANGO_HOST)
-    db = client.db(ARANGO_DB, username=ARANGO_USER, password=ARANGO_PASS)
+    return client.db(ARANGO_DB, username=ARANGO_USER, password=ARANGO_PASS)
 
+def import_to_arango(batch_size=IMPORT_BATCH_SIZE, workers=IMPORT_WORKERS, on_duplicate=ON_DUPLICATE):
+    """
+    Loads all collections with the bulk import API (import_bulk). Batches of every
+    collection share one thread pool, so small collections load side by side and
+    large ones are split across workers; at most 2 * workers batches are in memory.
+    Edge secondary indexes (EDGE_INDEXES) are created after the load.
+    """
+    db = connect_arango()
     id_to_label = build_id_label_mapping()  # Mappatura globale id → label
 
-    # Import nodi
-    for label in NODE_LABELS:
-        path = os.path.join(EXPORT_FOLDER, f"{label}.csv")
-        if not os.path.exists(path): continue
-        if db.has_collection(label):
-            db.delete_collection(label)
-        col = db.create_collection(label)
-        with open(path, encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            docs = []
-            for row in reader:
-                doc = {"_key": row["_id"]}
-                if row["properties"] and row["properties"] != "{}":
-                    doc.update(json.loads(row["properties"]))
-                docs.append(doc)
-            if docs: col.insert_many(docs)
-        print(f"Imported {label} nodes: {len(docs)}")
-
-    # Import archi
-    for rel_type in EDGE_TYPES:
-        path = os.path.join(EXPORT_FOLDER, f"{rel_type}.csv")
-        if not os.path.exists(path): continue
-        if db.has_collection(rel_type):
-            db.delete_collection(rel_type)
-        col = db.create_collection(rel_type, edge=True)
-        with open(path, encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            docs = []
-            for row in reader:
-                from_label = id_to_label.get(row["from_id"], "UNKNOWN")
-                to_label = id_to_label.get(row["to_id"], "UNKNOWN")
-                doc = {
-                    "_key": row["_id"],
-                    "_from": f"{from_label}/{row['from_id']}",
-                    "_to": f"{to_label}/{row['to_id']}"
-                }
-                if row["properties"] and row["properties"] != "{}":
-                    doc.update(json.loads(row["properties"]))
-                docs.append(doc)
-            if docs: col.insert_many(docs)
-        print(f"Imported {rel_type} edges: {len(docs)}")
+    jobs = []
+    for name, kind, to_doc in [(label, "nodes", node_doc) for label in NODE_LABELS] + \
+                              [(rel_type, "edges", edge_doc_builder(id_to_label)) for rel_type in EDGE_TYPES]:
+        path = find_export(EXPORT_FOLDER, name)
+        if path is None: continue
+        if db.has_collection(name):
+            db.delete_collection(name)
+        db.create_collection(name, edge=(kind == "edges"))
+        jobs.append((name, kind, path, to_doc))
+
+    # One connection per worker thread
+    local = threading.local()
+
+    def send(name, chunk):
+        if not hasattr(local, "db"):
+            local.db = connect_arango()
+        result = local.db.collection(name).import_bulk(chunk, on_duplicate=on_duplicate, halt_on_error=False)
+        return result, time.perf_counter()
+
+    stats = {name: {"created": 0, "updated": 0, "ignored": 0, "errors": 0, "start": None, "end": None}
+             for name, _, _, _ in jobs}
+
+    def collect(name, future):
+        result, finished = future.result()
+        for key in ("created", "updated", "ignored", "errors"):
+            stats[name][key] += result.get(key, 0)
+        stats[name]["end"] = max(stats[name]["end"] or finished, finished)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for name, _, path, to_doc in jobs:
+            stats[name]["start"] = time.perf_counter()
+            for chunk in iter_chunks(path, to_doc, batch_size):
+                if len(in_flight) >= 2 * workers:
+                    collect(*in_flight.popleft())
+                in_flight.append((name, executor.submit(send, name, chunk)))
+        while in_flight:
+            collect(*in_flight.popleft())
+
+    for name, kind, _, _ in jobs:
+        entry = stats[name]
+        elapsed = (entry["end"] - entry["start"]) if entry["end"] else 0.0
+        written = entry["created"] + entry["updated"]
+        rate = written / elapsed if elapsed > 0 else 0.0
+        # updated/ignored only occur with ON_DUPLICATE "update"/"replace"/"ignore"
+        extra = "".join(f", {entry[key]} {key}" for key in ("updated", "ignored", "errors") if entry[key])
+        print(f"Imported {name} {kind}: {entry['created']} created{extra} ({elapsed:.1f} s, {rate:,.0f} docs/s)")
+
+    start = time.perf_counter()
+    for name, kind, _, _ in jobs:
+        if kind != "edges": continue
+        for fields in EDGE_INDEXES:
+            db.collection(name).add_persistent_index(fields=fields)
+    if EDGE_INDEXES:
+        print(f"Edge indexes created in {time.perf_counter() - start:.1f} s")
 
 if __name__ == "__main__":
     ensure_export_dir()
     print("Connecting to Neo4j...")
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session() as session:
+    try:
         print("Exporting nodes...")
-        export_nodes(session)
+        export_nodes(driver, NODE_LABELS, EXPORT_FOLDER)
         print("Exporting edges...")
-        export_edges(session)
+        export_edges(driver, EDGE_TYPES, EXPORT_FOLDER)
+    finally:
+        driver.close()
     print("Export completed in folder:", EXPORT_FOLDER)
     print("Connecting to ArangoDB and importing data...")
     import_to_arango()
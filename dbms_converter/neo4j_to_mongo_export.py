@@ -1,8 +1,11 @@
 import os
-import csv
-import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
-from pymongo import MongoClient
+from neo4j_export import export_nodes, export_edges, find_export, read_export
+from pymongo import MongoClient, InsertOne
+from pymongo.write_concern import WriteConcern
 
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -11,6 +14,11 @@ EXPORT_FOLDER = "dbms_converter/export_csv"
 MONGO_URI = "mongodb://localhost:27017"
 MONGO_DB = "test"  # <- usa il database che vedi su Compass
 
+# Bulk loading: documents per bulk_write, concurrent batches, write concern of the load
+CHUNK_SIZE = 10000
+LOAD_WORKERS = 4
+LOAD_WRITE_CONCERN = {"w": 1, "j": False}
+
 NODE_LABELS = ["Case", "Drug", "Therapy", "Manufacturer", "Reaction", "Outcome", "ReportSource", "AgeGroup"]
 EDGE_TYPES = [
     "IS_PRIMARY_SUSPECT", "IS_SECONDARY_SUSPECT", "IS_CONCOMITANT", "IS_INTERACTING",
@@ -21,92 +29,76 @@ def ensure_export_dir():
     if not os.path.exists(EXPORT_FOLDER):
         os.makedirs(EXPORT_FOLDER, exist_ok=True)
 
-def serialize_properties(props):
-    if props is None:
-        return {}
-    def convert(v):
-        if isinstance(v, dict):
-            return {k: convert(val) for k, val in v.items()}
-        elif hasattr(v, "iso_format"):  # Neo4j Date/DateTime
-            return v.iso_format()
-        elif hasattr(v, "isoformat"):   # Python Date/DateTime
-            return v.isoformat()
-        elif isinstance(v, list):
-            return [convert(val) for val in v]
-        else:
-            return v
-    return convert(props)
+def node_doc(row):
+    doc = {"_id": row["_id"]}
+    doc.update(row["properties"])
+    return doc
+
+def edge_doc(row):
+    doc = {
+        "_id": row["_id"],
+        "from": row["from_id"],
+        "to": row["to_id"],
+    }
+    doc.update(row["properties"])
+    return doc
+
+def iter_chunks(path, to_doc, chunk_size=CHUNK_SIZE):
+    """Streams an export (Arrow or CSV, see neo4j_export.read_export) as lists of documents."""
+    for records in read_export(path, chunk_size):
+        yield [to_doc(record) for record in records]
+
+def bulk_load(collection, path, to_doc, chunk_size=CHUNK_SIZE, workers=LOAD_WORKERS):
+    """
+    Loads a CSV with unordered bulk_write batches. The main thread parses the next chunk
+    while up to `workers` batches are on the wire; at most 2 * workers chunks are held in
+    memory at any time, whatever the size of the file.
 
-def export_nodes(session):
-    for label in NODE_LABELS:
-        query = f"MATCH (n:`{label}`) RETURN elementId(n) AS _id, properties(n) AS properties"
-        filename = os.path.join(EXPORT_FOLDER, f"{label}.csv")
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["_id", "properties"])
-            for record in session.run(query):
-                properties = serialize_properties(record["properties"])
-                writer.writerow([record["_id"], json.dumps(properties)])
+    Returns:
+        tuple: (documents inserted, elapsed seconds)
+    """
+    def write(chunk):
+        return collection.bulk_write([InsertOne(doc) for doc in chunk], ordered=False).inserted_count
 
-def export_edges(session):
-    for rel_type in EDGE_TYPES:
-        query = (
-            f"MATCH (a)-[r:`{rel_type}`]->(b) "
-            "RETURN elementId(r) AS _id, elementId(a) AS from_id, elementId(b) AS to_id, properties(r) AS properties"
-        )
-        filename = os.path.join(EXPORT_FOLDER, f"{rel_type}.csv")
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["_id", "from_id", "to_id", "properties"])
-            for record in session.run(query):
-                properties = serialize_properties(record["properties"])
-                writer.writerow([record["_id"], record["from_id"], record["to_id"], json.dumps(properties)])
+    inserted = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in iter_chunks(path, to_doc, chunk_size):
+            if len(in_flight) >= 2 * workers:
+                inserted += in_flight.popleft().result()
+            in_flight.append(executor.submit(write, chunk))
+        while in_flight:
+            inserted += in_flight.popleft().result()
+    return inserted, time.perf_counter() - start
 
-def import_to_mongo():
-    client = MongoClient(MONGO_URI)
+def import_to_mongo(chunk_size=CHUNK_SIZE, workers=LOAD_WORKERS, write_concern=LOAD_WRITE_CONCERN):
+    client = MongoClient(MONGO_URI, maxPoolSize=max(workers, 1) + 2)
     db = client[MONGO_DB]
-    for label in NODE_LABELS:
-        path = os.path.join(EXPORT_FOLDER, f"{label}.csv")
-        if not os.path.exists(path): continue
-        with open(path, encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            docs = []
-            for row in reader:
-                doc = {"_id": row["_id"]}
-                if row["properties"] and row["properties"] != "{}":
-                    doc.update(json.loads(row["properties"]))
-                docs.append(doc)
-            db[label].drop()
-            if docs: db[label].insert_many(docs)
-        print(f"Imported {label} nodes: {len(docs)}")
-    for rel_type in EDGE_TYPES:
-        path = os.path.join(EXPORT_FOLDER, f"{rel_type}.csv")
-        if not os.path.exists(path): continue
-        with open(path, encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            docs = []
-            for row in reader:
-                doc = {
-                    "_id": row["_id"],
-                    "from": row["from_id"],
-                    "to": row["to_id"],
-                }
-                if row["properties"] and row["properties"] != "{}":
-                    doc.update(json.loads(row["properties"]))
-                docs.append(doc)
-            db[rel_type].drop()
-            if docs: db[rel_type].insert_many(docs)
-        print(f"Imported {rel_type} edges: {len(docs)}")
+    concern = WriteConcern(**write_concern)
+    jobs = [(label, "nodes", node_doc) for label in NODE_LABELS] + \
+           [(rel_type, "edges", edge_doc) for rel_type in EDGE_TYPES]
+    for name, kind, to_doc in jobs:
+        path = find_export(EXPORT_FOLDER, name)
+        if path is None: continue
+        db[name].drop()
+        collection = db.get_collection(name, write_concern=concern)
+        inserted, elapsed = bulk_load(collection, path, to_doc, chunk_size, workers)
+        rate = inserted / elapsed if elapsed > 0 else 0.0
+        print(f"Imported {name} {kind}: {inserted} ({elapsed:.1f} s, {rate:,.0f} docs/s)")
+    client.close()
 
 if __name__ == "__main__":
     ensure_export_dir()
     print("Connecting to Neo4j...")
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session() as session:
+    try:
         print("Exporting nodes...")
-        export_nodes(session)
+        export_nodes(driver, NODE_LABELS, EXPORT_FOLDER)
         print("Exporting edges...")
-        export_edges(session)
+        export_edges(driver, EDGE_TYPES, EXPORT_FOLDER)
+    finally:
+        driver.close()
     print("Export completed in folder:", EXPORT_FOLDER)
     print("Connecting to MongoDB and importing data...")
     import_to_mongo()
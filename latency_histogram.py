@@ -0,0 +1,172 @@
+import base64
+import math
+import struct
+import zlib
+
+import numpy as np
+
+
+# Formato binario di serializzazione (incrementato se cambia il layout)
+SERIAL_VERSION = 1
+
+# Header: versione, lowest_ms, highest_ms, relative_error, count, sum_ms, min_ms, max_ms, bucket non vuoti
+_HEADER = struct.Struct("<BdddQdddI")
+
+
+class LatencyHistogram:
+    """
+    Istogramma di latenze a bucket logaritmici (in stile HdrHistogram), su array.
+
+    I bucket crescono in progressione geometrica tra lowest_ms e highest_ms: il bucket
+    i copre [lowest * base^i, lowest * base^(i+1)) con base = (1 + relative_error)^2,
+    quindi il centro geometrico del bucket dista al massimo relative_error (in termini
+    relativi) da qualunque valore registrato al suo interno. La memoria è fissa
+    (~1100 contatori per l'intervallo 1 us - 1 h all'1%), la registrazione è O(1)
+    e i percentili si calcolano direttamente dai contatori.
+
+    Conteggio, somma, minimo e massimo sono esatti; i valori fuori intervallo finiscono
+    nel primo o nell'ultimo bucket. Istogrammi con la stessa configurazione (es. uno per
+    client o per processo) si fondono senza perdita sommando i contatori.
+    """
+
+    def __init__(self, lowest_ms=0.001, highest_ms=3_600_000.0, relative_error=0.01):
+        if not 0 < lowest_ms < highest_ms:
+            raise ValueError("Serve 0 < lowest_ms < highest_ms")
+        if not 0 < relative_error < 1:
+            raise ValueError("relative_error deve essere in (0, 1)")
+        self.lowest_ms = float(lowest_ms)
+        self.highest_ms = float(highest_ms)
+        self.relative_error = float(relative_error)
+        self._log_base = 2 * math.log1p(relative_error)
+        self.counts = np.zeros(self._index(highest_ms) + 1, dtype=np.int64)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = -math.inf
+
+    def _index(self, value_ms):
+        return int(math.log(value_ms / self.lowest_ms) / self._log_base)
+
+    def _bucket_value(self, index):
+        """Centro geometrico del bucket."""
+        return self.lowest_ms * math.exp((index + 0.5) * self._log_base)
+
+    @property
+    def config(self):
+        return (self.lowest_ms, self.highest_ms, self.relative_error)
+
+    def record(self, value_ms, count=1):
+        """Registra una latenza (in ms), eventualmente ripetuta count volte."""
+        if value_ms <= self.lowest_ms:
+            index = 0
+        elif value_ms >= self.highest_ms:
+            index = len(self.counts) - 1
+        else:
+            index = self._index(value_ms)
+        self.counts[index] += count
+        self.count += count
+        self.sum_ms += value_ms * count
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other):
+        """Somma in place un istogramma con la stessa configurazione."""
+        if other.config != self.config:
+            raise ValueError(f"Configurazioni incompatibili: {self.config} vs {other.config}")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    @classmethod
+    def merged(cls, histograms):
+        """Nuovo istogramma pari alla fusione di quelli dati (almeno uno)."""
+        histograms = list(histograms)
+        result = cls(*histograms[0].config)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    @property
+    def mean_ms(self):
+        return self.sum_ms / self.count if self.count else 0.0
+
+    def percentile(self, pct):
+        """
+        Percentile (nearest-rank) stimato dai bucket, limitato al minimo e al massimo esatti.
+
+        Args:
+            pct (float): percentile richiesto (0-100)
+
+        Returns:
+            float: valore del percentile in ms (0.0 se l'istogramma è vuoto)
+        """
+        if not self.count:
+            return 0.0
+        if pct <= 0:
+            return self.min_ms
+        if pct >= 100:
+            return self.max_ms
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self._bucket_value(index), self.min_ms), self.max_ms)
+
+    def summary(self, percentiles=(50, 95, 99, 99.9)):
+        """
+        Returns:
+            dict: count, mean_ms, min_ms, max_ms e pXX_ms per ogni percentile (es. p99_9_ms)
+        """
+        row = {
+            'count': self.count,
+            'mean_ms': self.mean_ms,
+            'min_ms': self.min_ms if self.count else 0.0,
+            'max_ms': self.max_ms if self.count else 0.0,
+        }
+        for pct in percentiles:
+            row[f"p{pct:g}".replace(".", "_") + "_ms"] = self.percentile(pct)
+        return row
+
+    def to_bytes(self):
+        """
+        Serializzazione compatta: header fisso più i soli bucket non vuoti (indici come
+        delta e contatori), compressi con zlib.
+        """
+        nonzero = np.flatnonzero(self.counts)
+        deltas = np.diff(nonzero, prepend=0).astype("<u4")
+        payload = zlib.compress(deltas.tobytes() + self.counts[nonzero].astype("<u8").tobytes())
+        header = _HEADER.pack(SERIAL_VERSION, *self.config, self.count, self.sum_ms,
+                              self.min_ms, self.max_ms, len(nonzero))
+        return header + payload
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, lowest, highest, error, count, sum_ms, min_ms, max_ms, buckets = _HEADER.unpack_from(data)
+        if version != SERIAL_VERSION:
+            raise ValueError(f"Versione di serializzazione non supportata: {version}")
+        histogram = cls(lowest, highest, error)
+        payload = zlib.decompress(data[_HEADER.size:])
+        deltas = np.frombuffer(payload, dtype="<u4", count=buckets)
+        counts = np.frombuffer(payload, dtype="<u8", count=buckets, offset=4 * buckets)
+        histogram.counts[np.cumsum(deltas, dtype=np.int64)] = counts
+        histogram.count, histogram.sum_ms = count, sum_ms
+        histogram.min_ms, histogram.max_ms = min_ms, max_ms
+        return histogram
+
+    def encode(self):
+        """Serializzazione in base64, adatta a una colonna CSV."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def decode(cls, text):
+        return cls.from_bytes(base64.b64decode(text))
+
+    def __reduce__(self):
+        # Pickle compatto per il passaggio tra processi (ProcessPoolExecutor)
+        return (LatencyHistogram.from_bytes, (self.to_bytes(),))
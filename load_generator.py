@@ -0,0 +1,201 @@
+import asyncio
+import csv
+import random
+import time
+
+from latency_histogram import LatencyHistogram
+from query_templates import resolve_parameters
+
+
+def arrival_offsets(rate_qps, duration_s, arrival="constant", seed=None):
+    """
+    Calcola gli istanti di invio previsti (in secondi dall'inizio) per un carico open-loop.
+
+    Args:
+        rate_qps (float): tasso di arrivo target (query al secondo)
+        duration_s (float): durata della finestra di carico
+        arrival (str): 'constant' (intervalli fissi) oppure 'poisson' (intervalli esponenziali)
+        seed (int): seed opzionale per rendere riproducibili gli arrivi Poisson
+
+    Returns:
+        list: istanti di invio previsti, crescenti
+    """
+    if rate_qps <= 0:
+        raise ValueError("rate_qps deve essere positivo")
+    if arrival == "constant":
+        return [i / rate_qps for i in range(int(rate_qps * duration_s))]
+    if arrival == "poisson":
+        rng = random.Random(seed)
+        offsets = []
+        t = rng.expovariate(rate_qps)
+        while t < duration_s:
+            offsets.append(t)
+            t += rng.expovariate(rate_qps)
+        return offsets
+    raise ValueError(f"Distribuzione di arrivo non supportata: {arrival}")
+
+
+async def run_open_loop(query_func, query, parameters=None, rate_qps=10.0, duration_s=30.0,
+                        arrival="constant", max_in_flight=1000, drain_timeout_s=60.0, seed=None):
+    """
+    Invia query al tasso target indipendentemente dalle risposte (open-loop).
+
+    La latenza di ogni query è misurata dall'istante di invio PREVISTO, non da
+    quello effettivo: se il generatore o il DBMS restano indietro, l'attesa in coda
+    finisce nella latenza invece di sparire (coordinated omission).
+
+    Args:
+        query_func (callable): coroutine function (query, parameters) -> dict con execution_time_ms
+        query: query da eseguire
+        parameters (dict | callable): parametri opzionali o generatore (un set per query)
+        rate_qps (float): tasso di arrivo target
+        duration_s (float): durata della finestra di invio
+        arrival (str): 'constant' oppure 'poisson'
+        max_in_flight (int): query in volo oltre le quali un nuovo arrivo viene scartato (contato come errore)
+        drain_timeout_s (float): attesa massima per le query ancora in volo a fine finestra
+        seed (int): seed per gli arrivi Poisson
+
+    Le latenze sono registrate in un LatencyHistogram: la memoria non cresce con la
+    durata del run, e i percentili hanno un errore relativo di ~1%.
+
+    Returns:
+        dict: inviate, completate, errori, throughput ottenuto, percentili di latenza (ms)
+            e istogramma serializzato (latency_histogram)
+    """
+    offsets = arrival_offsets(rate_qps, duration_s, arrival, seed)
+    latencies = LatencyHistogram()
+    errors = 0
+    in_flight = set()
+    last_completion = None
+
+    async def timed_call(intended):
+        nonlocal errors, last_completion
+        try:
+            await query_func(query, resolve_parameters(parameters))
+        except Exception as e:
+            errors += 1
+            print(f"  [ERROR] {type(e).__name__}: {e}")
+            return
+        now = time.perf_counter()
+        latencies.record((now - intended) * 1000)
+        last_completion = now
+
+    start = time.perf_counter()
+    for offset in offsets:
+        intended = start + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            errors += 1
+            continue
+        task = asyncio.create_task(timed_call(intended))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        _, pending = await asyncio.wait(set(in_flight), timeout=drain_timeout_s)
+        for task in pending:
+            task.cancel()
+        errors += len(pending)
+
+    elapsed = (last_completion - start) if last_completion else 0.0
+    return {
+        'target_qps': rate_qps,
+        'arrival': arrival,
+        'sent': len(offsets),
+        'completed': latencies.count,
+        'errors': errors,
+        'achieved_qps': latencies.count / elapsed if elapsed > 0 else 0.0,
+        'mean_ms': latencies.mean_ms,
+        'p50_ms': latencies.percentile(50),
+        'p95_ms': latencies.percentile(95),
+        'p99_ms': latencies.percentile(99),
+        'p99_9_ms': latencies.percentile(99.9),
+        'max_ms': latencies.max_ms if latencies.count else 0.0,
+        'latency_histogram': latencies.encode(),
+    }
+
+
+async def sweep_arrival_rates(
+    dbms_type,
+    connect_func,
+    close_func,
+    query_func,
+    query,
+    parameters=None,
+    rates=(1, 2, 5, 10, 20, 50, 100),
+    duration_s=30.0,
+    arrival="constant",
+    slo_p99_ms=1000.0,
+    max_error_rate=0.01,
+    output_prefix="query"
+):
+    """
+    Esegue run open-loop a tassi crescenti finché lo SLO non viene violato e salva un CSV.
+
+    Uno step rispetta lo SLO se p99 <= slo_p99_ms, la quota di errori è <= max_error_rate
+    e il throughput ottenuto è almeno il 90% di quello target. Lo sweep si ferma al
+    primo step che viola lo SLO.
+
+    Args:
+        dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
+        connect_func (callable): coroutine function per connettere (senza argomenti)
+        close_func (callable): coroutine function per chiudere la connessione
+        query_func (callable): coroutine function per lanciare la query
+        query: query da eseguire
+        parameters (dict | callable): parametri opzionali o generatore (un set per query)
+        rates (iterable): tassi di arrivo target (query/s), crescenti
+        duration_s (float): durata di ogni step
+        arrival (str): 'constant' oppure 'poisson'
+        slo_p99_ms (float): soglia di latenza p99
+        max_error_rate (float): quota massima di errori ammessa
+        output_prefix (str): prefisso file di output
+
+    Returns:
+        float: massimo tasso sostenibile (0.0 se nessuno step rispetta lo SLO)
+
+    Output:
+        - Un CSV con una riga per tasso (es: query1_neo4j_openloop.csv)
+    """
+    openloop_csv = f"{output_prefix}_{dbms_type}_openloop.csv"
+    rows = []
+    sustainable_qps = 0.0
+
+    print(f"[OPEN-LOOP] Connessione a {dbms_type}")
+    await connect_func()
+    try:
+        # Una query di riscaldamento per non attribuire al primo step l'apertura delle connessioni
+        await query_func(query, resolve_parameters(parameters))
+        for rate in rates:
+            print(f"[OPEN-LOOP] {dbms_type}: {rate} q/s ({arrival}) per {duration_s:.0f} s")
+            row = await run_open_loop(query_func, query, parameters, rate, duration_s, arrival)
+            error_rate = row['errors'] / row['sent'] if row['sent'] else 0.0
+            row['slo_met'] = (
+                row['completed'] > 0
+                and row['p99_ms'] <= slo_p99_ms
+                and error_rate <= max_error_rate
+                and row['achieved_qps'] >= 0.9 * rate
+            )
+            rows.append(row)
+            print(f"  --> {row['achieved_qps']:.2f} q/s | p50 {row['p50_ms']:.2f} ms | "
+                  f"p99 {row['p99_ms']:.2f} ms | errori {row['errors']} | SLO {'OK' if row['slo_met'] else 'VIOLATO'}")
+            if not row['slo_met']:
+                break
+            sustainable_qps = rate
+            await asyncio.sleep(1)
+    finally:
+        await close_func()
+
+    with open(openloop_csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ['target_qps'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"[OPEN-LOOP] Salvato: {openloop_csv} | massimo tasso sostenibile: {sustainable_qps} q/s\n")
+    return sustainable_qps
+
+
+def run_arrival_rate_sweep(*args, **kwargs):
+    """Entry point sincrono per sweep_arrival_rates (stessi argomenti)."""
+    return asyncio.run(sweep_arrival_rates(*args, **kwargs))
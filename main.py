@@ -1,27 +1,65 @@
+import argparse
+import os
 import time
 from datetime import datetime
+from functools import partial
 import neo4j_connector
 import mongodb_connector
 import arangodb_connector
-from query_runner import execute_cold_and_warm_queries
+from query_runner import (execute_cold_and_warm_queries, execute_concurrency_sweep, execute_selectivity_sweep,
+                          execute_batch_size_sweep, execute_transport_matrix)
+from load_generator import run_arrival_rate_sweep
+from resource_sampler import ResourceSampler, DBMS_PROCESS_NAMES
+import tracing
+import benchmark_plan
+from cache_control import CacheFlusher
+from result_digest import check_result_equivalence
+from query_templates import (Param, bind_parameters, ParameterSequence, random_range_parameters,
+                             random_companies_parameters, range_for_selectivity, result_values,
+                             OPEN_RANGE_FILTERS)
+from connector_base import PoolConfig
+from results_store import ResultsStore, merge_stores, DEFAULT_STORE_DIR
 
 def print_section_header(title):
     print("\n" + "="*60)
     print(f"          {title}")
     print("="*60)
 
-def connect_neo4j():
+def connect_neo4j(transport_options=None):
     return neo4j_connector.connect_neo4j(
-        "bolt://localhost:7687", "neo4j", "11111111", "neo4j"
+        "bolt://localhost:7687", "neo4j", "11111111", "neo4j",
+        pool_config=POOL_CONFIG, transport_options=transport_options
     )
 
-def connect_mongodb():
+def connect_mongodb(transport_options=None):
     return mongodb_connector.connect_mongodb(
-        "mongodb://localhost:27017", "test"
+        "mongodb://localhost:27017", "test", pool_config=POOL_CONFIG,
+        transport_options=transport_options
     )
 
-def connect_arangodb():
+def connect_arangodb(transport_options=None):
     return arangodb_connector.connect_arangodb(
+        host="localhost",
+        port=8529,
+        username="root",
+        password="secretpass",
+        database_name="test",
+        pool_config=POOL_CONFIG,
+        transport_options=transport_options
+    )
+
+async def connect_neo4j_async():
+    return await neo4j_connector.connect_neo4j_async(
+        "bolt://localhost:7687", "neo4j", "11111111", "neo4j"
+    )
+
+async def connect_mongodb_async():
+    return await mongodb_connector.connect_mongodb_async(
+        "mongodb://localhost:27017", "test"
+    )
+
+async def connect_arangodb_async():
+    return await arangodb_connector.connect_arangodb_async(
         host="localhost",
         port=8529,
         username="root",
@@ -209,93 +247,681 @@ FOR a IN Azienda
 ]
 
 
+# Versioni parametriche delle stesse query: con QUERY_SET = "parameterized" ogni
+# iterazione usa parametri nuovi (intervalli casuali per Q1, aziende di partenza
+# casuali per Q2-Q4), così che le warm run non misurino solo cache di risultati e piani
+parameterized_queries = [
+    ("Query 1 - Complex Scan - Filtri Multipli (parametrica)",
+        {
+            "neo4j": """
+MATCH (t:TransazioneB2B)
+WHERE t.importo_eur > $min_importo
+  AND t.importo_eur < $max_importo
+  AND t.aliquota_iva >= $min_aliquota
+  AND t.data_emissione >= date($data_da)
+  AND t.data_emissione <= date($data_a)
+RETURN t.id_transazione, t.importo_eur, t.aliquota_iva, t.data_emissione
+""",
+            "mongodb": {
+                "collection": "TransazioneB2B",
+                "pipeline": [
+                    {
+                        "$match": {
+                            "$and": [
+                                { "importo_eur": { "$gt": Param("min_importo"), "$lt": Param("max_importo") } },
+                                { "aliquota_iva": { "$gte": Param("min_aliquota") } },
+                                { "data_emissione": {
+                                    "$gte": Param("data_da"),
+                                    "$lte": Param("data_a")
+                                }}
+                            ]
+                        }
+                    },
+                    {
+                        "$project": {
+                            "id_transazione": 1,
+                            "importo_eur": 1,
+                            "aliquota_iva": 1,
+                            "data_emissione": 1,
+                            "_id": 0
+                        }
+                    }
+                ]
+            },
+            "arangodb": """
+FOR t IN TransazioneB2B
+    FILTER t.importo_eur > @min_importo
+      AND t.importo_eur < @max_importo
+      AND t.aliquota_iva >= @min_aliquota
+      AND t.data_emissione >= @data_da
+      AND t.data_emissione <= @data_a
+    RETURN {
+        id: t.id_transazione,
+        importo: t.importo_eur,
+        iva: t.aliquota_iva,
+        data: t.data_emissione
+    }
+"""
+        }),
 
+    ("Query 2 - Join Azienda-Transazione (parametrica)",
+        {
+            "neo4j": """
+MATCH (a:Azienda)
+WHERE a.id_azienda IN $aziende
+MATCH (a)<-[:EMESSA_DA_AZIENDA]-(t:TransazioneB2B)
+RETURN a.nome, t.id_transazione, t.importo_eur
+""",
+            "mongodb": {
+                "collection": "Azienda",
+                "pipeline": [
+                    { "$match": { "id_azienda": { "$in": Param("aziende") } } },
+                    {
+                        "$lookup": {
+                            "from": "TransazioneB2B",
+                            "localField": "id_azienda",
+                            "foreignField": "id_azienda_emittente",
+                            "as": "transazioni"
+                        }
+                    },
+                    { "$unwind": "$transazioni" },
+                    {
+                        "$project": {
+                            "nome_azienda": "$nome",
+                            "id_transazione": "$transazioni.id_transazione",
+                            "importo": "$transazioni.importo_eur",
+                            "_id": 0
+                        }
+                    }
+                ]
+            },
+            "arangodb": """
+FOR a IN Azienda
+    FILTER a.id_azienda IN @aziende
+    FOR t IN INBOUND a EMESSA_DA_AZIENDA
+        RETURN {
+            azienda: a.nome,
+            transazione: t.id_transazione,
+            imp: t.importo_eur
+        }
+"""
+        }),
 
+    ("Query 3 - Short Chain (parametrica)",
+        {
+            "neo4j": """
+MATCH (a:Azienda)
+WHERE a.id_azienda IN $aziende
+MATCH path = (a)<-[:EMESSA_DA_AZIENDA]-(t1)-[:DESTINATA_AD_AZIENDA]->(b:Azienda)
+RETURN a.nome, b.nome
+""",
+            "mongodb": {
+                "collection": "Azienda",
+                "pipeline": [
+                    { "$match": { "id_azienda": { "$in": Param("aziende") } } },
+                    {
+                        "$graphLookup": {
+                            "from": "TransazioneB2B",
+                            "startWith": "$id_azienda",
+                            "connectFromField": "id_azienda_destinataria",
+                            "connectToField": "id_azienda_emittente",
+                            "maxDepth": 1,
+                            "as": "chain"
+                        }
+                    },
+                    {
+                        "$project": {
+                            "start_node": "$nome",
+                            "chain_length": { "$size": "$chain" }
+                        }
+                    },
+                    { "$match": { "chain_length": { "$gte": 2 } } }
+                ]
+            },
+            "arangodb": """
+FOR a IN Azienda
+    FILTER a.id_azienda IN @aziende
+    FOR v, e, p IN 2..2 ANY a EMESSA_DA_AZIENDA, DESTINATA_AD_AZIENDA
+        RETURN { start: a.nome, end: v.nome }
+"""
+        }),
+
+    ("Query 4 - Deep Chain (parametrica)",
+        {
+            "neo4j": """
+MATCH (a:Azienda)
+WHERE a.id_azienda IN $aziende
+MATCH (a)<-[:EMESSA_DA_AZIENDA]-(t1)-[:DESTINATA_AD_AZIENDA]->
+      (b:Azienda)<-[:EMESSA_DA_AZIENDA]-(t2)-[:DESTINATA_AD_AZIENDA]->(c:Azienda)
+RETURN a.nome, c.nome
+LIMIT 200
+""",
+            "mongodb": {
+                "collection": "Azienda",
+                "pipeline": [
+                    { "$match": { "id_azienda": { "$in": Param("aziende") } } },
+                    {
+                        "$graphLookup": {
+                            "from": "TransazioneB2B",
+                            "startWith": "$id_azienda",
+                            "connectFromField": "id_azienda_destinataria",
+                            "connectToField": "id_azienda_emittente",
+                            "maxDepth": 3,
+                            "as": "path"
+                        }
+                    },
+                    {
+                        "$project": {
+                            "start_node": "$nome",
+                            "path_length": { "$size": "$path" }
+                        }
+                    },
+                    { "$match": { "path_length": { "$gte": 3 } } },
+                    { "$limit": 200 }
+                ]
+            },
+            "arangodb": """
+FOR a IN Azienda
+    FILTER a.id_azienda IN @aziende
+    FOR v, e, p IN 4..4 ANY a EMESSA_DA_AZIENDA, DESTINATA_AD_AZIENDA
+    LIMIT 200
+    RETURN { start: a.nome, end: v.nome }
+"""
+        })
+]
 
-def execute_mongodb_query_wrapper(query_config, parameters=None):
+# Query di supporto per i domini dei parametri (una colonna per DBMS)
+domain_queries = {
+    "company_ids": ("id_azienda", {
+        "neo4j": "MATCH (a:Azienda) RETURN a.id_azienda AS id_azienda",
+        "mongodb": {
+            "collection": "Azienda",
+            "pipeline": [{ "$project": { "id_azienda": 1, "_id": 0 } }]
+        },
+        "arangodb": "FOR a IN Azienda RETURN { id_azienda: a.id_azienda }",
+    }),
+    "amounts": ("importo_eur", {
+        "neo4j": "MATCH (t:TransazioneB2B) RETURN t.importo_eur AS importo_eur",
+        "mongodb": {
+            "collection": "TransazioneB2B",
+            "pipeline": [{ "$project": { "importo_eur": 1, "_id": 0 } }]
+        },
+        "arangodb": "FOR t IN TransazioneB2B RETURN { importo_eur: t.importo_eur }",
+    }),
+}
+
+
+
+
+
+def execute_mongodb_query_wrapper(query_config, parameters=None, **options):
+    if parameters:
+        query_config = bind_parameters(query_config, parameters)
     if "pipeline" in query_config:
         return mongodb_connector.execute_mongodb_aggregate_with_timing(
-            query_config["collection"], query_config["pipeline"]
+            query_config["collection"], query_config["pipeline"], **options
         )
     else:
         return mongodb_connector.execute_mongodb_find_with_timing(
-            query_config["collection"], query_config["query"]
+            query_config["collection"], query_config["query"], **options
         )
 
-def execute_arangodb_query_wrapper(query, parameters=None):
-    return arangodb_connector.execute_arangodb_aql_with_timing(query)
-
-def main():
-    print_section_header("WORKFLOW: ARANGO/MONGO/NEO4J COLD/WARM BENCHMARK (QUERIES GENERICHE)")
-    print(f"Avviato alle: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-         # --- MongoDB ---
-    for idx, (descrizione, queries) in enumerate(generic_queries, 1):
-        print_section_header(f"MONGODB - QUERY {idx}: {descrizione}")
-        execute_cold_and_warm_queries(
-            dbms_type="mongodb",
-            connect_func=connect_mongodb,
-            close_func=mongodb_connector.close_mongodb,
-            query_func=execute_mongodb_query_wrapper,
-            query=queries["mongodb"],
-            parameters=None,
-            cold_iterations=31,
-            warm_iterations=30,
-            output_prefix=f"mongodb_query{idx}"
-        )
-        time.sleep(2)
-                # --- Neo4j ---
-    for idx, (descrizione, queries) in enumerate(generic_queries, 1):
-        print_section_header(f"NEO4J - QUERY {idx}: {descrizione}")
-        execute_cold_and_warm_queries(
-            dbms_type="neo4j",
-            connect_func=connect_neo4j,
-            close_func=neo4j_connector.close_neo4j,
-            query_func=neo4j_connector.execute_neo4j_query_with_timing,
-            query=queries["neo4j"],
-            parameters=None,
-            cold_iterations=31,
-            warm_iterations=30,
-            output_prefix=f"neo4j_query{idx}"
-        )
-        time.sleep(2)
-
-
-        # --- ARANGODB PRIMA ---
-    for idx, (descrizione, queries) in enumerate(generic_queries, 1):
-        print_section_header(f"ARANGODB - QUERY {idx}: {descrizione}")
-        execute_cold_and_warm_queries(
-            dbms_type="arangodb",
-            connect_func=connect_arangodb,
-            close_func=arangodb_connector.close_arangodb,
-            query_func=execute_arangodb_query_wrapper,
-            query=queries["arangodb"],
-            parameters=None,
-            cold_iterations=31,
-            warm_iterations=30,
-            output_prefix=f"arangodb_query{idx}"
-        )
-        time.sleep(2)
+def execute_arangodb_query_wrapper(query, parameters=None, **options):
+    return arangodb_connector.execute_arangodb_aql_with_timing(query, parameters, **options)
 
+async def execute_mongodb_query_async_wrapper(query_config, parameters=None):
+    if parameters:
+        query_config = bind_parameters(query_config, parameters)
+    return await mongodb_connector.execute_mongodb_aggregate_async(
+        query_config["collection"], query_config["pipeline"]
+    )
 
+async def execute_arangodb_query_async_wrapper(query, parameters=None):
+    return await arangodb_connector.execute_arangodb_aql_async(query, parameters)
 
 
+# Target del benchmark, nell'ordine di esecuzione:
+# (dbms_type, connect_func, close_func, query_func)
+dbms_targets = [
+    ("mongodb", connect_mongodb, mongodb_connector.close_mongodb, execute_mongodb_query_wrapper),
+    ("neo4j", connect_neo4j, neo4j_connector.close_neo4j, neo4j_connector.execute_neo4j_query_with_timing),
+    ("arangodb", connect_arangodb, arangodb_connector.close_arangodb, execute_arangodb_query_wrapper),
+]
 
+# Iterazioni cold/warm (protocollo standard: 31 cold, 30 warm). Con ADAPTIVE_ITERATIONS
+# (opt-in) i conteggi sono il budget massimo e il campionamento si ferma quando il CI al
+# 95% della media scende sotto CI_TARGET * media: conviene allora alzarli (es. 61/60)
+ADAPTIVE_ITERATIONS = False
+COLD_ITERATIONS = 31
+WARM_ITERATIONS = 30
+CI_TARGET = 0.05
+MIN_ITERATIONS = 5
+
+# True-cold: prima di ogni cold run svuota le cache di query/piani del DBMS e, se il
+# processo è root, la page cache del sistema operativo. I buffer pool (page cache di
+# Neo4j, WiredTiger, block cache di RocksDB) si svuotano solo riavviando il server
+# con COLD_RESTART_COMMANDS (None = nessun riavvio)
+TRUE_COLD = False
+DROP_OS_PAGE_CACHE = True
+COLD_RESTART_COMMANDS = {
+    "mongodb": None,    # es. "sudo systemctl restart mongod"
+    "neo4j": None,      # es. "sudo neo4j restart"
+    "arangodb": None,   # es. "sudo systemctl restart arangodb3"
+}
+
+clear_caches_by_dbms = {
+    "mongodb": mongodb_connector.clear_mongodb_caches,
+    "neo4j": neo4j_connector.clear_neo4j_caches,
+    "arangodb": arangodb_connector.clear_arangodb_caches,
+}
+
+# Doppio timing: oltre al tempo client registra quello riportato dal motore
+# (Neo4j result summary, MongoDB explain executionStats, ArangoDB profile)
+SERVER_TIMING = False
+
+# Consumo dei risultati per query: "materialize" (tutte le righe in memoria), "count"
+# (iterazione lazy, solo conteggio delle righe), "count_bytes" (count più i byte delle
+# righe in JSON, codificate dentro il tempo misurato) o "spill" (righe su file temporaneo
+# in SPILL_DIR). count, count_bytes e spill tengono costante la memoria su Q2/Q3 a scala 100
+QUERY_CONSUME_MODES = {1: "materialize", 2: "materialize", 3: "materialize", 4: "materialize"}
+SPILL_DIR = None
+
+# Digest del risultato (righe + hash indipendente dall'ordine) calcolato durante il fetch:
+# a fine piano i digest vengono confrontati tra DBMS e le query con risposte diverse
+# segnalate. L'hashing rientra nel tempo client: da usare per run di verifica
+RESULT_DIGEST = False
+
+# Campionamento di CPU/RSS/I/O dei processi server locali (da /proc, solo Linux)
+RESOURCE_SAMPLING = False
+RESOURCE_SAMPLING_INTERVAL_S = 0.1
+
+# Span per fase (driver, handshake, sessione, execute, fetch, serializzazione, close)
+# esportati in formato Chrome trace-event (chrome://tracing, Perfetto)
+TRACE_PHASES = False
+TRACE_OUTPUT = "trace_phases.json"
+
+# Sweep di concorrenza (loop chiuso): aggiunge la modalità 'concurrency' al piano
+RUN_CONCURRENCY_SWEEP = False
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+CONCURRENCY_QUERIES_PER_CLIENT = 10
+CONCURRENCY_WORKER_TYPE = "thread"   # "thread" or "process"
+
+# Pool di connessioni dei connector: size deve coprire il massimo di CONCURRENCY_LEVELS,
+# il prewarm apre le connessioni in connect(), fuori dalle misure
+POOL_CONFIG = PoolConfig(size=max(CONCURRENCY_LEVELS), idle_timeout_s=None, prewarm=0)
+
+# Target asincroni per il load generator open-loop:
+# (dbms_type, connect_func, close_func, query_func) come coroutine function
+async_dbms_targets = [
+    ("mongodb", connect_mongodb_async, mongodb_connector.close_mongodb_async, execute_mongodb_query_async_wrapper),
+    ("neo4j", connect_neo4j_async, neo4j_connector.close_neo4j_async, neo4j_connector.execute_neo4j_query_async),
+    ("arangodb", connect_arangodb_async, arangodb_connector.close_arangodb_async, execute_arangodb_query_async_wrapper),
+]
 
+targets_by_dbms = {dbms_type: funcs for dbms_type, *funcs in dbms_targets}
+async_targets_by_dbms = {dbms_type: funcs for dbms_type, *funcs in async_dbms_targets}
+
+# Sweep open-loop a tasso di arrivo crescente, fino alla violazione dello SLO:
+# aggiunge la modalità 'openloop' al piano
+RUN_OPEN_LOOP_SWEEP = False
+OPEN_LOOP_RATES = [1, 2, 5, 10, 20, 50, 100, 200]
+OPEN_LOOP_DURATION_S = 30
+OPEN_LOOP_ARRIVAL = "poisson"   # "constant" or "poisson"
+OPEN_LOOP_SLO_P99_MS = 1000.0
+
+# Query eseguite: "literal" (costanti fisse di generic_queries) oppure "parameterized"
+# (template di parameterized_queries con parametri nuovi a ogni iterazione). Il seed
+# dipende da query, scala e ripetizione: ogni DBMS riceve la stessa sequenza di parametri.
+QUERY_SET = "literal"
+PARAMETER_SEED = 42
+START_COMPANIES = 25
+
+# Sweep di selettività di Q1 (modalità 'selectivity'): l'intervallo su importo_eur va
+# dallo 0.1% al 100% delle transazioni, con gli altri filtri aperti
+RUN_SELECTIVITY_SWEEP = False
+SELECTIVITY_TARGETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0]
+SELECTIVITY_ITERATIONS = 10
+
+# Sweep della dimensione dei batch del cursore (modalità 'batchsize'): fetch_size di Neo4j,
+# batchSize di MongoDB, batch_size di ArangoDB (anche con cursore streaming)
+RUN_BATCH_SIZE_SWEEP = False
+BATCH_SIZES = [100, 1000, 10000, 50000]
+ARANGO_STREAM_OPTIONS = [False, True]
+BATCH_SIZE_SWEEP_ITERATIONS = 5
+
+# Matrice delle opzioni di trasporto (modalità 'transport'): una riconnessione per profilo.
+# MongoDB: compressori del wire protocol (zstd e snappy richiedono i moduli zstandard e
+# python-snappy, vedi requirements.txt; un profilo il cui compressore non è installato o
+# viene scartato dal driver è segnalato e saltato). ArangoDB: keep-alive HTTP e risposte gzip. Neo4j: Bolt non comprime,
+# si confrontano keep-alive TCP e TLS (richiede Bolt TLS abilitato sul server).
+RUN_TRANSPORT_MATRIX = False
+TRANSPORT_PROFILES = {
+    "mongodb": {
+        "none": {},
+        "zlib": {"compressors": "zlib", "zlibCompressionLevel": 6},
+        "zstd": {"compressors": "zstd"},
+        "snappy": {"compressors": "snappy"},
+    },
+    "arangodb": {
+        "keepalive": {"keep_alive": True},
+        "keepalive_gzip": {"keep_alive": True, "compression": "gzip"},
+        "no_keepalive": {"keep_alive": False},
+        "no_keepalive_gzip": {"keep_alive": False, "compression": "gzip"},
+    },
+    "neo4j": {
+        "default": {},
+        "no_tcp_keepalive": {"keep_alive": False},
+        # "tls": {"encrypted": True},
+    },
+}
+TRANSPORT_ITERATIONS = 5
+
+
+# Store colonnare (Parquet) con tutte le iterazioni cold/warm e i metadati del run
+# (revisione git, hardware, versioni dei driver), in {results_dir}/{RESULTS_STORE_DIR}.
+# I CSV per cella restano come formato di scambio per --merge e --check-results.
+RESULTS_STORE = True
+RESULTS_STORE_DIR = DEFAULT_STORE_DIR
+
+# Piano del benchmark: celle (dbms, query, scala, modalità, ripetizione) con checkpoint su disco.
+# Il dataset caricato determina la scala: ogni esecuzione di main.py esegue solo le celle di --scale.
+SCALES = ["25", "50", "75", "100"]
+REPEATS = 1
+PLAN_FILE = "benchmark_plan.json"
+CELL_PAUSE_S = 2
+
+
+def benchmark_modes():
+    modes = ["cold", "warm"]
+    if RUN_CONCURRENCY_SWEEP:
+        modes.append("concurrency")
+    if RUN_OPEN_LOOP_SWEEP:
+        modes.append("openloop")
+    if RUN_SELECTIVITY_SWEEP:
+        modes.append("selectivity")
+    if RUN_BATCH_SIZE_SWEEP:
+        modes.append("batchsize")
+    if RUN_TRANSPORT_MATRIX:
+        modes.append("transport")
+    return modes
+
+
+def batch_size_options(dbms_type):
+    """Punti dello sweep 'batchsize' per un DBMS (ArangoDB anche con e senza stream)."""
+    if dbms_type == "arangodb":
+        return [{'batch_size': size, 'stream': stream} for stream in ARANGO_STREAM_OPTIONS for size in BATCH_SIZES]
+    return [{'batch_size': size} for size in BATCH_SIZES]
+
+
+def active_queries():
+    return parameterized_queries if QUERY_SET == "parameterized" else generic_queries
+
+
+# Domini dei parametri già letti, per (dbms, scala, nome)
+_domain_cache = {}
+
+
+def load_domain(dbms_type, scale, name):
+    """
+    Valori ordinati di una colonna del dataset caricato (id delle aziende, importi),
+    letti una sola volta per DBMS e scala con una connessione fuori dalle misure.
+    """
+    key = (dbms_type, scale, name)
+    if key not in _domain_cache:
+        field, queries = domain_queries[name]
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        connect_func()
+        try:
+            values = result_values(query_func(queries[dbms_type]), field)
+        finally:
+            close_func()
+        _domain_cache[key] = sorted(values)
+        print(f"[PARAMS] {name}: {len(values)} valori da {dbms_type}")
+    return _domain_cache[key]
+
+
+def query_parameters(dbms_type, idx, cell):
+    """Generatore dei parametri della cella (None con QUERY_SET = "literal")."""
+    if QUERY_SET != "parameterized":
+        return None
+    seed = f"{PARAMETER_SEED}/query{idx}/{cell['scale']}/r{cell['repeat']}"
+    if idx == 1:
+        return ParameterSequence(random_range_parameters, seed)
+    company_ids = load_domain(dbms_type, cell["scale"], "company_ids")
+    return ParameterSequence(
+        partial(random_companies_parameters, company_ids=company_ids, count=START_COMPANIES), seed
+    )
 
 
+def selectivity_points(dbms_type, scale):
+    """
+    Parametri di Q1 per ogni selettività di SELECTIVITY_TARGETS, dai quantili di importo_eur.
+
+    Returns:
+        tuple: (punti dello sweep, numero di transazioni con importo)
+    """
+    amounts = load_domain(dbms_type, scale, "amounts")
+    points = []
+    for selectivity in SELECTIVITY_TARGETS:
+        low, high = range_for_selectivity(amounts, selectivity)
+        points.append({
+            'selectivity': selectivity,
+            'parameters': {'min_importo': low, 'max_importo': high, **OPEN_RANGE_FILTERS},
+        })
+    return points, len(amounts)
+
+
+def run_cell(cell, results_dir, results_store=None):
+    """
+    Esegue una cella del piano e scrive i CSV in {results_dir}/{scale}/repeat{r}/
+    (e le iterazioni cold/warm in results_store, se presente).
+    """
+    dbms_type, idx, mode = cell["dbms"], cell["query"], cell["mode"]
+    descrizione, queries = active_queries()[idx - 1]
+    if mode == "selectivity":
+        descrizione, queries = parameterized_queries[0]
+    out_dir = os.path.join(results_dir, cell["scale"], f"repeat{cell['repeat']}")
+    os.makedirs(out_dir, exist_ok=True)
+    output_prefix = os.path.join(out_dir, f"{dbms_type}_query{idx}")
+
+    print_section_header(f"{dbms_type.upper()} - QUERY {idx} - {mode.upper()}: {descrizione}")
+
+    if mode in ("cold", "warm"):
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        sampler = None
+        if RESOURCE_SAMPLING:
+            sampler = ResourceSampler(DBMS_PROCESS_NAMES[dbms_type], interval_s=RESOURCE_SAMPLING_INTERVAL_S).start()
+        flusher = None
+        if TRUE_COLD and mode == "cold":
+            flusher = CacheFlusher(
+                clear_caches_func=clear_caches_by_dbms[dbms_type],
+                drop_os_cache=DROP_OS_PAGE_CACHE,
+                restart_command=COLD_RESTART_COMMANDS.get(dbms_type),
+                connect_func=connect_func,
+                close_func=close_func
+            )
+        try:
+            execute_cold_and_warm_queries(
+                dbms_type=dbms_type,
+                connect_func=connect_func,
+                close_func=close_func,
+                query_func=query_func,
+                query=queries[dbms_type],
+                parameters=query_parameters(dbms_type, idx, cell),
+                cold_iterations=COLD_ITERATIONS,
+                warm_iterations=WARM_ITERATIONS,
+                output_prefix=output_prefix,
+                adaptive=ADAPTIVE_ITERATIONS,
+                ci_target=CI_TARGET,
+                min_iterations=MIN_ITERATIONS,
+                query_options={
+                    "server_timing": SERVER_TIMING,
+                    "digest": RESULT_DIGEST,
+                    "consume": QUERY_CONSUME_MODES.get(idx, "materialize"),
+                    "spill_dir": SPILL_DIR,
+                },
+                resource_sampler=sampler,
+                modes=(mode,),
+                cache_flusher=flusher,
+                results_store=results_store.with_dimensions(
+                    scale=int(cell["scale"]), query=idx, repeat=cell["repeat"], query_set=QUERY_SET
+                ) if results_store is not None else None
+            )
+        finally:
+            if sampler is not None:
+                sampler.stop()
+    elif mode == "concurrency":
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        execute_concurrency_sweep(
+            dbms_type=dbms_type,
+            connect_func=connect_func,
+            close_func=close_func,
+            query_func=query_func,
+            query=queries[dbms_type],
+            parameters=query_parameters(dbms_type, idx, cell),
+            concurrency_levels=CONCURRENCY_LEVELS,
+            queries_per_client=CONCURRENCY_QUERIES_PER_CLIENT,
+            worker_type=CONCURRENCY_WORKER_TYPE,
+            output_prefix=output_prefix
+        )
+    elif mode == "openloop":
+        connect_func, close_func, query_func = async_targets_by_dbms[dbms_type]
+        run_arrival_rate_sweep(
+            dbms_type=dbms_type,
+            connect_func=connect_func,
+            close_func=close_func,
+            query_func=query_func,
+            query=queries[dbms_type],
+            parameters=query_parameters(dbms_type, idx, cell),
+            rates=OPEN_LOOP_RATES,
+            duration_s=OPEN_LOOP_DURATION_S,
+            arrival=OPEN_LOOP_ARRIVAL,
+            slo_p99_ms=OPEN_LOOP_SLO_P99_MS,
+            output_prefix=output_prefix
+        )
+    elif mode == "batchsize":
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        execute_batch_size_sweep(
+            dbms_type=dbms_type,
+            connect_func=connect_func,
+            close_func=close_func,
+            query_func=query_func,
+            query=queries[dbms_type],
+            parameters=query_parameters(dbms_type, idx, cell),
+            sweep_options=batch_size_options(dbms_type),
+            iterations=BATCH_SIZE_SWEEP_ITERATIONS,
+            query_options={"consume": QUERY_CONSUME_MODES.get(idx, "materialize"), "spill_dir": SPILL_DIR},
+            output_prefix=output_prefix
+        )
+    elif mode == "transport":
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        execute_transport_matrix(
+            dbms_type=dbms_type,
+            connect_func=connect_func,
+            close_func=close_func,
+            query_func=query_func,
+            query=queries[dbms_type],
+            parameters=query_parameters(dbms_type, idx, cell),
+            profiles=TRANSPORT_PROFILES[dbms_type],
+            iterations=TRANSPORT_ITERATIONS,
+            query_options={"consume": QUERY_CONSUME_MODES.get(idx, "materialize"), "spill_dir": SPILL_DIR},
+            output_prefix=output_prefix
+        )
+    elif mode == "selectivity":
+        connect_func, close_func, query_func = targets_by_dbms[dbms_type]
+        sweep_points, total_rows = selectivity_points(dbms_type, cell["scale"])
+        execute_selectivity_sweep(
+            dbms_type=dbms_type,
+            connect_func=connect_func,
+            close_func=close_func,
+            query_func=query_func,
+            query=queries[dbms_type],
+            sweep_points=sweep_points,
+            iterations=SELECTIVITY_ITERATIONS,
+            total_rows=total_rows,
+            output_prefix=output_prefix
+        )
+    else:
+        raise ValueError(f"Modalità non supportata: {mode}")
+
+    time.sleep(CELL_PAUSE_S)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold/warm Neo4j, MongoDB e ArangoDB")
+    parser.add_argument("--scale", default="100",
+                        help="scala del dataset attualmente caricato (default: 100)")
+    parser.add_argument("--plan", default=PLAN_FILE,
+                        help="file del piano; se non esiste viene creato dalla configurazione")
+    parser.add_argument("--shard", default="0/1",
+                        help="porzione del piano da eseguire, 'i/n' (default: 0/1)")
+    parser.add_argument("--results-dir", default="runs",
+                        help="cartella dei risultati e del checkpoint di questo worker")
+    parser.add_argument("--merge", nargs="+", metavar="RESULTS_DIR",
+                        help="unisce i risultati dei worker indicati e termina")
+    parser.add_argument("--output", default=".",
+                        help="destinazione di --merge (default: cartella corrente)")
+    parser.add_argument("--check-results", metavar="RESULTS_DIR",
+                        help="confronta i digest dei risultati tra DBMS e termina")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.merge:
+        benchmark_plan.merge_results(args.merge, args.output)
+        merge_stores([os.path.join(d, RESULTS_STORE_DIR) for d in args.merge],
+                     os.path.join(args.output, RESULTS_STORE_DIR))
+        return
+
+    if args.check_results:
+        check_result_equivalence(args.check_results)
+        return
 
+    print_section_header("WORKFLOW: ARANGO/MONGO/NEO4J COLD/WARM BENCHMARK (QUERIES GENERICHE)")
+    print(f"Avviato alle: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
+    if os.path.exists(args.plan):
+        cells = benchmark_plan.load_plan(args.plan)
+    else:
+        cells = benchmark_plan.build_plan(
+            dbms_types=[dbms_type for dbms_type, *_ in dbms_targets],
+            query_ids=list(range(1, len(generic_queries) + 1)),
+            scales=SCALES,
+            modes=benchmark_modes(),
+            repeats=REPEATS
+        )
+        # Lo sweep di selettività è definito solo per Q1
+        cells = [cell for cell in cells if cell["mode"] != "selectivity" or cell["query"] == 1]
+        benchmark_plan.save_plan(args.plan, cells)
 
+    shard_index, shard_count = benchmark_plan.parse_shard(args.shard)
+    cells = benchmark_plan.shard_cells(cells, shard_index, shard_count)
 
-    print_section_header("COMPLETATO")
-    print(f"Finito alle: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    os.makedirs(args.results_dir, exist_ok=True)
+    checkpoint_path = os.path.join(args.results_dir, "checkpoint.jsonl")
 
+    if TRACE_PHASES:
+        tracing.enable_tracing()
 
+    results_store = ResultsStore(os.path.join(args.results_dir, RESULTS_STORE_DIR)) if RESULTS_STORE else None
 
+    benchmark_plan.run_plan(
+        cells,
+        lambda cell: run_cell(cell, args.results_dir, results_store),
+        checkpoint_path,
+        scale=args.scale
+    )
 
+    if TRACE_PHASES:
+        tracing.export_chrome_trace(os.path.join(args.results_dir, TRACE_OUTPUT))
 
+    if RESULT_DIGEST:
+        check_result_equivalence(args.results_dir)
 
-    
+    print_section_header("COMPLETATO")
+    print(f"Finito alle: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
 if __name__ == "__main__":
@@ -1,175 +1,569 @@
 import time
-from pymongo import MongoClient
+import warnings
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient, AsyncMongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from bson import decode_all
 from datetime import datetime
+from tracing import span
+from connector_base import BaseConnector, ResultSink
+from result_digest import ResultDigest
 import json
 
 
-# Variabili globali per mantenere la connessione
-_client = None
-_database = None
+# Connector usato dalle funzioni a livello di modulo (connect_mongodb, close_mongodb, ...)
+_default_connector = None
 
+# Moduli che pymongo importa per ogni compressore del wire protocol (zstd: compression.zstd
+# da Python 3.14, backports.zstd nelle versioni recenti di pymongo, zstandard nelle precedenti)
+COMPRESSOR_MODULES = {
+    'zlib': ('zlib',),
+    'snappy': ('snappy',),
+    'zstd': ('compression.zstd', 'backports.zstd', 'zstandard'),
+}
 
-def connect_mongodb(connection_string, database_name):
+# Stato separato per il client asincrono (load generator open-loop)
+_async_client = None
+_async_database = None
+
+
+def _count_bson_documents(data):
+    """Conta i documenti di un batch BSON leggendo solo i prefissi di lunghezza (int32 little-endian)."""
+    count = 0
+    offset = 0
+    while offset < len(data):
+        offset += int.from_bytes(data[offset:offset + 4], 'little')
+        count += 1
+    return count
+
+
+def _drain_raw_batches(cursor, codec_options, sink, result_digest=None):
+    """
+    Consuma un cursore raw-batch: ogni elemento è un batch BSON ricevuto con un
+    singolo round-trip (aggregate/find iniziale o getMore). Se result_digest è
+    dato, ogni documento vi viene aggiunto appena decodificato.
+
+    In modalità count/spill i batch non vengono decodificati (a meno che serva il
+    digest): i documenti si contano dai prefissi BSON e i byte passano al sink così come sono.
+    Returns:
+        tuple: (istante del primo documento, round-trip)
+    """
+    first_row_time = None
+    round_trips = 0
+    with span("fetch", "mongodb") as span_args:
+        for raw_batch in cursor:
+            round_trips += 1
+            if sink.materialize or result_digest is not None:
+                batch = decode_all(raw_batch, codec_options)
+                count = len(batch)
+                if result_digest is not None:
+                    for doc in batch:
+                        result_digest.update(doc)
+            else:
+                batch, count = None, _count_bson_documents(raw_batch)
+            if count and first_row_time is None:
+                first_row_time = time.perf_counter()
+            if sink.materialize:
+                sink.extend(batch)
+            else:
+                sink.add_raw(raw_batch, count)
+        span_args["rows"] = sink.row_count
+        span_args["round_trips"] = round_trips
+    return first_row_time, max(round_trips, 1)
+
+
+def _requested_compressors(requested):
+    """Normalizza l'opzione compressors (stringa separata da virgole o lista) in una lista di nomi."""
+    if not requested:
+        return []
+    if isinstance(requested, str):
+        requested = requested.split(',')
+    return [name.strip() for name in requested if name.strip()]
+
+
+def _module_available(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # Pacchetto padre assente (es. compression.* prima di Python 3.14)
+        return False
+
+
+def _check_compressor_modules(compressors):
+    """
+    Verifica che i moduli dei compressori richiesti siano installati prima di creare il
+    client: pymongo li scarterebbe con un semplice warning, e il profilo di trasporto
+    misurerebbe in realtà un'altra configurazione.
+
+    Raises:
+        ValueError: se un compressore è sconosciuto o nessuno dei suoi moduli è installato
     """
-    Stabilisce la connessione a MongoDB
+    for name in compressors:
+        modules = COMPRESSOR_MODULES.get(name)
+        if modules is None:
+            raise ValueError(f"Compressore MongoDB sconosciuto: {name}")
+        if not any(_module_available(module) for module in modules):
+            raise ValueError(f"Compressore MongoDB {name} non disponibile: installare uno tra {', '.join(modules)}")
+
+
+def _explain_execution_time_ms(explain):
+    """
+    Estrae il tempo di esecuzione server-side da un explain in modalità executionStats.
+    Per le pipeline non riducibili a una find usa il massimo tra gli
+    executionTimeMillisEstimate degli stage (sono cumulativi).
+    Returns:
+        float: tempo in millisecondi, None se non presente
+    """
+    if 'executionStats' in explain:
+        return explain['executionStats'].get('executionTimeMillis')
+    times = []
+    for stage in explain.get('stages', []):
+        if 'executionTimeMillisEstimate' in stage:
+            times.append(stage['executionTimeMillisEstimate'])
+        cursor_stats = stage.get('$cursor', {}).get('executionStats', {})
+        if 'executionTimeMillis' in cursor_stats:
+            times.append(cursor_stats['executionTimeMillis'])
+    return max(times) if times else None
+
+
+def _serialize_documents(results):
+    with span("serialize", "mongodb", rows=len(results)):
+        serializable_results = []
+        for doc in results:
+            serializable_doc = {}
+            for key, value in doc.items():
+                serializable_doc[key] = str(value) if not isinstance(value, (str, int, float, bool, list, dict, type(None))) else value
+            serializable_results.append(serializable_doc)
+    return serializable_results
+
+
+class MongoDBConnector(BaseConnector):
+    """
+    Connector MongoDB basato su un'istanza di MongoClient con il proprio pool.
+
+    MongoClient è thread-safe: più thread possono usare la stessa istanza e avere
+    fino a pool_config.size operazioni in volo verso il server.
+    """
+
+    dbms_type = "mongodb"
+
+    def __init__(self, connection_string, database_name, pool_config=None, transport_options=None):
+        """
+        Args:
+            connection_string (str): Connection string di MongoDB (es. "mongodb://localhost:27017")
+            database_name (str): Nome del database
+            pool_config (PoolConfig): configurazione del pool (opzionale)
+            transport_options (dict): opzioni di MongoClient per il trasporto
+                (es. {'compressors': 'zstd'} o {'compressors': 'zlib', 'zlibCompressionLevel': 6})
+        """
+        super().__init__(pool_config)
+        self.connection_string = connection_string
+        self.database_name = database_name
+        self.transport_options = dict(transport_options or {})
+        self._client = None
+        self._database = None
+
+    @property
+    def is_connected(self):
+        return self._database is not None
+
+    @property
+    def database(self):
+        return self._database
+
+    def connect(self):
+        """
+        Crea il client, verifica la connessione con un ping ed esegue il prewarm.
+
+        Il prewarm usa minPoolSize: il driver apre e mantiene in background almeno
+        quel numero di connessioni, senza chiuderle per inattività.
+
+        Returns:
+            bool: True se la connessione è riuscita
+        """
+        pool = self.pool_config
+        client_options = {
+            'serverSelectionTimeoutMS': 5000,
+            'maxPoolSize': pool.size,
+            'minPoolSize': min(pool.prewarm, pool.size),
+            'waitQueueTimeoutMS': int(pool.acquire_timeout_s * 1000),
+        }
+        if pool.idle_timeout_s is not None:
+            client_options['maxIdleTimeMS'] = int(pool.idle_timeout_s * 1000)
+        # Compressione del wire protocol: usata solo se negoziata con il server
+        # (networkMessageCompressors di mongod); zstd e snappy richiedono zstandard e python-snappy
+        client_options.update(self.transport_options)
+        compressors = _requested_compressors(client_options.get('compressors'))
+        _check_compressor_modules(compressors)
+        with span("driver construction", "mongodb"), warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self._client = MongoClient(self.connection_string, **client_options)
+        # pymongo scarta con un semplice warning i compressori che non riesce a caricare
+        dropped = [str(w.message) for w in caught if compressors and 'compress' in str(w.message).lower()]
+        if dropped:
+            self._client.close()
+            self._client = None
+            raise ValueError(f"Compressori scartati dal client MongoDB: {'; '.join(dropped)}")
+        # Test della connessione
+        with span("ping", "mongodb"):
+            self._client.admin.command('ping')
+        self._database = self._client[self.database_name]
+        if pool.prewarm:
+            self._prewarm(client_options['minPoolSize'])
+        print(f"Connessione a MongoDB stabilita: {self.database_name}")
+        return True
+
+    def _prewarm(self, connections):
+        # minPoolSize viene riempito da un thread del driver: N ping concorrenti
+        # aprono subito le connessioni, prima che inizino le misure
+        with span("prewarm", "mongodb", connections=connections):
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(lambda _: self._client.admin.command('ping'), range(connections)))
+
+    def close(self):
+        """Chiude il client e tutte le connessioni del pool"""
+        if self._client is not None:
+            with span("close", "mongodb"):
+                self._client.close()
+            self._client = None
+            self._database = None
+        print("Connessione a MongoDB chiusa")
+
+    def _collection(self, collection_name):
+        if self._database is None:
+            raise Exception("Connessione non stabilita. Chiamare connect() prima")
+        return self._database[collection_name]
+
+    def find_with_timing(self, collection_name, filter_query=None, projection=None, limit=None, server_timing=False,
+                         digest=False, consume="materialize", spill_dir=None, batch_size=None):
+        """
+        Esegue una query find su MongoDB e restituisce i risultati con timing
+        Args:
+            collection_name (str): Nome della collection
+            filter_query (dict): Filtro per la query (opzionale)
+            projection (dict): Proiezione dei campi (opzionale)
+            limit (int): Limite di risultati (opzionale)
+            server_timing (bool): Aggiunge executionTimeMillis da un explain executionStats
+                (eseguito dopo la misura client, quindi è una seconda esecuzione della query)
+            digest (bool): Calcola durante il fetch il digest del risultato (result_digest)
+            consume (str): 'materialize', 'count', 'count_bytes' o 'spill' (vedi connector_base.CONSUME_MODES);
+                con count/count_bytes/spill documents è vuota e la memoria resta costante
+            spill_dir (str): cartella del file temporaneo in modalità spill
+            batch_size (int): documenti per batch (find/getMore); default del server se None
+        Returns:
+            dict: Dizionario contenente risultati, tempi di esecuzione e statistiche
+        """
+        collection = self._collection(collection_name)
+
+        # Timing: inizia DOPO aver ottenuto la collection (esclude lookup overhead)
+        start_time = time.perf_counter()
+
+        # find è lazy: il comando parte con il primo batch, dentro lo span "fetch"
+        with span("execute", "mongodb"):
+            cursor = collection.find_raw_batches(filter_query or {}, projection)
+            if limit:
+                cursor = cursor.limit(limit)
+            if batch_size:
+                cursor = cursor.batch_size(batch_size)
+        result_digest = ResultDigest() if digest else None
+        sink = ResultSink(consume, spill_dir)
+        try:
+            first_row_time, round_trips = _drain_raw_batches(cursor, collection.codec_options, sink, result_digest)
+        finally:
+            sink.close()
+
+        end_time = time.perf_counter()
+        total_time = (end_time - start_time) * 1000  # in millisecondi
+
+        server_times = {}
+        if server_timing:
+            # Seconda esecuzione fuori dalla finestra misurata (risoluzione 1 ms)
+            explain_cursor = collection.find(filter_query or {}, projection)
+            if limit:
+                explain_cursor = explain_cursor.limit(limit)
+            server_times['server_time_ms'] = _explain_execution_time_ms(explain_cursor.explain())
+
+        serializable_results = _serialize_documents(sink.rows)
+
+        return {
+            'documents': serializable_results,
+            'total_documents': sink.row_count,
+            'execution_time_ms': total_time,
+            'time_to_first_row_ms': ((first_row_time or end_time) - start_time) * 1000,
+            'time_to_last_row_ms': total_time,
+            'fetch_round_trips': round_trips,
+            'rows_per_round_trip': sink.row_count / round_trips,
+            **sink.metrics(),
+            **server_times,
+            **({'result_digest': result_digest.hexdigest()} if result_digest is not None else {}),
+            'collection': collection_name,
+            'filter_query': filter_query,
+            'projection': projection,
+            'limit': limit,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def aggregate_with_timing(self, collection_name, pipeline, server_timing=False, digest=False,
+                              consume="materialize", spill_dir=None, batch_size=None):
+        """
+        Esegue una pipeline di aggregazione su MongoDB con timing
+        Args:
+            collection_name (str): Nome della collection
+            pipeline (list): Pipeline di aggregazione
+            server_timing (bool): Aggiunge il tempo server-side da un explain executionStats
+                (eseguito dopo la misura client, quindi è una seconda esecuzione della pipeline)
+            digest (bool): Calcola durante il fetch il digest del risultato (result_digest)
+            consume (str): 'materialize', 'count', 'count_bytes' o 'spill' (vedi connector_base.CONSUME_MODES);
+                con count/count_bytes/spill documents è vuota e la memoria resta costante
+            spill_dir (str): cartella del file temporaneo in modalità spill
+            batch_size (int): documenti per batch (find/getMore); default del server se None
+        Returns:
+            dict: Dizionario con risultati e informazioni sui tempi
+        """
+        collection = self._collection(collection_name)
+
+        # Timing: inizia DOPO aver ottenuto la collection
+        start_time = time.perf_counter()
+
+        with span("execute", "mongodb"):
+            cursor = collection.aggregate_raw_batches(pipeline, **({'batchSize': batch_size} if batch_size else {}))
+        result_digest = ResultDigest() if digest else None
+        sink = ResultSink(consume, spill_dir)
+        try:
+            first_row_time, round_trips = _drain_raw_batches(cursor, collection.codec_options, sink, result_digest)
+        finally:
+            sink.close()
+
+        end_time = time.perf_counter()
+        total_time = (end_time - start_time) * 1000  # in millisecondi
+
+        server_times = {}
+        if server_timing:
+            # Seconda esecuzione fuori dalla finestra misurata (risoluzione 1 ms)
+            explain = self._database.command(
+                'explain',
+                {'aggregate': collection_name, 'pipeline': pipeline, 'cursor': {}},
+                verbosity='executionStats'
+            )
+            server_times['server_time_ms'] = _explain_execution_time_ms(explain)
+
+        serializable_results = _serialize_documents(sink.rows)
+
+        return {
+            'documents': serializable_results,
+            'total_documents': sink.row_count,
+            'execution_time_ms': total_time,
+            'time_to_first_row_ms': ((first_row_time or end_time) - start_time) * 1000,
+            'time_to_last_row_ms': total_time,
+            'fetch_round_trips': round_trips,
+            'rows_per_round_trip': sink.row_count / round_trips,
+            **sink.metrics(),
+            **server_times,
+            **({'result_digest': result_digest.hexdigest()} if result_digest is not None else {}),
+            'collection': collection_name,
+            'pipeline': pipeline,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def execute(self, query, parameters=None, **options):
+        """
+        Esegue una query descritta da un dict di configurazione:
+        {'collection': ..., 'pipeline': [...]} per un'aggregazione oppure
+        {'collection': ..., 'query': {...}} per una find.
+        """
+        if "pipeline" in query:
+            return self.aggregate_with_timing(query["collection"], query["pipeline"], **options)
+        return self.find_with_timing(query["collection"], query.get("query"), **options)
+
+    def clear_caches(self):
+        """
+        Svuota la plan cache di ogni collection (planCacheClear).
+        La cache di WiredTiger non ha un comando equivalente: serve un riavvio.
+        """
+        if self._database is None:
+            raise Exception("Connessione non stabilita. Chiamare connect() prima")
+        for collection_name in self._database.list_collection_names(filter={'type': 'collection'}):
+            self._database.command('planCacheClear', collection_name)
+        return ["mongodb_plan_cache"]
+
+    def stream(self, query, parameters=None, **options):
+        """
+        Come execute(), ma restituisce i documenti uno alla volta dal cursore
+        (i batch successivi vengono richiesti con getMore durante l'iterazione).
+        """
+        collection = self._collection(query["collection"])
+        if "pipeline" in query:
+            cursor = collection.aggregate(query["pipeline"], **options)
+        else:
+            cursor = collection.find(query.get("query") or {}, **options)
+        with cursor:
+            yield from cursor
+
+    def benchmark_query(self, collection_name, filter_query=None, projection=None, limit=None, iterations=5):
+        """
+        Esegue una query MongoDB multiple volte per ottenere statistiche di benchmark
+        Args:
+            collection_name (str): Nome della collection
+            filter_query (dict): Filtro per la query
+            projection (dict): Proiezione dei campi
+            limit (int): Limite di risultati
+            iterations (int): Numero di iterazioni
+        Returns:
+            dict: Statistiche aggregate del benchmark
+        """
+        results = []
+        for i in range(iterations):
+            result = self.find_with_timing(collection_name, filter_query, projection, limit)
+            results.append(result['execution_time_ms'])
+        return {
+            'collection': collection_name,
+            'filter_query': filter_query,
+            'iterations': len(results),
+            'avg_time_ms': sum(results) / len(results),
+            'min_time_ms': min(results),
+            'max_time_ms': max(results),
+            'all_times_ms': results,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def get_stats(self):
+        """
+        Ottiene statistiche generali del database MongoDB
+        Returns:
+            dict: Statistiche del database
+        """
+        if self._database is None:
+            return {'error': 'Connessione non stabilita'}
+
+        collections = self._database.list_collection_names()
+        stats = {
+            'database_name': self._database.name,
+            'collections': collections,
+            'collection_counts': {}
+        }
+        for collection_name in collections:
+            count = self._database[collection_name].count_documents({})
+            stats['collection_counts'][collection_name] = count
+        return stats
+
+
+def _require_default_connector():
+    if _default_connector is None:
+        raise Exception("Connessione non stabilita. Chiamare connect_mongodb() prima")
+    return _default_connector
+
+
+def connect_mongodb(connection_string, database_name, pool_config=None, transport_options=None):
+    """
+    Stabilisce la connessione a MongoDB tramite il connector di default del modulo
     Args:
         connection_string (str): Connection string di MongoDB (es. "mongodb://localhost:27017")
         database_name (str): Nome del database
+        pool_config (PoolConfig): configurazione del pool (opzionale)
+        transport_options (dict): opzioni di trasporto di MongoClient (vedi MongoDBConnector)
     Returns:
         bool: True se la connessione è riuscita, False altrimenti
     """
-    global _client, _database
-    _client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
-    # Test della connessione
-    _client.admin.command('ping')
-    _database = _client[database_name]
-    print(f"Connessione a MongoDB stabilita: {database_name}")
-    return True
+    global _default_connector
+    _default_connector = MongoDBConnector(connection_string, database_name, pool_config, transport_options)
+    return _default_connector.connect()
 
 
 def close_mongodb():
     """Chiude la connessione al database MongoDB"""
-    global _client
-    if _client is not None:
-        _client.close()
-        _client = None
-    print("Connessione a MongoDB chiusa")
+    global _default_connector
+    if _default_connector is not None:
+        _default_connector.close()
+        _default_connector = None
+
+
+def get_default_connector():
+    """Restituisce il connector aperto da connect_mongodb() (None se non connesso)"""
+    return _default_connector
+
+
+def clear_mongodb_caches():
+    """Vedi MongoDBConnector.clear_caches"""
+    return _require_default_connector().clear_caches()
+
+
+def execute_mongodb_find_with_timing(collection_name, filter_query=None, projection=None, limit=None, **options):
+    """Esegue una find sul connector di default (opzioni: vedi MongoDBConnector.find_with_timing)"""
+    return _require_default_connector().find_with_timing(collection_name, filter_query, projection, limit, **options)
+
+
+def execute_mongodb_aggregate_with_timing(collection_name, pipeline, **options):
+    """Esegue un'aggregazione sul connector di default (opzioni: vedi MongoDBConnector.aggregate_with_timing)"""
+    return _require_default_connector().aggregate_with_timing(collection_name, pipeline, **options)
+
+
+def benchmark_mongodb_query(collection_name, filter_query=None, projection=None, limit=None, iterations=5):
+    """Vedi MongoDBConnector.benchmark_query"""
+    return _require_default_connector().benchmark_query(collection_name, filter_query, projection, limit, iterations)
 
 
-def execute_mongodb_find_with_timing(collection_name, filter_query=None, projection=None, limit=None):
+def get_mongodb_stats():
+    """Vedi MongoDBConnector.get_stats"""
+    if _default_connector is None:
+        return {'error': 'Connessione non stabilita'}
+    return _default_connector.get_stats()
+
+
+async def connect_mongodb_async(connection_string, database_name):
     """
-    Esegue una query find su MongoDB e restituisce i risultati con timing
+    Stabilisce la connessione asincrona a MongoDB
     Args:
-        collection_name (str): Nome della collection
-        filter_query (dict): Filtro per la query (opzionale)
-        projection (dict): Proiezione dei campi (opzionale)
-        limit (int): Limite di risultati (opzionale)
+        connection_string (str): Connection string di MongoDB (es. "mongodb://localhost:27017")
+        database_name (str): Nome del database
     Returns:
-        dict: Dizionario contenente risultati, tempi di esecuzione e statistiche
+        bool: True se la connessione è riuscita
     """
-    global _database
-    if _database is None:
-        raise Exception("Connessione non stabilita. Chiamare connect_mongodb() prima")
-
-    collection = _database[collection_name]
-
-    # Timing: inizia DOPO aver ottenuto la collection (esclude lookup overhead)
-    start_time = time.perf_counter()
-    
-    cursor = collection.find(filter_query or {}, projection)
-    if limit:
-        cursor = cursor.limit(limit)
-    results = list(cursor)
-    
-    end_time = time.perf_counter()
-    total_time = (end_time - start_time) * 1000  # in millisecondi
+    global _async_client, _async_database
+    _async_client = AsyncMongoClient(connection_string, serverSelectionTimeoutMS=5000)
+    await _async_client.admin.command('ping')
+    _async_database = _async_client[database_name]
+    print(f"Connessione asincrona a MongoDB stabilita: {database_name}")
+    return True
 
-    serializable_results = []
-    for doc in results:
-        serializable_doc = {}
-        for key, value in doc.items():
-            serializable_doc[key] = str(value) if not isinstance(value, (str, int, float, bool, list, dict, type(None))) else value
-        serializable_results.append(serializable_doc)
 
-    return {
-        'documents': serializable_results,
-        'total_documents': len(serializable_results),
-        'execution_time_ms': total_time,
-        'collection': collection_name,
-        'filter_query': filter_query,
-        'projection': projection,
-        'limit': limit,
-        'timestamp': datetime.now().isoformat()
-    }
+async def close_mongodb_async():
+    """Chiude la connessione asincrona a MongoDB"""
+    global _async_client, _async_database
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        _async_database = None
+    print("Connessione asincrona a MongoDB chiusa")
 
 
-def execute_mongodb_aggregate_with_timing(collection_name, pipeline):
+async def execute_mongodb_aggregate_async(collection_name, pipeline):
     """
-    Esegue una pipeline di aggregazione su MongoDB con timing
+    Variante asincrona di execute_mongodb_aggregate_with_timing
     Args:
         collection_name (str): Nome della collection
         pipeline (list): Pipeline di aggregazione
     Returns:
-        dict: Dizionario con risultati e informazioni sui tempi
+        dict: Dizionario con numero di documenti e informazioni sui tempi
     """
-    global _database
-    if _database is None:
-        raise Exception("Connessione non stabilita. Chiamare connect_mongodb() prima")
+    global _async_database
+    if _async_database is None:
+        raise Exception("Connessione non stabilita. Chiamare connect_mongodb_async() prima")
+
+    collection = _async_database[collection_name]
 
-    collection = _database[collection_name]
-    
-    # Timing: inizia DOPO aver ottenuto la collection
     start_time = time.perf_counter()
-    
-    cursor = collection.aggregate(pipeline)
-    results = list(cursor)
-    
+
+    cursor = await collection.aggregate(pipeline)
+    results = await cursor.to_list(None)
+
     end_time = time.perf_counter()
     total_time = (end_time - start_time) * 1000  # in millisecondi
 
-    serializable_results = []
-    for doc in results:
-        serializable_doc = {}
-        for key, value in doc.items():
-            serializable_doc[key] = str(value) if not isinstance(value, (str, int, float, bool, list, dict, type(None))) else value
-        serializable_results.append(serializable_doc)
-
     return {
-        'documents': serializable_results,
-        'total_documents': len(serializable_results),
+        'total_documents': len(results),
         'execution_time_ms': total_time,
         'collection': collection_name,
         'pipeline': pipeline,
         'timestamp': datetime.now().isoformat()
     }
-
-
-def benchmark_mongodb_query(collection_name, filter_query=None, projection=None, limit=None, iterations=5):
-    """
-    Esegue una query MongoDB multiple volte per ottenere statistiche di benchmark
-    Args:
-        collection_name (str): Nome della collection
-        filter_query (dict): Filtro per la query
-        projection (dict): Proiezione dei campi
-        limit (int): Limite di risultati
-        iterations (int): Numero di iterazioni
-    Returns:
-        dict: Statistiche aggregate del benchmark
-    """
-    results = []
-    for i in range(iterations):
-        result = execute_mongodb_find_with_timing(collection_name, filter_query, projection, limit)
-        results.append(result['execution_time_ms'])
-    return {
-        'collection': collection_name,
-        'filter_query': filter_query,
-        'iterations': len(results),
-        'avg_time_ms': sum(results) / len(results),
-        'min_time_ms': min(results),
-        'max_time_ms': max(results),
-        'all_times_ms': results,
-        'timestamp': datetime.now().isoformat()
-    }
-
-
-def get_mongodb_stats():
-    """
-    Ottiene statistiche generali del database MongoDB
-    Returns:
-        dict: Statistiche del database
-    """
-    global _database
-    if _database is None:
-        return {'error': 'Connessione non stabilita'}
-
-    collections = _database.list_collection_names()
-    stats = {
-        'database_name': _database.name,
-        'collections': collections,
-        'collection_counts': {}
-    }
-    for collection_name in collections:
-        count = _database[collection_name].count_documents({})
-        stats['collection_counts'][collection_name] = count
-    return stats
@@ -1,153 +1,344 @@
 import logging
+import math
 import time
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from datetime import datetime
+from tracing import span
+from connector_base import BaseConnector, ResultSink
+from result_digest import ResultDigest
 
 
-_driver = None
-_database = None
+# Record per PULL richiesti dal driver (default del driver Neo4j)
+DEFAULT_FETCH_SIZE = 1000
 
+# Connector usato dalle funzioni a livello di modulo (connect_neo4j, close_neo4j, ...)
+_default_connector = None
 
-def connect_neo4j(uri, username, password, database=None):
+# Stato separato per il driver asincrono (load generator open-loop)
+_async_driver = None
+_async_database = None
+
+
+class Neo4jConnector(BaseConnector):
     """
-    Stabilisce la connessione a Neo4j
+    Connector Neo4j basato su un'istanza del driver con il proprio pool Bolt.
+
+    Il driver è thread-safe: ogni execute() apre una sessione propria, quindi più
+    thread possono avere query in volo contemporaneamente (fino a pool_config.size).
+    """
+
+    dbms_type = "neo4j"
+
+    def __init__(self, uri, username, password, database=None, pool_config=None, transport_options=None):
+        """
+        Args:
+            uri (str): URI del database Neo4j (es. "bolt://localhost:7687")
+            username (str): Username per l'autenticazione
+            password (str): Password per l'autenticazione
+            database (str): Nome del database (opzionale)
+            pool_config (PoolConfig): configurazione del pool (opzionale)
+            transport_options (dict): opzioni Bolt passate al driver (es. keep_alive,
+                connection_timeout, max_connection_lifetime, encrypted)
+        """
+        super().__init__(pool_config)
+        self.uri = uri
+        self.auth = (username, password)
+        self.database = database or "neo4j"
+        self.transport_options = dict(transport_options or {})
+        self._driver = None
+
+    @property
+    def is_connected(self):
+        return self._driver is not None
+
+    def connect(self):
+        """
+        Crea il driver, verifica la connessione ed esegue il prewarm del pool.
+
+        Il driver Neo4j non chiude le connessioni inattive: idle_timeout_s è usato come
+        liveness_check_timeout, cioè le connessioni inattive da più tempo vengono
+        verificate prima del riuso.
+
+        Returns:
+            bool: True se la connessione è riuscita
+        """
+        pool = self.pool_config
+        driver_options = {
+            'max_connection_pool_size': pool.size,
+            'connection_acquisition_timeout': pool.acquire_timeout_s,
+        }
+        if pool.idle_timeout_s is not None:
+            driver_options['liveness_check_timeout'] = pool.idle_timeout_s
+        # Bolt non ha compressione: le opzioni di trasporto sono TLS, keep-alive TCP e timeout
+        driver_options.update(self.transport_options)
+        with span("driver construction", "neo4j"):
+            self._driver = GraphDatabase.driver(self.uri, auth=self.auth, **driver_options)
+        with span("verify_connectivity", "neo4j"):
+            self._driver.verify_connectivity()
+        if pool.prewarm:
+            self._prewarm(min(pool.prewarm, pool.size))
+        print(f"Connessione a Neo4j stabilita: {self.uri}")
+        return True
+
+    def _prewarm(self, connections):
+        # Una transazione esplicita tiene occupata la connessione finché non viene chiusa:
+        # aprendone N insieme il pool crea N connessioni distinte
+        with span("prewarm", "neo4j", connections=connections):
+            sessions = [self._driver.session(database=self.database) for _ in range(connections)]
+            try:
+                transactions = [session.begin_transaction() for session in sessions]
+                for tx in transactions:
+                    tx.rollback()
+            finally:
+                for session in sessions:
+                    session.close()
+
+    def close(self):
+        """
+        Chiude il driver e tutte le connessioni del pool
+        """
+        if self._driver:
+            with span("close", "neo4j"):
+                self._driver.close()
+            self._driver = None
+            print("Connessione a Neo4j chiusa")
+
+    def _require_driver(self):
+        if not self._driver:
+            raise Exception("Connessione a Neo4j non stabilita.")
+        return self._driver
+
+    def execute(self, query, parameters=None, server_timing=False, digest=False, consume="materialize",
+                spill_dir=None, batch_size=None):
+        """
+        Esegue una query Cypher e restituisce risultati con timing CLIENT-SIDE
+        per essere consistente con MongoDB.
+
+        Oltre al tempo totale misura il tempo al primo record (planning + esecuzione
+        fino al primo batch) e all'ultimo record (fine del trasferimento). Il driver
+        non espone il numero di PULL: i round-trip sono stimati dal fetch_size
+        (ceil(righe / fetch_size)) e riportati in fetch_round_trips_est, separati dai
+        conteggi esatti di MongoDB e ArangoDB in fetch_round_trips.
+
+        Con server_timing=True aggiunge i tempi misurati dal server nel summary del
+        risultato: result_available_after (primo record disponibile) e
+        result_available_after + result_consumed_after (tempo server totale).
+
+        Con consume="count", "count_bytes" o "spill" i record non vengono trattenuti
+        (memoria costante, records vuota): il risultato riporta solo il conteggio, più
+        result_bytes con count_bytes e spill.
+
+        Args:
+            query (str): Query Cypher da eseguire
+            parameters (dict): Parametri per la query (opzionale)
+            server_timing (bool): Aggiunge i tempi server-side dal result summary
+            digest (bool): Calcola durante il fetch il digest del risultato (result_digest)
+            consume (str): 'materialize', 'count', 'count_bytes' o 'spill' (vedi connector_base.CONSUME_MODES)
+            spill_dir (str): cartella del file temporaneo in modalità spill
+            batch_size (int): record per PULL, cioè il fetch_size del driver (default DEFAULT_FETCH_SIZE)
+
+        Returns:
+            dict: Contenente records, execution_time_ms, tempi primo/ultimo record e round-trip
+        """
+        driver = self._require_driver()
+        fetch_size = batch_size or DEFAULT_FETCH_SIZE
+
+        with span("session open", "neo4j"):
+            session = driver.session(database=self.database, fetch_size=fetch_size)
+        with session:
+            # Timing: inizia DOPO aver aperto la sessione
+            start_time = time.perf_counter()
+
+            with span("execute", "neo4j"):
+                result = session.run(query, parameters or {})
+
+            # Consuma i record
+            sink = ResultSink(consume, spill_dir)
+            first_row_time = None
+            result_digest = ResultDigest() if digest else None
+            try:
+                with span("fetch", "neo4j") as span_args:
+                    for record in result:
+                        if first_row_time is None:
+                            first_row_time = time.perf_counter()
+                        sink.add(record.data() if sink.encodes else record)
+                        if result_digest is not None:
+                            result_digest.update(record)
+                    span_args["rows"] = sink.row_count
+            finally:
+                sink.close()
+
+            end_time = time.perf_counter()
+            total_time = (end_time - start_time) * 1000  # in millisecondi
+            row_count = sink.row_count
+            round_trips = max(1, math.ceil(row_count / fetch_size))
+
+            server_times = {}
+            if server_timing:
+                # Il summary è già arrivato con l'ultimo batch: consume() non fa altri round-trip
+                summary = result.consume()
+                available_after = summary.result_available_after
+                consumed_after = summary.result_consumed_after
+                server_times = {
+                    'server_first_row_ms': available_after,
+                    'server_time_ms': (available_after + consumed_after)
+                    if available_after is not None and consumed_after is not None else None,
+                }
+
+            return {
+                'records': sink.rows,
+                'total_records': row_count,
+                'execution_time_ms': total_time,
+                'time_to_first_row_ms': ((first_row_time or end_time) - start_time) * 1000,
+                'time_to_last_row_ms': total_time,
+                'fetch_round_trips_est': round_trips,
+                **sink.metrics(),
+                **server_times,
+                **({'result_digest': result_digest.hexdigest()} if result_digest is not None else {}),
+                'query': query,
+                'parameters': parameters,
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def clear_caches(self):
+        """
+        Svuota le cache dei piani e dei risultati di query (CALL db.clearQueryCaches()).
+        La page cache non ha un comando equivalente: serve un riavvio.
+        """
+        with self._require_driver().session(database=self.database) as session:
+            session.run("CALL db.clearQueryCaches()").consume()
+        return ["neo4j_query_caches"]
+
+    def stream(self, query, parameters=None, **options):
+        """
+        Esegue una query Cypher e restituisce i record uno alla volta, senza
+        materializzare il risultato. La sessione resta aperta finché il generatore
+        non è esaurito o chiuso. options è la configurazione della sessione
+        (es. fetch_size, default DEFAULT_FETCH_SIZE).
+        """
+        driver = self._require_driver()
+        session_options = {'fetch_size': DEFAULT_FETCH_SIZE, **options}
+        with driver.session(database=self.database, **session_options) as session:
+            yield from session.run(query, parameters or {})
+
+
+def connect_neo4j(uri, username, password, database=None, pool_config=None, transport_options=None):
+    """
+    Stabilisce la connessione a Neo4j tramite il connector di default del modulo
     
     Args:
         uri (str): URI del database Neo4j (es. "bolt://localhost:7687")
         username (str): Username per l'autenticazione
         password (str): Password per l'autenticazione
         database (str): Nome del database (opzionale)
+        pool_config (PoolConfig): configurazione del pool (opzionale)
+        transport_options (dict): opzioni Bolt del driver (vedi Neo4jConnector)
     
     Returns:
         bool: True se la connessione è riuscita, False altrimenti
     """
-    global _driver, _database
-    _driver = GraphDatabase.driver(uri, auth=(username, password))
-    _database = database or "neo4j"
-    _driver.verify_connectivity()
-    print(f"Connessione a Neo4j stabilita: {uri}")
-    return True
+    global _default_connector
+    _default_connector = Neo4jConnector(uri, username, password, database, pool_config, transport_options)
+    return _default_connector.connect()
 
 
 def close_neo4j():
     """
     Chiude la connessione al database Neo4j
     """
-    global _driver
-    if _driver:
-        _driver.close()
-        _driver = None
-        print("Connessione a Neo4j chiusa")
+    global _default_connector
+    if _default_connector is not None:
+        _default_connector.close()
+        _default_connector = None
+
+
+def get_default_connector():
+    """Restituisce il connector aperto da connect_neo4j() (None se non connesso)"""
+    return _default_connector
+
+
+def clear_neo4j_caches():
+    """Vedi Neo4jConnector.clear_caches"""
+    if _default_connector is None:
+        raise Exception("Connessione a Neo4j non stabilita.")
+    return _default_connector.clear_caches()
 
 
-def execute_neo4j_query_with_timing(query, parameters=None):
+def execute_neo4j_query_with_timing(query, parameters=None, **options):
     """
-    Esegue una query Cypher e restituisce risultati con timing CLIENT-SIDE
-    per essere consistente con MongoDB.
+    Esegue una query Cypher sul connector di default
     
     Args:
         query (str): Query Cypher da eseguire
         parameters (dict): Parametri per la query (opzionale)
+        **options: server_timing, digest, consume, spill_dir, batch_size (vedi Neo4jConnector.execute)
     
     Returns:
-        dict: Contenente records, execution_time_ms e altre info
+        dict: Contenente records, execution_time_ms, tempi primo/ultimo record e round-trip
     """
-    global _driver, _database
-    if not _driver:
+    if _default_connector is None:
         raise Exception("Connessione a Neo4j non stabilita.")
-    
-    with _driver.session(database=_database) as session:
-        # Timing: inizia DOPO aver aperto la sessione
-        start_time = time.perf_counter()
-        
-        result = session.run(query, parameters or {})
-        
-        # Consuma i record
-        records = [record for record in result]
-        
-        end_time = time.perf_counter()
-        total_time = (end_time - start_time) * 1000  # in millisecondi
-        
-        return {
-            'records': records,
-            'total_records': len(records),
-            'execution_time_ms': total_time,
-            'query': query,
-            'parameters': parameters,
-            'timestamp': datetime.now().isoformat()
-        }
-import logging
-import time
-from neo4j import GraphDatabase
-from datetime import datetime
-
-
-_driver = None
-_database = None
+    return _default_connector.execute(query, parameters, **options)
 
 
-def connect_neo4j(uri, username, password, database=None):
+async def connect_neo4j_async(uri, username, password, database=None):
     """
-    Stabilisce la connessione a Neo4j
-    
+    Stabilisce la connessione asincrona a Neo4j (AsyncGraphDatabase)
+
     Args:
         uri (str): URI del database Neo4j (es. "bolt://localhost:7687")
         username (str): Username per l'autenticazione
         password (str): Password per l'autenticazione
         database (str): Nome del database (opzionale)
-    
+
     Returns:
-        bool: True se la connessione è riuscita, False altrimenti
+        bool: True se la connessione è riuscita
     """
-    global _driver, _database
-    _driver = GraphDatabase.driver(uri, auth=(username, password))
-    _database = database or "neo4j"
-    _driver.verify_connectivity()
-    print(f"Connessione a Neo4j stabilita: {uri}")
+    global _async_driver, _async_database
+    _async_driver = AsyncGraphDatabase.driver(uri, auth=(username, password))
+    _async_database = database or "neo4j"
+    await _async_driver.verify_connectivity()
+    print(f"Connessione asincrona a Neo4j stabilita: {uri}")
     return True
 
 
-def close_neo4j():
+async def close_neo4j_async():
     """
-    Chiude la connessione al database Neo4j
+    Chiude la connessione asincrona a Neo4j
     """
-    global _driver
-    if _driver:
-        _driver.close()
-        _driver = None
-        print("Connessione a Neo4j chiusa")
+    global _async_driver
+    if _async_driver:
+        await _async_driver.close()
+        _async_driver = None
+        print("Connessione asincrona a Neo4j chiusa")
 
 
-def execute_neo4j_query_with_timing(query, parameters=None):
+async def execute_neo4j_query_async(query, parameters=None):
     """
-    Esegue una query Cypher e restituisce risultati con timing CLIENT-SIDE
-    per essere consistente con MongoDB.
-    
+    Variante asincrona di execute_neo4j_query_with_timing: più query possono
+    essere in volo contemporaneamente sullo stesso driver.
+
     Args:
         query (str): Query Cypher da eseguire
         parameters (dict): Parametri per la query (opzionale)
-    
+
     Returns:
-        dict: Contenente records, execution_time_ms e altre info
+        dict: Contenente total_records, execution_time_ms e altre info
     """
-    global _driver, _database
-    if not _driver:
-        raise Exception("Connessione a Neo4j non stabilita.")
-    
-    with _driver.session(database=_database) as session:
-        # Timing: inizia DOPO aver aperto la sessione
+    global _async_driver, _async_database
+    if not _async_driver:
+        raise Exception("Connessione asincrona a Neo4j non stabilita.")
+
+    async with _async_driver.session(database=_async_database) as session:
         start_time = time.perf_counter()
-        
-        result = session.run(query, parameters or {})
-        
-        # Consuma i record
-        records = [record for record in result]
-        
+
+        result = await session.run(query, parameters or {})
+        records = [record async for record in result]
+
         end_time = time.perf_counter()
         total_time = (end_time - start_time) * 1000  # in millisecondi
-        
+
         return {
-            'records': records,
             'total_records': len(records),
             'execution_time_ms': total_time,
             'query': query,
@@ -2,7 +2,10 @@ import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import stats
+from results_store import DEFAULT_STORE_DIR
+from plot_queries import DBMS_PREFIXES
+from plot_stats import StatsIndex, StoreCell, render_figures, INDEX_FILE
+from scaling_fit import fit_scaling, fits_to_rows, EXTRAPOLATION_FACTORS
 
 
 def collect_input_paths_all_sizes(base_dir, dataset_sizes, mode):
@@ -13,13 +16,8 @@ def collect_input_paths_all_sizes(base_dir, dataset_sizes, mode):
     with naming convention: {dbms}_query{N}_{dbms}_{mode}.csv
     """
     queries = ["query1", "query2", "query3", "query4"]
-    dbms_prefixes = {
-        "MongoDB": "mongodb",
-        "ArangoDB": "arangodb",
-        "Neo4j": "neo4j"
-    }
     
-    input_matrix = {q: {db: [] for db in dbms_prefixes} for q in queries}
+    input_matrix = {q: {db: [] for db in DBMS_PREFIXES} for q in queries}
     
     for size in dataset_sizes:
         # New structure: just the size number (e.g., "25", "50")
@@ -27,7 +25,7 @@ def collect_input_paths_all_sizes(base_dir, dataset_sizes, mode):
         base_path = os.path.join(base_dir, dataset_folder)
         
         for q in queries:
-            for db, prefix in dbms_prefixes.items():
+            for db, prefix in DBMS_PREFIXES.items():
                 # File naming: {prefix}_{query}_{prefix}_{mode}.csv
                 fname = f"{prefix}_{q}_{prefix}_{mode}.csv"
                 file_path = os.path.join(base_path, fname)
@@ -36,10 +34,83 @@ def collect_input_paths_all_sizes(base_dir, dataset_sizes, mode):
     return input_matrix
 
 
-def plot_query_vs_size(input_matrix, dataset_sizes, mode, results_dir="results"):
+def store_input_cells_all_sizes(store_path, dataset_sizes, mode, run_id=None, git_revision=None):
+    """
+    Same {query: {DBMS: [sources]}} matrix as collect_input_paths_all_sizes, pointing
+    at cells of the columnar results store (see results_store.py) instead of CSV files.
+
+    By default each cell uses its latest run; run_id and git_revision select another
+    run (see plot_stats.StoreCell), and run_id=results_store.ALL_RUNS ("all") pools every run.
+    """
+    return {
+        f"query{q}": {
+            db: [StoreCell(store_path, prefix, int(size), q, mode, run_id, git_revision) for size in dataset_sizes]
+            for db, prefix in DBMS_PREFIXES.items()
+        }
+        for q in range(1, 5)
+    }
+
+
+def render_size_comparison(filename, means, cis, dataset_sizes, title, dbms_labels, colors, fit_lines=None,
+                           extrapolated_sizes=()):
+    """
+    Draws one grouped bar chart (DBMS x dataset size, log scale) and saves it to filename.
+    Module-level so that it can run in a worker process.
+
+    fit_lines maps a DBMS to the predictions of its best scaling model at every
+    measured and extrapolated size ('predicted', 'pi_low', 'pi_high', 'label'):
+    drawn as a dashed line, with prediction intervals on the extrapolated points.
+    """
+    fit_lines = fit_lines or {}
+    x = np.arange(len(dataset_sizes))
+    x_all = np.arange(len(dataset_sizes) + len(extrapolated_sizes))
+    width = 0.25
+    fig, ax = plt.subplots(figsize=(8 + 1.5 * len(extrapolated_sizes) if fit_lines else 8, 5))
+    
+    for idx, db in enumerate(dbms_labels):
+        ax.bar(x + idx*width - width, means[db], width, yerr=cis[db], capsize=5,
+               label=db, color=colors[idx], edgecolor="black")
+        line = fit_lines.get(db)
+        if line:
+            offset = idx*width - width
+            ax.plot(x_all + offset, line['predicted'], linestyle="--", marker=".", color=colors[idx],
+                    markeredgecolor="black", label=line['label'])
+            extra = slice(len(dataset_sizes), None)
+            predicted = np.array(line['predicted'][extra])
+            ax.errorbar(x_all[extra] + offset, predicted,
+                        yerr=[predicted - np.array(line['pi_low'][extra]), np.array(line['pi_high'][extra]) - predicted],
+                        fmt="o", color=colors[idx], markeredgecolor="black", capsize=4)
+    
+    if fit_lines and extrapolated_sizes:
+        ax.axvline(len(dataset_sizes) - 0.5, color="grey", linestyle=":")
+    ax.set_xticks(x_all if fit_lines else x)
+    ax.set_xticklabels([f"{sz}" for sz in dataset_sizes] +
+                       ([f"{sz} (pred.)" for sz in extrapolated_sizes] if fit_lines else []))
+    ax.set_xlabel('Dataset size')
+    ax.set_ylabel('Average execution time (ms)')
+    ax.set_yscale('log')
+    ax.set_title(title)
+    ax.legend(fontsize="small")
+    plt.tight_layout()
+    
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Saved: {filename}")
+
+
+def plot_query_vs_size(input_matrix, dataset_sizes, mode, results_dir="results", workers=None, force=False,
+                       fit_scaling_laws=True):
     """
     Creates bar charts comparing DBMS performance across different dataset sizes.
     Uses logarithmic scale on Y-axis for better visualization.
+
+    With fit_scaling_laws, each (DBMS, query) is fitted against dataset size (power
+    law, linear, n log n; see scaling_fit.py). The best model by AIC is overlaid,
+    with predictions at EXTRAPOLATION_FACTORS times the largest size. All fits are
+    saved to scaling_fits_{mode}.csv in results_dir.
+
+    Statistics come from the stats index in results_dir and unchanged figures are
+    skipped; the others are rendered in parallel (see plot_stats.render_figures).
     """
     if not os.path.exists(results_dir):
         os.makedirs(results_dir, exist_ok=True)
@@ -47,48 +118,48 @@ def plot_query_vs_size(input_matrix, dataset_sizes, mode, results_dir="results")
     dbms_labels = ["MongoDB", "ArangoDB", "Neo4j"]
     colors = ["#73c476", "#ffca56", "#659cef"]
     queries = list(input_matrix.keys())
-    
+
+    index = StatsIndex(os.path.join(results_dir, INDEX_FILE))
+    cell_stats = index.cell_stats([source for q in queries for db in dbms_labels for source in input_matrix[q][db]])
+
+    numeric_sizes = [float(size) for size in dataset_sizes]
+    extrapolated_sizes = [f"{max(numeric_sizes) * factor:g}" for factor in EXTRAPOLATION_FACTORS]
+    jobs, fit_rows = [], []
     for q in queries:
-        means = {db: [] for db in dbms_labels}
-        cis = {db: [] for db in dbms_labels}
-        
-        for db in dbms_labels:
-            for file in input_matrix[q][db]:
-                # Check if file exists
-                if not os.path.exists(file):
-                    print(f"Warning: File not found: {file}")
-                    means[db].append(np.nan)
-                    cis[db].append(0)
+        summaries = {db: [cell_stats[source] for source in input_matrix[q][db]] for db in dbms_labels}
+        fit_lines = {}
+        if fit_scaling_laws:
+            for db in dbms_labels:
+                fits = fit_scaling(numeric_sizes, summaries[db])
+                if not fits:
                     continue
-                
-                df = pd.read_csv(file)
-                times = df["execution_time_ms"]
-                mean = np.mean(times)
-                ci = stats.sem(times) * stats.t.ppf((1 + 0.95) / 2., len(times)-1) if len(times) > 1 else 0
-                means[db].append(mean)
-                cis[db].append(ci)
-        
-        x = np.arange(len(dataset_sizes))
-        width = 0.25
-        fig, ax = plt.subplots(figsize=(8, 5))
-        
-        for idx, db in enumerate(dbms_labels):
-            ax.bar(x + idx*width - width, means[db], width, yerr=cis[db], capsize=5,
-                   label=db, color=colors[idx], edgecolor="black")
-        
-        ax.set_xticks(x)
-        ax.set_xticklabels([f"{sz}" for sz in dataset_sizes])
-        ax.set_xlabel('Dataset size')
-        ax.set_ylabel('Average execution time (ms)')
-        ax.set_yscale('log')
-        ax.set_title(f"Benchmark on Dataset Size (log scale Y)\n{mode.capitalize()} - {q.replace('query', 'Query ')}")
-        ax.legend()
-        plt.tight_layout()
-        
-        filename = os.path.join(results_dir, f"{q}_comparison_{mode}_log.png")
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        print(f"Saved: {filename}")
+                fit_rows.extend(fits_to_rows(fits, dbms=DBMS_PREFIXES[db], query=q, mode=mode))
+                best = fits[0]
+                power = next(fit for fit in fits if fit['model'] == "power")
+                fit_lines[db] = {
+                    'predicted': [p['predicted_ms'] for p in best['predictions']],
+                    'pi_low': [p['pi_low_ms'] for p in best['predictions']],
+                    'pi_high': [p['pi_high_ms'] for p in best['predictions']],
+                    'label': f"{db} fit: {best['model']} (n^{power['exponent']:.2f} "
+                             f"[{power['exponent_ci_low']:.2f}, {power['exponent_ci_high']:.2f}])",
+                }
+        jobs.append((render_size_comparison, {
+            'fit_lines': fit_lines,
+            'extrapolated_sizes': extrapolated_sizes if fit_lines else [],
+            'filename': os.path.join(results_dir, f"{q}_comparison_{mode}_log.png"),
+            'means': {db: [s['mean'] if s else np.nan for s in summaries[db]] for db in dbms_labels},
+            'cis': {db: [s['ci'] if s else 0 for s in summaries[db]] for db in dbms_labels},
+            'dataset_sizes': list(dataset_sizes),
+            'title': f"Benchmark on Dataset Size (log scale Y)\n{mode.capitalize()} - {q.replace('query', 'Query ')}",
+            'dbms_labels': dbms_labels,
+            'colors': colors,
+        }))
+
+    if fit_rows:
+        fits_csv = os.path.join(results_dir, f"scaling_fits_{mode}.csv")
+        pd.DataFrame(fit_rows).to_csv(fits_csv, index=False)
+        print(f"Saved: {fits_csv}")
+    return render_figures(jobs, index, workers=workers, force=force)
 
 
 if __name__ == "__main__":
@@ -96,8 +167,14 @@ if __name__ == "__main__":
     # Updated to match the new naming convention (no "x" suffix)
     dataset_sizes = ["25", "50", "75", "100"]  # Aggiungi le dimensioni che hai
     mode = "cold"   # "cold" or "warm"
+    run_id = None   # store only: None = latest run per cell, "all" = every run
     
-    input_matrix = collect_input_paths_all_sizes(base_dir, dataset_sizes, mode)
+    # Columnar store (see results_store.py) when present, per-cell CSVs otherwise
+    store_path = os.path.join(base_dir, DEFAULT_STORE_DIR)
+    if os.path.isdir(store_path):
+        input_matrix = store_input_cells_all_sizes(store_path, dataset_sizes, mode, run_id)
+    else:
+        input_matrix = collect_input_paths_all_sizes(base_dir, dataset_sizes, mode)
     plot_query_vs_size(
         input_matrix, dataset_sizes, mode, results_dir="results"
     )
@@ -0,0 +1,81 @@
+import os
+import pandas as pd
+import matplotlib.pyplot as plt
+
+
+def collect_concurrency_paths(base_dir, dataset_size):
+    """
+    Collects the concurrency sweep CSVs for one dataset size.
+
+    Files live next to the cold/warm results (e.g., "25/")
+    with naming convention: {dbms}_query{N}_{dbms}_concurrency.csv
+    """
+    base_path = os.path.join(base_dir, f"{dataset_size}")
+
+    queries = ["query1", "query2", "query3", "query4"]
+    dbms_prefixes = {
+        "MongoDB": "mongodb",
+        "ArangoDB": "arangodb",
+        "Neo4j": "neo4j"
+    }
+
+    files = {q: {} for q in queries}
+    for q in queries:
+        for db, prefix in dbms_prefixes.items():
+            fname = f"{prefix}_{q}_{prefix}_concurrency.csv"
+            files[q][db] = os.path.join(base_path, fname)
+
+    return files
+
+
+def plot_throughput_vs_clients(file_matrix, title_prefix="Concurrency", results_dir="results"):
+    """
+    Plots throughput (queries/s) and p99 latency against the number of clients,
+    one figure per query with one line per DBMS.
+    """
+    if not os.path.exists(results_dir):
+        os.makedirs(results_dir, exist_ok=True)
+
+    dbms_labels = ["MongoDB", "ArangoDB", "Neo4j"]
+    colors = ["#73c476", "#ffca56", "#659cef"]
+
+    for query in file_matrix:
+        fig, (ax_tp, ax_lat) = plt.subplots(1, 2, figsize=(11, 4.5))
+
+        for dbms, color in zip(dbms_labels, colors):
+            file_path = file_matrix[query][dbms]
+            if not os.path.exists(file_path):
+                print(f"Warning: File not found: {file_path}")
+                continue
+
+            df = pd.read_csv(file_path)
+            ax_tp.plot(df["clients"], df["throughput_qps"], marker="o", label=dbms, color=color)
+            ax_lat.plot(df["clients"], df["p99_ms"], marker="o", label=dbms, color=color)
+
+        for ax in (ax_tp, ax_lat):
+            ax.set_xscale('log', base=2)
+            ax.set_xlabel('Concurrent clients')
+            ax.grid(True, which="both", alpha=0.3)
+            ax.legend()
+        ax_tp.set_ylabel('Throughput (queries/s)')
+        ax_lat.set_ylabel('p99 latency (ms)')
+        ax_lat.set_yscale('log')
+        fig.suptitle(f"{title_prefix} - {query.capitalize()}")
+        plt.tight_layout()
+
+        filename = os.path.join(results_dir, f"{query}_{title_prefix.replace(' ', '_')}.png")
+        plt.savefig(filename, dpi=300, bbox_inches='tight')
+        plt.close(fig)
+        print(f"Grafico salvato: {filename}")
+
+
+if __name__ == "__main__":
+    base_dir = "."
+    dataset_size = "100"   # "25", "50", etc.
+
+    file_matrix = collect_concurrency_paths(base_dir, dataset_size)
+    plot_throughput_vs_clients(
+        file_matrix,
+        title_prefix=f"Concurrency_{dataset_size}",
+        results_dir="results"
+    )
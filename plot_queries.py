@@ -1,8 +1,15 @@
 import os
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import stats
+from results_store import DEFAULT_STORE_DIR
+from plot_stats import StatsIndex, StoreCell, render_figures, INDEX_FILE
+
+
+DBMS_PREFIXES = {
+    "MongoDB": "mongodb",
+    "ArangoDB": "arangodb",
+    "Neo4j": "neo4j"
+}
 
 
 def collect_input_paths(base_dir, dataset_size, mode):
@@ -16,16 +23,11 @@ def collect_input_paths(base_dir, dataset_size, mode):
     base_path = os.path.join(base_dir, dataset_folder)
     
     queries = ["query1", "query2", "query3", "query4"]
-    dbms_prefixes = {
-        "MongoDB": "mongodb",
-        "ArangoDB": "arangodb",
-        "Neo4j": "neo4j"
-    }
     
     files = {q: {} for q in queries}
     
     for q in queries:
-        for db, prefix in dbms_prefixes.items():
+        for db, prefix in DBMS_PREFIXES.items():
             # File naming: {prefix}_{query}_{prefix}_{mode}.csv
             fname = f"{prefix}_{q}_{prefix}_{mode}.csv"
             files[q][db] = os.path.join(base_path, fname)
@@ -33,9 +35,50 @@ def collect_input_paths(base_dir, dataset_size, mode):
     return files
 
 
-def plot_all_queries(file_matrix, title_prefix="Benchmark", ylabel="Average execution time (ms)", results_dir="results"):
+def store_input_cells(store_path, dataset_size, mode, run_id=None, git_revision=None):
+    """
+    Same {query: {DBMS: source}} matrix as collect_input_paths, pointing at cells
+    of the columnar results store (see results_store.py) instead of CSV files.
+
+    By default each cell uses its latest run; run_id and git_revision select another
+    run (see plot_stats.StoreCell), and run_id=results_store.ALL_RUNS ("all") pools every run.
+    """
+    return {
+        f"query{q}": {
+            db: StoreCell(store_path, prefix, int(dataset_size), q, mode, run_id, git_revision)
+            for db, prefix in DBMS_PREFIXES.items()
+        }
+        for q in range(1, 5)
+    }
+
+
+def render_query_bars(filename, means, cis, title, ylabel, dbms_labels, colors):
+    """
+    Draws one bar chart (one bar per DBMS) and saves it to filename.
+    Module-level so that it can run in a worker process.
+    """
+    fig, ax = plt.subplots(figsize=(6, 5))
+    x = np.arange(len(dbms_labels))
+    ax.bar(x, means, yerr=cis, capsize=5, color=colors, edgecolor="black")
+    ax.set_xticks(x)
+    ax.set_xticklabels(dbms_labels)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel('DBMS')
+    ax.set_title(title)
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Grafico salvato: {filename}")
+
+
+def plot_all_queries(file_matrix, title_prefix="Benchmark", ylabel="Average execution time (ms)",
+                     results_dir="results", workers=None, force=False):
     """
     Creates bar charts comparing DBMS performance for each query.
+
+    Mean and CI of every input come from the stats index in results_dir (recomputed
+    only for changed inputs); figures whose inputs did not change are not redrawn,
+    the others are rendered in parallel (see plot_stats.render_figures).
     """
     if not os.path.exists(results_dir):
         os.makedirs(results_dir, exist_ok=True)
@@ -43,42 +86,23 @@ def plot_all_queries(file_matrix, title_prefix="Benchmark", ylabel="Average exec
     dbms_labels = ["MongoDB", "ArangoDB", "Neo4j"]
     colors = ["#73c476", "#ffca56", "#659cef"]
     queries = list(file_matrix.keys())
-    
-    for i, query in enumerate(queries):
-        means = []
-        cis = []
-        
-        for dbms in dbms_labels:
-            file_path = file_matrix[query][dbms]
-            
-            # Check if file exists before processing
-            if not os.path.exists(file_path):
-                print(f"Warning: File not found: {file_path}")
-                means.append(0)
-                cis.append(0)
-                continue
-            
-            df = pd.read_csv(file_path)
-            times = df["execution_time_ms"]
-            mean = np.mean(times)
-            ci = stats.sem(times) * stats.t.ppf((1 + 0.95) / 2., len(times)-1) if len(times) > 1 else 0
-            means.append(mean)
-            cis.append(ci)
-        
-        fig, ax = plt.subplots(figsize=(6, 5))
-        x = np.arange(3)
-        ax.bar(x, means, yerr=cis, capsize=5, color=colors, edgecolor="black")
-        ax.set_xticks(x)
-        ax.set_xticklabels(dbms_labels)
-        ax.set_ylabel(ylabel)
-        ax.set_xlabel('DBMS')
-        ax.set_title(f"{title_prefix} - {query.capitalize()}")
-        plt.tight_layout()
-        
-        filename = os.path.join(results_dir, f"{query}_{title_prefix.replace(' ', '_')}.png")
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        print(f"Grafico salvato: {filename}")
+
+    index = StatsIndex(os.path.join(results_dir, INDEX_FILE))
+    cell_stats = index.cell_stats([file_matrix[query][dbms] for query in queries for dbms in dbms_labels])
+
+    jobs = []
+    for query in queries:
+        summaries = [cell_stats[file_matrix[query][dbms]] for dbms in dbms_labels]
+        jobs.append((render_query_bars, {
+            'filename': os.path.join(results_dir, f"{query}_{title_prefix.replace(' ', '_')}.png"),
+            'means': [summary['mean'] if summary else 0 for summary in summaries],
+            'cis': [summary['ci'] if summary else 0 for summary in summaries],
+            'title': f"{title_prefix} - {query.capitalize()}",
+            'ylabel': ylabel,
+            'dbms_labels': dbms_labels,
+            'colors': colors,
+        }))
+    return render_figures(jobs, index, workers=workers, force=force)
 
 
 if __name__ == "__main__":
@@ -86,8 +110,14 @@ if __name__ == "__main__":
     base_dir = "."
     dataset_size = "100"   # "25", "50", etc. (basato sulla nuova nomenclatura)
     mode = "warm"         # "cold" or "warm"
+    run_id = None         # store only: None = latest run per cell, "all" = every run
     
-    file_matrix = collect_input_paths(base_dir, dataset_size, mode)
+    # Columnar store (see results_store.py) when present, per-cell CSVs otherwise
+    store_path = os.path.join(base_dir, DEFAULT_STORE_DIR)
+    if os.path.isdir(store_path):
+        file_matrix = store_input_cells(store_path, dataset_size, mode, run_id)
+    else:
+        file_matrix = collect_input_paths(base_dir, dataset_size, mode)
     
     plot_all_queries(
         file_matrix,
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from scipy import stats
+
+from results_store import ALL_RUNS, latest_run_per_cell, open_dataset
+
+
+# One (dbms, scale, query, mode) cell of the columnar results store. run_id and
+# git_revision select the run: by default the latest run of the cell (among those of
+# git_revision, when given); run_id=ALL_RUNS pools every run
+StoreCell = namedtuple("StoreCell", ["store_path", "dbms", "scale", "query", "mode", "run_id", "git_revision"],
+                       defaults=(None, None))
+
+INDEX_FILE = ".plot_stats_index.json"
+
+# Bumped when the cached statistics change: older indexes are discarded
+INDEX_VERSION = 2
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _partition_fingerprint(store_path, dbms, scale):
+    """Store files are never rewritten: the file listing identifies the partition content."""
+    partition = os.path.join(store_path, f"dbms={dbms}", f"scale={scale}")
+    if not os.path.isdir(partition):
+        return None
+    entries = sorted(
+        (entry.name, entry.stat().st_size) for entry in os.scandir(partition) if entry.name.endswith(".parquet")
+    )
+    return hashlib.sha1(json.dumps(entries).encode()).hexdigest()
+
+
+def _source_key(source):
+    if isinstance(source, StoreCell):
+        return (f"store:{os.path.abspath(source.store_path)}:{source.dbms}:{source.scale}:{source.query}:"
+                f"{source.mode}:{source.run_id or 'latest'}:{source.git_revision or '*'}")
+    return f"csv:{os.path.abspath(source)}"
+
+
+def _describe(frame, keys):
+    """
+    Per key, in one pass: n, mean and t-based 95% CI half-width of execution_time_ms,
+    plus the standard deviation and the mean/std of log(time) used by the scaling fits.
+    """
+    frame = frame.assign(log_time=np.log(frame["execution_time_ms"].clip(lower=1e-9)))
+    grouped = frame.groupby(keys).agg(
+        count=("execution_time_ms", "count"), mean=("execution_time_ms", "mean"),
+        std=("execution_time_ms", "std"), log_mean=("log_time", "mean"), log_std=("log_time", "std"),
+    )
+    n = grouped["count"].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_crit = stats.t.ppf((1 + 0.95) / 2., np.maximum(n - 1, 1))
+        ci = np.where(n > 1, grouped["std"].to_numpy() / np.sqrt(n) * t_crit, 0.0)
+
+    def optional(value):
+        return None if pd.isna(value) else float(value)
+
+    return {
+        key: {"n": int(count), "mean": float(mean), "ci": float(half_width), "std": optional(std),
+              "log_mean": float(log_mean), "log_std": optional(log_std)}
+        for key, count, mean, half_width, std, log_mean, log_std in zip(
+            grouped.index, n, grouped["mean"], ci, grouped["std"], grouped["log_mean"], grouped["log_std"]
+        )
+    }
+
+
+class StatsIndex:
+    """
+    Persistent cache of per-cell statistics (n, mean, 95% CI) and of rendered figures.
+
+    CSV sources are keyed by path and validated by mtime and size; when those change
+    the content hash is compared, so a touched but identical file is not recomputed.
+    Store cells are validated by the file listing of their dbms/scale partition and
+    keyed by their run selector, so a new run invalidates the latest-run statistics.
+    Figures are skipped when the fingerprint of their inputs is unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sources = {}
+        self.figures = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.sources = data.get("sources", {})
+                self.figures = data.get("figures", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "sources": self.sources, "figures": self.figures}, f)
+        os.replace(tmp_path, self.path)
+
+    def _csv_is_current(self, key, path):
+        entry = self.sources.get(key)
+        stat = os.stat(path)
+        if entry is None:
+            return False
+        if entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            return True
+        if entry.get("content_hash") == _file_hash(path):
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+            return True
+        return False
+
+    def cell_stats(self, sources):
+        """
+        Statistics for every source (CSV path or StoreCell), recomputing only stale ones.
+
+        All stale CSVs are concatenated and all stale store cells with the same run
+        selector read in a single filtered scan, then described with one groupby.
+
+        Returns:
+            dict: source -> {'n', 'mean', 'ci', 'std', 'log_mean', 'log_std'}, or None for
+                missing/empty sources
+        """
+        result, stale_csv, stale_cells = {}, [], []
+        for source in sources:
+            key = _source_key(source)
+            if isinstance(source, StoreCell):
+                fingerprint = _partition_fingerprint(source.store_path, source.dbms, source.scale)
+                if fingerprint is None:
+                    result[source] = None
+                elif self.sources.get(key, {}).get("fingerprint") == fingerprint:
+                    result[source] = self.sources[key]["stats"]
+                else:
+                    stale_cells.append((source, fingerprint))
+            elif not os.path.exists(source):
+                print(f"Warning: File not found: {source}")
+                result[source] = None
+            elif self._csv_is_current(key, source):
+                result[source] = self.sources[key]["stats"]
+            else:
+                stale_csv.append(source)
+
+        if stale_csv:
+            frames = []
+            for path in stale_csv:
+                df = pd.read_csv(path)
+                # Warm-up iterations detected by the runner are kept in the CSV but excluded here
+                if "warmup" in df.columns:
+                    df = df[df["warmup"] == 0]
+                frames.append(pd.DataFrame({"source": path, "execution_time_ms": df["execution_time_ms"]}))
+            described = _describe(pd.concat(frames, ignore_index=True), "source")
+            for path in stale_csv:
+                stat = os.stat(path)
+                result[path] = described.get(path)
+                self.sources[_source_key(path)] = {
+                    "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                    "content_hash": _file_hash(path), "stats": result[path],
+                }
+
+        by_store = {}
+        for cell, fingerprint in stale_cells:
+            by_store.setdefault((cell.store_path, cell.run_id, cell.git_revision), []).append((cell, fingerprint))
+        for (store_path, run_id, git_revision), cells in by_store.items():
+            partitions = None
+            for dbms, scale in {(cell.dbms, cell.scale) for cell, _ in cells}:
+                condition = (ds.field("dbms") == dbms) & (ds.field("scale") == scale)
+                partitions = condition if partitions is None else partitions | condition
+            expression = partitions & (ds.field("warmup") == False)  # noqa: E712
+            if run_id not in (None, ALL_RUNS):
+                expression &= ds.field("run_id") == run_id
+            if git_revision is not None:
+                expression &= ds.field("git_revision") == git_revision
+            frame = open_dataset(store_path).to_table(
+                columns=["dbms", "scale", "query", "mode", "run_id", "started_at", "execution_time_ms"],
+                filter=expression,
+            ).to_pandas()
+            if run_id != ALL_RUNS:
+                frame = latest_run_per_cell(frame)
+            described = _describe(frame, ["dbms", "scale", "query", "mode"]) if not frame.empty else {}
+            for cell, fingerprint in cells:
+                result[cell] = described.get((cell.dbms, cell.scale, cell.query, cell.mode))
+                self.sources[_source_key(cell)] = {"fingerprint": fingerprint, "stats": result[cell]}
+
+        return result
+
+
+def _figure_fingerprint(func, kwargs):
+    payload = json.dumps([func.__module__, func.__name__, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def render_figures(jobs, index, workers=None, force=False):
+    """
+    Renders figures in a process pool, skipping those whose inputs are unchanged.
+
+    Args:
+        jobs (list): (func, kwargs) pairs; func is a module-level function that draws one
+            figure to kwargs['filename'] (it must be picklable)
+        index (StatsIndex): holds the fingerprints of the rendered figures
+        workers (int): processes (default: os.cpu_count())
+        force (bool): re-render every figure
+
+    Returns:
+        list: filenames rendered in this call
+    """
+    pending = []
+    for func, kwargs in jobs:
+        filename = kwargs["filename"]
+        fingerprint = _figure_fingerprint(func, kwargs)
+        if not force and os.path.exists(filename) and index.figures.get(filename) == fingerprint:
+            continue
+        pending.append((func, kwargs, fingerprint))
+
+    print(f"Figures: {len(pending)} to render, {len(jobs) - len(pending)} up to date")
+    if len(pending) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(executor.submit(func, **kwargs), kwargs, fingerprint) for func, kwargs, fingerprint in pending]
+            for future, kwargs, fingerprint in futures:
+                future.result()
+                index.figures[kwargs["filename"]] = fingerprint
+    else:
+        for func, kwargs, fingerprint in pending:
+            func(**kwargs)
+            index.figures[kwargs["filename"]] = fingerprint
+    index.save()
+    return [kwargs["filename"] for _, kwargs, _ in pending]
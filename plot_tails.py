@@ -0,0 +1,185 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from results_store import load_execution_times, CELL_KEYS
+from plot_queries import DBMS_PREFIXES
+from plot_stats import StatsIndex, render_figures, INDEX_FILE
+
+
+TAIL_PERCENTILES = [50, 90, 99, 99.9]
+
+# A cell "diverges" when its p99 is at least this many times its mean: the mean
+# hides stalls (GC, compaction, checkpoints) or a second mode in the distribution
+TAIL_DIVERGENCE_RATIO = 2.0
+
+DBMS_COLORS = {"MongoDB": "#73c476", "ArangoDB": "#ffca56", "Neo4j": "#659cef"}
+
+
+def _percentile_column(pct):
+    return f"p{pct:g}".replace(".", "_") + "_ms"
+
+
+def tail_report(times, divergence_ratio=TAIL_DIVERGENCE_RATIO):
+    """
+    Per-cell tail statistics: n, mean, p50/p90/p99/p99.9, max and p99/mean ratio.
+
+    A percentile p is only resolved with at least 100 / (100 - p) samples: with
+    fewer, p99 and p99.9 are an interpolation towards the max. The `p99_resolved`
+    column marks the cells with enough samples (n >= 100).
+
+    Args:
+        times (pandas.DataFrame): dbms, scale, query, mode, execution_time_ms
+            (see results_store.load_execution_times)
+        divergence_ratio (float): p99/mean ratio above which a cell is flagged
+
+    Returns:
+        pandas.DataFrame: one row per cell
+    """
+    grouped = times.groupby(CELL_KEYS)["execution_time_ms"]
+    report = grouped.agg(n="count", mean_ms="mean", max_ms="max")
+    for pct in TAIL_PERCENTILES:
+        report[_percentile_column(pct)] = grouped.quantile(pct / 100)
+    report = report.reset_index()
+    report["p99_over_mean"] = report["p99_ms"] / report["mean_ms"]
+    report["p99_over_p50"] = report["p99_ms"] / report["p50_ms"]
+    report["p99_resolved"] = report["n"] >= 100
+    report["tail_divergent"] = report["p99_over_mean"] >= divergence_ratio
+    return report
+
+
+def render_ecdf(filename, series, title):
+    """
+    Draws the ECDFs of one query and mode: one line per (DBMS, size), colored by
+    DBMS and darker for larger sizes; divergent cells are drawn thicker.
+    Module-level so that it can run in a worker process.
+    """
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for entry in series:
+        values = np.sort(entry["times"])
+        ax.step(values, np.arange(1, len(values) + 1) / len(values), where="post",
+                color=entry["color"], alpha=entry["alpha"], linewidth=2.5 if entry["divergent"] else 1.2,
+                label=entry["label"])
+    ax.set_xscale("log")
+    ax.axhline(0.99, color="grey", linestyle=":", linewidth=1)
+    ax.text(ax.get_xlim()[0], 0.99, " p99", va="bottom", color="grey", fontsize="small")
+    ax.set_xlabel("Execution time (ms)")
+    ax.set_ylabel("Fraction of executions")
+    ax.set_title(title)
+    ax.legend(fontsize="x-small", ncol=3)
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300, bbox_inches="tight")
+    plt.close(fig)
+    print(f"Saved: {filename}")
+
+
+def render_violins(filename, groups, dataset_sizes, dbms_labels, title):
+    """
+    Draws violins of one query and mode: dataset sizes on the x axis, one violin per
+    DBMS, with the p99 marked; red markers flag divergent cells.
+    Module-level so that it can run in a worker process.
+    """
+    fig, ax = plt.subplots(figsize=(9, 5))
+    width = 0.25
+    for idx, db in enumerate(dbms_labels):
+        for pos, size in enumerate(dataset_sizes):
+            cell = groups.get(db, {}).get(size)
+            if not cell:
+                continue
+            x = pos + idx * width - width
+            parts = ax.violinplot([np.log10(cell["times"])], positions=[x], widths=width * 0.9,
+                                  showmedians=True, showextrema=True)
+            for body in parts["bodies"]:
+                body.set_facecolor(DBMS_COLORS[db])
+                body.set_edgecolor("black")
+                body.set_alpha(0.8)
+            for key in ("cmedians", "cmins", "cmaxes", "cbars"):
+                parts[key].set_color("black")
+                parts[key].set_linewidth(0.8)
+            ax.plot(x, np.log10(cell["p99"]), marker="_", markersize=14,
+                    color="red" if cell["divergent"] else "black")
+    handles = [Patch(facecolor=DBMS_COLORS[db], edgecolor="black", label=db) for db in dbms_labels]
+    handles += [
+        Line2D([], [], marker="_", color="black", linestyle="", markersize=14, label="p99"),
+        Line2D([], [], marker="_", color="red", linestyle="", markersize=14, label="p99 (tail diverges)"),
+    ]
+    ax.set_xticks(np.arange(len(dataset_sizes)))
+    ax.set_xticklabels(dataset_sizes)
+    ax.set_xlabel("Dataset size")
+    ax.set_ylabel("log10 execution time (ms)")
+    ax.set_title(title)
+    ax.legend(handles=handles, fontsize="small")
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300, bbox_inches="tight")
+    plt.close(fig)
+    print(f"Saved: {filename}")
+
+
+def plot_tails(times, results_dir="results", workers=None, force=False, divergence_ratio=TAIL_DIVERGENCE_RATIO):
+    """
+    Writes tail_report.csv and one ECDF and one violin figure per (query, mode),
+    across DBMSs and dataset sizes. Divergent cells are listed on stdout.
+
+    Figures go through plot_stats.render_figures: unchanged ones are skipped and
+    the others rendered in parallel.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    report = tail_report(times, divergence_ratio)
+    report_csv = os.path.join(results_dir, "tail_report.csv")
+    report.to_csv(report_csv, index=False)
+    print(f"Saved: {report_csv}")
+
+    divergent = report[report["tail_divergent"]]
+    if not divergent.empty:
+        print(f"Cells with p99 >= {divergence_ratio:g}x mean:")
+        print(divergent[CELL_KEYS + ["n", "mean_ms", "p50_ms", "p99_ms", "max_ms", "p99_over_mean"]]
+              .to_string(index=False, float_format=lambda value: f"{value:.1f}"))
+
+    labels = {prefix: db for db, prefix in DBMS_PREFIXES.items()}
+    dbms_labels = [db for db, prefix in DBMS_PREFIXES.items() if prefix in set(report["dbms"])]
+    summary = report.set_index(CELL_KEYS)
+    samples = {key: group["execution_time_ms"].tolist() for key, group in times.groupby(CELL_KEYS)}
+
+    jobs = []
+    for (query, mode), cells in report.groupby(["query", "mode"]):
+        sizes = sorted(cells["scale"].unique())
+        series, groups = [], {}
+        for prefix in DBMS_PREFIXES.values():
+            for rank, size in enumerate(sizes):
+                key = (prefix, size, query, mode)
+                if key not in samples:
+                    continue
+                cell = summary.loc[key]
+                db = labels[prefix]
+                series.append({
+                    "times": samples[key], "color": DBMS_COLORS[db], "alpha": 0.35 + 0.65 * (rank + 1) / len(sizes),
+                    "divergent": bool(cell["tail_divergent"]),
+                    "label": f"{db} {size}" + (" (tail!)" if cell["tail_divergent"] else ""),
+                })
+                groups.setdefault(db, {})[str(size)] = {
+                    "times": samples[key], "p99": float(cell["p99_ms"]), "divergent": bool(cell["tail_divergent"]),
+                }
+        title = f"Query {query} - {mode.capitalize()}"
+        jobs.append((render_ecdf, {
+            "filename": os.path.join(results_dir, f"query{query}_ecdf_{mode}.png"),
+            "series": series,
+            "title": f"ECDF - {title}",
+        }))
+        jobs.append((render_violins, {
+            "filename": os.path.join(results_dir, f"query{query}_violin_{mode}.png"),
+            "groups": groups,
+            "dataset_sizes": [str(size) for size in sizes],
+            "dbms_labels": dbms_labels,
+            "title": f"Latency distribution - {title}",
+        }))
+
+    index = StatsIndex(os.path.join(results_dir, INDEX_FILE))
+    render_figures(jobs, index, workers=workers, force=force)
+    return report
+
+
+if __name__ == "__main__":
+    # Results store, a folder containing it, or the {scale}/ CSV tree
+    base_dir = "."
+    plot_tails(load_execution_times(base_dir), results_dir="results")
@@ -1,6 +1,156 @@
 import time
 import csv
+import json
+import math
+import statistics
+import threading
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
+from scipy import stats
+from tracing import span
+from query_templates import resolve_parameters, ParameterSequence
+from resource_sampler import read_network_bytes
+from latency_histogram import LatencyHistogram
+
+
+def detect_warmup(times):
+    """
+    Individua la fine del warm-up con la Marginal Standard Error Rule (MSER):
+    sceglie il numero di campioni iniziali d da scartare che minimizza
+    var(x[d:]) / (n - d), considerando al massimo metà della serie.
+
+    Args:
+        times (list): latenze nell'ordine di esecuzione
+
+    Returns:
+        int: numero di campioni iniziali da considerare warm-up
+    """
+    n = len(times)
+    if n < 4:
+        return 0
+    # Somme dei suffissi per valutare ogni troncamento in O(1)
+    suffix_sum = [0.0] * (n + 1)
+    suffix_sq = [0.0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix_sum[i] = suffix_sum[i + 1] + times[i]
+        suffix_sq[i] = suffix_sq[i + 1] + times[i] * times[i]
+
+    best_d, best_stat = 0, None
+    for d in range(n // 2 + 1):
+        m = n - d
+        mean = suffix_sum[d] / m
+        sum_sq_dev = max(suffix_sq[d] - m * mean * mean, 0.0)
+        stat = sum_sq_dev / (m * m)
+        if best_stat is None or stat < best_stat:
+            best_d, best_stat = d, stat
+    return best_d
+
+
+def ci_half_width(samples, confidence=0.95):
+    """
+    Semi-ampiezza dell'intervallo di confidenza della media (t di Student),
+    con la stessa formula usata dagli script di plot.
+
+    Returns:
+        float: semi-ampiezza (inf con meno di 2 campioni)
+    """
+    n = len(samples)
+    if n < 2:
+        return math.inf
+    return stats.t.ppf((1 + confidence) / 2., n - 1) * statistics.stdev(samples) / math.sqrt(n)
+
+
+# Metriche opzionali restituite dai connector e salvate come colonne aggiuntive nei CSV
+RESULT_METRIC_COLUMNS = [
+    'rows',
+    'time_to_first_row_ms',
+    'time_to_last_row_ms',
+    'fetch_round_trips',
+    'fetch_round_trips_est',
+    'rows_per_round_trip',
+    'server_time_ms',
+    'server_first_row_ms',
+    'client_overhead_ms',
+    'result_digest',
+    'result_bytes',
+]
+
+
+def _extract_metrics(result):
+    """Estrae dal risultato di query_func le metriche in RESULT_METRIC_COLUMNS (None se assenti)."""
+    if not isinstance(result, dict):
+        return {column: None for column in RESULT_METRIC_COLUMNS}
+    metrics = {column: result.get(column) for column in RESULT_METRIC_COLUMNS}
+    # Neo4j conta 'total_records', MongoDB e ArangoDB 'total_documents'
+    metrics['rows'] = result.get('total_records', result.get('total_documents'))
+    # Rete + driver + trasferimento: differenza tra tempo client e tempo riportato dal motore
+    if metrics['server_time_ms'] is not None and result.get('execution_time_ms') is not None:
+        metrics['client_overhead_ms'] = result['execution_time_ms'] - metrics['server_time_ms']
+    return metrics
+
+
+def _extract_elapsed(dbms_type, result):
+    """Estrae execution_time_ms dal risultato di query_func (0.0 se assente)."""
+    if isinstance(result, dict) and 'execution_time_ms' in result:
+        elapsed = result['execution_time_ms']
+        if elapsed is None:
+            print(f"  [ERROR] execution_time_ms è None per {dbms_type}!")
+            elapsed = 0.0
+    else:
+        print(f"  [ERROR] Result non valido da {dbms_type}: {type(result)}")
+        elapsed = 0.0
+    return elapsed
+
+
+def _sample_iterations(run_iteration, max_iterations, adaptive, ci_target, min_iterations, time_budget_s, label):
+    """
+    Ripete run_iteration fino a max_iterations. In modalità adattiva si ferma prima
+    quando, scartato il warm-up, la semi-ampiezza del CI al 95% scende sotto
+    ci_target * media, oppure quando si esaurisce time_budget_s.
+
+    run_iteration(i) restituisce un dict con almeno 'execution_time_ms'.
+
+    Returns:
+        tuple: (campioni di tutte le iterazioni, numero di iterazioni di warm-up)
+    """
+    samples = []
+    times = []
+    start = time.perf_counter()
+    for i in range(max_iterations):
+        sample = run_iteration(i)
+        samples.append(sample)
+        times.append(sample['execution_time_ms'])
+        if not adaptive or len(times) < min_iterations:
+            continue
+        steady = times[detect_warmup(times):]
+        if len(steady) >= min_iterations:
+            mean = sum(steady) / len(steady)
+            half_width = ci_half_width(steady)
+            if mean > 0 and half_width <= ci_target * mean:
+                print(f"[{label}] Convergenza dopo {len(times)} iterazioni "
+                      f"(CI ±{half_width:.2f} ms su media {mean:.2f} ms)")
+                break
+        if time_budget_s is not None and time.perf_counter() - start >= time_budget_s:
+            print(f"[{label}] Budget di tempo esaurito dopo {len(times)} iterazioni")
+            break
+    return samples, detect_warmup(times)
+
+
+def _write_rows_csv(path, rows):
+    """Scrive una lista di dict come CSV (colonne nell'ordine della prima riga)."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ['iteration'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _iteration_rows(samples, warmup_count):
+    return [
+        {'iteration': idx + 1, **sample, 'warmup': int(idx < warmup_count)}
+        for idx, sample in enumerate(samples)
+    ]
 
 
 def execute_cold_and_warm_queries(
@@ -12,12 +162,28 @@ def execute_cold_and_warm_queries(
     parameters=None,
     cold_iterations=31,
     warm_iterations=30,
-    output_prefix="query"
+    output_prefix="query",
+    adaptive=False,
+    ci_target=0.05,
+    min_iterations=5,
+    time_budget_s=None,
+    query_options=None,
+    resource_sampler=None,
+    modes=("cold", "warm"),
+    cache_flusher=None,
+    results_store=None
 ):
     """
     Esegue 31 cold run (ognuna con connect/disconnect) + 30 warm run (senza disconnect) e salva due CSV distinti.
     
-    Tutti i DBMS ora restituiscono timing SERVER-SIDE puri senza overhead.
+    I tempi sono misurati lato client dai connector (dall'invio della query al consumo
+    dei risultati). Con query_options={'server_timing': True} i connector riportano anche
+    il tempo misurato dal motore e il CSV include server_time_ms e client_overhead_ms.
+
+    Il warm-up iniziale di ogni serie viene individuato automaticamente (MSER): le
+    iterazioni corrispondenti restano nel CSV con warmup=1 e sono escluse dalle statistiche.
+    Con adaptive=True cold_iterations/warm_iterations diventano il budget massimo e il
+    campionamento si ferma appena il CI al 95% della media (senza warm-up) è abbastanza stretto.
 
     Args:
         dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
@@ -25,10 +191,23 @@ def execute_cold_and_warm_queries(
         close_func (callable): funzione per chiudere la connessione
         query_func (callable): funzione per lanciare la query
         query (str): query da eseguire
-        parameters (dict): parametri opzionali
-        cold_iterations (int): numero cold run (default 31)
-        warm_iterations (int): numero warm run (default 30)
+        parameters (dict | callable): parametri opzionali; se è un generatore (es.
+            ParameterSequence) ogni iterazione usa un nuovo set, salvato nella colonna 'parameters'
+        cold_iterations (int): numero cold run (default 31; massimo se adaptive)
+        warm_iterations (int): numero warm run (default 30; massimo se adaptive)
         output_prefix (str): prefisso file di output
+        adaptive (bool): ferma il campionamento alla convergenza del CI
+        ci_target (float): semi-ampiezza del CI al 95% obiettivo, come frazione della media
+        min_iterations (int): minimo di iterazioni stazionarie prima di valutare la convergenza
+        time_budget_s (float): budget di tempo opzionale per ciascuna serie (cold, warm)
+        query_options (dict): argomenti keyword aggiuntivi per query_func (es. server_timing)
+        resource_sampler (ResourceSampler): se presente, aggiunge per ogni iterazione CPU, RSS,
+            I/O e context switch dei processi server nella finestra della query
+        modes (tuple): serie da eseguire, 'cold' e/o 'warm' (default entrambe)
+        cache_flusher (CacheFlusher): se presente, ogni cold run parte con le cache invalidate
+            (true-cold) e il CSV registra i livelli svuotati nella colonna 'flushed_levels'
+        results_store (ResultsStore): se presente, le iterazioni vengono aggiunte anche allo
+            store colonnare (con dbms e mode; le altre dimensioni sono fissate dal chiamante)
 
     Output:
         - Un CSV per cold run, uno per warm run (es: query1_neo4j_cold.csv, query1_neo4j_warm.csv)
@@ -36,78 +215,535 @@ def execute_cold_and_warm_queries(
 
     cold_csv = f"{output_prefix}_{dbms_type}_cold.csv"
     warm_csv = f"{output_prefix}_{dbms_type}_warm.csv"
+    query_options = query_options or {}
+
+    def run_query():
+        iteration_parameters = resolve_parameters(parameters)
+        extra = {'parameters': json.dumps(iteration_parameters, default=str)} if callable(parameters) else {}
+        # La finestra di campionamento delle risorse coincide con quella della query
+        with span("query", "runner", dbms=dbms_type, output_prefix=output_prefix):
+            if resource_sampler is None:
+                return query_func(query, iteration_parameters, **query_options), extra
+            window = resource_sampler.begin()
+            result = query_func(query, iteration_parameters, **query_options)
+            return result, {**resource_sampler.end(window), **extra}
 
     # --- Cold runs ---
-    cold_times = []
-    for i in range(cold_iterations):
+    def cold_iteration(i):
+        flushed = []
+        if cache_flusher is not None:
+            flushed.extend(cache_flusher.before_connect())
         print(f"[COLD] Connessione a {dbms_type} (cold run {i+1}/{cold_iterations})")
-        connect_func()
+        with span("connect", "runner", dbms=dbms_type, iteration=i + 1):
+            connect_func()
+        if cache_flusher is not None:
+            flushed.extend(cache_flusher.after_connect())
+            print(f"  Cache svuotate: {', '.join(flushed) or 'nessuna'}")
         
         # Esegui query
-        result = query_func(query, parameters)
-        
-        # Estrai timing dal result
-        if isinstance(result, dict) and 'execution_time_ms' in result:
-            elapsed = result['execution_time_ms']
-            if elapsed is None:
-                print(f"  [ERROR] execution_time_ms è None per {dbms_type}!")
-                elapsed = 0.0
-        else:
-            print(f"  [ERROR] Result non valido da {dbms_type}: {type(result)}")
-            elapsed = 0.0
+        result, resources = run_query()
+        elapsed = _extract_elapsed(dbms_type, result)
         
-        close_func()
+        with span("close", "runner", dbms=dbms_type, iteration=i + 1):
+            close_func()
         
-        # Nessuna sottrazione di overhead - già tempo server puro
-        cold_times.append(elapsed)
         print(f"  --> {elapsed:.2f} ms")
-        
         time.sleep(0.2)
-    
-    # Salva cold runs
-    with open(cold_csv, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["iteration", "execution_time_ms"])
-        for idx, t in enumerate(cold_times):
-            writer.writerow([idx+1, t])
-    
-    print(f"[COLD] Salvato: {cold_csv}")
+        sample = {'execution_time_ms': elapsed, **_extract_metrics(result), **resources}
+        if cache_flusher is not None:
+            sample['flushed_levels'] = "|".join(flushed)
+        return sample
+
+    cold_samples, cold_warmup = [], 0
+    if "cold" in modes:
+        cold_samples, cold_warmup = _sample_iterations(
+            cold_iteration, cold_iterations, adaptive, ci_target, min_iterations, time_budget_s, "COLD"
+        )
+        cold_rows = _iteration_rows(cold_samples, cold_warmup)
+        _write_rows_csv(cold_csv, cold_rows)
+        if results_store is not None:
+            results_store.append(cold_rows, dbms=dbms_type, mode="cold")
+        print(f"[COLD] Salvato: {cold_csv} (warm-up scartato: {cold_warmup} iterazioni)")
 
     # --- Warm runs ---
-    warm_times = []
-    print(f"\n[WARM] Connessione a {dbms_type} (tutte le {warm_iterations} iterazioni senza disconnessione)")
-    connect_func()
-    
-    for i in range(warm_iterations):
-        result = query_func(query, parameters)
-        
-        if isinstance(result, dict) and 'execution_time_ms' in result:
-            elapsed = result['execution_time_ms']
-            if elapsed is None:
-                elapsed = 0.0
-        else:
-            elapsed = 0.0
-        
-        # Nessuna sottrazione di overhead - già tempo server puro
-        warm_times.append(elapsed)
+    def warm_iteration(i):
+        result, resources = run_query()
+        elapsed = _extract_elapsed(dbms_type, result)
         print(f"  [WARM] run {i+1}/{warm_iterations} --> {elapsed:.2f} ms")
-        
         time.sleep(0.2)
+        return {'execution_time_ms': elapsed, **_extract_metrics(result), **resources}
+
+    warm_samples, warm_warmup = [], 0
+    if "warm" in modes:
+        print(f"\n[WARM] Connessione a {dbms_type} (tutte le {warm_iterations} iterazioni senza disconnessione)")
+        connect_func()
+        try:
+            warm_samples, warm_warmup = _sample_iterations(
+                warm_iteration, warm_iterations, adaptive, ci_target, min_iterations, time_budget_s, "WARM"
+            )
+        finally:
+            close_func()
+
+        warm_rows = _iteration_rows(warm_samples, warm_warmup)
+        _write_rows_csv(warm_csv, warm_rows)
+        if results_store is not None:
+            results_store.append(warm_rows, dbms=dbms_type, mode="warm")
+        print(f"[WARM] Salvato: {warm_csv} (warm-up scartato: {warm_warmup} iterazioni)")
     
-    close_func()
-
-    # Salva warm runs
-    with open(warm_csv, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["iteration", "execution_time_ms"])
-        for idx, t in enumerate(warm_times):
-            writer.writerow([idx+1, t])
-    
-    print(f"[WARM] Salvato: {warm_csv}")
-    
-    # Statistiche finali
-    cold_avg = sum(cold_times) / len(cold_times) if cold_times else 0
-    warm_avg = sum(warm_times) / len(warm_times) if warm_times else 0
+    # Statistiche finali (senza warm-up)
+    cold_steady = [sample['execution_time_ms'] for sample in cold_samples[cold_warmup:]]
+    warm_steady = [sample['execution_time_ms'] for sample in warm_samples[warm_warmup:]]
+    cold_avg = sum(cold_steady) / len(cold_steady) if cold_steady else 0
+    warm_avg = sum(warm_steady) / len(warm_steady) if warm_steady else 0
     speedup = cold_avg / warm_avg if warm_avg > 0 else 0
     
     print(f"[INFO] Cold avg: {cold_avg:.2f} ms | Warm avg: {warm_avg:.2f} ms | Speedup: {speedup:.2f}x\n")
+
+
+def percentile(sorted_values, pct):
+    """
+    Percentile con interpolazione lineare su una lista gia' ordinata.
+
+    Args:
+        sorted_values (list): valori ordinati in modo crescente
+        pct (float): percentile richiesto (0-100)
+
+    Returns:
+        float: valore del percentile (0.0 se la lista e' vuota)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+# Attesa massima sulla barriera di partenza dei client: se un client non arriva
+# (es. connessione fallita) gli altri non restano bloccati per sempre
+CONCURRENCY_BARRIER_TIMEOUT_S = 120.0
+
+
+def _concurrency_client(query_func, query, parameters, queries_per_client, barrier):
+    """
+    Loop chiuso di un singolo client: attende gli altri client sulla barriera
+    e poi esegue le query una dopo l'altra, senza pause.
+
+    Le latenze finiscono in un LatencyHistogram (memoria fissa, fusibile tra client e
+    processi) invece che in una lista, cosi' anche run lunghi restano a memoria costante.
+
+    Returns:
+        tuple: (LatencyHistogram, numero errori, inizio, fine) con inizio/fine in time.time()
+    """
+    latencies = LatencyHistogram()
+    errors = 0
+    barrier.wait(timeout=CONCURRENCY_BARRIER_TIMEOUT_S)
+    started_at = time.time()
+    for _ in range(queries_per_client):
+        try:
+            result = query_func(query, resolve_parameters(parameters))
+        except Exception as e:
+            errors += 1
+            print(f"  [ERROR] {type(e).__name__}: {e}")
+            continue
+        if isinstance(result, dict) and result.get('execution_time_ms') is not None:
+            latencies.record(result['execution_time_ms'])
+        else:
+            errors += 1
+    return latencies, errors, started_at, time.time()
+
+
+def _concurrency_process_client(connect_func, close_func, query_func, query, parameters, queries_per_client, barrier):
+    """
+    Client in un processo separato: apre la propria connessione (fuori dalla
+    finestra misurata) perche' lo stato dei connector e' per-processo.
+    Se la connessione fallisce la barriera viene interrotta, cosi' gli altri client
+    escono con BrokenBarrierError invece di attendere un client che non arrivera'.
+    """
+    try:
+        connect_func()
+    except Exception:
+        barrier.abort()
+        raise
+    try:
+        return _concurrency_client(query_func, query, parameters, queries_per_client, barrier)
+    finally:
+        close_func()
+
+
+def _worker_parameters(parameters, worker):
+    """Parametri per un client in un processo separato: ogni ParameterSequence riceve un seed proprio."""
+    if isinstance(parameters, ParameterSequence):
+        return parameters.for_worker(worker)
+    return parameters
+
+
+def execute_concurrency_sweep(
+    dbms_type,
+    connect_func,
+    close_func,
+    query_func,
+    query,
+    parameters=None,
+    concurrency_levels=(1, 2, 4, 8, 16, 32),
+    queries_per_client=10,
+    worker_type="thread",
+    output_prefix="query"
+):
+    """
+    Esegue la stessa query con N client concorrenti in loop chiuso per ogni livello
+    di concorrenza e salva la curva throughput/latenza in un CSV.
+
+    Con worker_type="thread" i client condividono la connessione aperta da connect_func
+    (i driver sono thread-safe); con worker_type="process" ogni client apre la propria
+    connessione in un processo separato, utile quando la deserializzazione lato client
+    satura il GIL. In questo caso connect_func, close_func e query_func devono essere
+    funzioni a livello di modulo (picklable).
+
+    Args:
+        dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
+        connect_func (callable): funzione per connettere (senza argomenti)
+        close_func (callable): funzione per chiudere la connessione
+        query_func (callable): funzione per lanciare la query
+        query (str): query da eseguire
+        parameters (dict | callable): parametri opzionali o generatore (un set per query)
+        concurrency_levels (iterable): numero di client per ogni step (default 1..32)
+        queries_per_client (int): query eseguite da ogni client per step
+        worker_type (str): 'thread' oppure 'process'
+        output_prefix (str): prefisso file di output
+
+    Output:
+        - Un CSV con una riga per livello di concorrenza (es: query1_neo4j_concurrency.csv);
+          i percentili vengono dall'istogramma fuso dei client (errore relativo ~1%), serializzato
+          nella colonna latency_histogram (LatencyHistogram.decode) per fondere run diversi
+    """
+    if worker_type not in ("thread", "process"):
+        raise ValueError(f"worker_type non supportato: {worker_type}")
+
+    concurrency_csv = f"{output_prefix}_{dbms_type}_concurrency.csv"
+    rows = []
+
+    if worker_type == "thread":
+        print(f"[CONCURRENCY] Connessione a {dbms_type} (connessione condivisa tra i thread)")
+        connect_func()
+        # Una query di riscaldamento per non attribuire al primo step l'apertura del pool
+        query_func(query, resolve_parameters(parameters))
+    else:
+        manager = multiprocessing.Manager()
+
+    try:
+        for clients in concurrency_levels:
+            print(f"[CONCURRENCY] {dbms_type}: {clients} client x {queries_per_client} query")
+            if worker_type == "thread":
+                barrier = threading.Barrier(clients)
+                with ThreadPoolExecutor(max_workers=clients) as executor:
+                    futures = [
+                        executor.submit(_concurrency_client, query_func, query, parameters,
+                                        queries_per_client, barrier)
+                        for _ in range(clients)
+                    ]
+                    outcomes = [f.result() for f in futures]
+            else:
+                barrier = manager.Barrier(clients)
+                with ProcessPoolExecutor(max_workers=clients) as executor:
+                    futures = [
+                        executor.submit(_concurrency_process_client, connect_func, close_func, query_func,
+                                        query, _worker_parameters(parameters, worker), queries_per_client, barrier)
+                        for worker in range(clients)
+                    ]
+                    outcomes = [f.result() for f in futures]
+
+            latencies = LatencyHistogram.merged(lat for lat, _, _, _ in outcomes)
+            errors = sum(err for _, err, _, _ in outcomes)
+            duration_s = max(end for _, _, _, end in outcomes) - min(start for _, _, start, _ in outcomes)
+            throughput = latencies.count / duration_s if duration_s > 0 else 0.0
+
+            row = {
+                'clients': clients,
+                'completed_queries': latencies.count,
+                'errors': errors,
+                'duration_s': duration_s,
+                'throughput_qps': throughput,
+                'mean_ms': latencies.mean_ms,
+                'p50_ms': latencies.percentile(50),
+                'p95_ms': latencies.percentile(95),
+                'p99_ms': latencies.percentile(99),
+                'p99_9_ms': latencies.percentile(99.9),
+                'max_ms': latencies.max_ms if latencies.count else 0.0,
+                'latency_histogram': latencies.encode(),
+            }
+            rows.append(row)
+            print(f"  --> {throughput:.2f} q/s | p50 {row['p50_ms']:.2f} ms | "
+                  f"p95 {row['p95_ms']:.2f} ms | p99 {row['p99_ms']:.2f} ms | errori {errors}")
+            time.sleep(0.2)
+    finally:
+        if worker_type == "thread":
+            close_func()
+        else:
+            manager.shutdown()
+
+    _write_rows_csv(concurrency_csv, rows)
+
+    print(f"[CONCURRENCY] Salvato: {concurrency_csv}\n")
+    return rows
+
+
+def execute_selectivity_sweep(
+    dbms_type,
+    connect_func,
+    close_func,
+    query_func,
+    query,
+    sweep_points,
+    iterations=10,
+    total_rows=None,
+    output_prefix="query"
+):
+    """
+    Esegue una query parametrica per ogni punto di uno sweep di selettività
+    (connessione unica, come le warm run) e salva latenza e righe restituite.
+
+    Ogni punto è preceduto da un'esecuzione non misurata, così che le iterazioni
+    misurino lo stato a regime per quel set di parametri.
+
+    Args:
+        dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
+        connect_func (callable): funzione per connettere (senza argomenti)
+        close_func (callable): funzione per chiudere la connessione
+        query_func (callable): funzione per lanciare la query
+        query: template della query
+        sweep_points (list): dict {'selectivity': frazione obiettivo, 'parameters': dict}
+        iterations (int): esecuzioni misurate per punto
+        total_rows (int): righe totali della collezione, per la selettività effettiva (opzionale)
+        output_prefix (str): prefisso file di output
+
+    Output:
+        - Un CSV con una riga per punto (es: query1_neo4j_selectivity.csv)
+    """
+    selectivity_csv = f"{output_prefix}_{dbms_type}_selectivity.csv"
+    rows = []
+
+    print(f"[SELECTIVITY] Connessione a {dbms_type} ({len(sweep_points)} punti x {iterations} iterazioni)")
+    connect_func()
+    try:
+        for point in sweep_points:
+            point_parameters = point['parameters']
+            query_func(query, point_parameters)
+
+            times, result = [], None
+            for _ in range(iterations):
+                with span("query", "runner", dbms=dbms_type, selectivity=point['selectivity']):
+                    result = query_func(query, point_parameters)
+                times.append(_extract_elapsed(dbms_type, result))
+                time.sleep(0.2)
+
+            returned = _extract_metrics(result)['rows']
+            times.sort()
+            row = {
+                'selectivity_target': point['selectivity'],
+                'selectivity_actual': returned / total_rows if total_rows and returned is not None else None,
+                'rows': returned,
+                'iterations': len(times),
+                'mean_ms': sum(times) / len(times),
+                'p50_ms': percentile(times, 50),
+                'p95_ms': percentile(times, 95),
+                'min_ms': times[0],
+                'parameters': json.dumps(point_parameters, default=str),
+            }
+            rows.append(row)
+            print(f"  --> selettività {point['selectivity']:.4f}: {returned} righe | "
+                  f"p50 {row['p50_ms']:.2f} ms | p95 {row['p95_ms']:.2f} ms")
+    finally:
+        close_func()
+
+    _write_rows_csv(selectivity_csv, rows)
+    print(f"[SELECTIVITY] Salvato: {selectivity_csv}\n")
+    return rows
+
+
+def execute_batch_size_sweep(
+    dbms_type,
+    connect_func,
+    close_func,
+    query_func,
+    query,
+    parameters=None,
+    sweep_options=({'batch_size': 100}, {'batch_size': 1000}, {'batch_size': 10000}),
+    iterations=5,
+    query_options=None,
+    output_prefix="query"
+):
+    """
+    Riesegue la query per ogni dimensione di batch del cursore (connessione unica)
+    e salva latenza, round-trip e picco di memoria del client per ciascuna.
+
+    Per ogni configurazione: un'esecuzione di riscaldamento, `iterations` esecuzioni
+    misurate e un'ultima esecuzione con tracemalloc attivo per il picco di memoria.
+    Il picco si misura a parte perché il tracing delle allocazioni rallenta il
+    client e falserebbe le latenze.
+
+    Args:
+        dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
+        connect_func (callable): funzione per connettere (senza argomenti)
+        close_func (callable): funzione per chiudere la connessione
+        query_func (callable): funzione per lanciare la query
+        query: query da eseguire
+        parameters (dict | callable): parametri opzionali o generatore
+        sweep_options (list): opzioni di query_func per ogni punto (es. {'batch_size': 1000},
+            per ArangoDB anche 'stream'); diventano colonne del CSV
+        iterations (int): esecuzioni misurate per punto
+        query_options (dict): opzioni comuni a tutti i punti (es. consume)
+        output_prefix (str): prefisso file di output
+
+    Output:
+        - Un CSV con una riga per configurazione (es: query2_mongodb_batchsize.csv)
+    """
+    batch_csv = f"{output_prefix}_{dbms_type}_batchsize.csv"
+    query_options = query_options or {}
+    rows = []
+
+    print(f"[BATCH] Connessione a {dbms_type} ({len(sweep_options)} configurazioni x {iterations} iterazioni)")
+    connect_func()
+    try:
+        for options in sweep_options:
+            call_options = {**query_options, **options}
+            query_func(query, resolve_parameters(parameters), **call_options)
+
+            times, round_trips, estimated_round_trips, returned = [], [], [], []
+            for _ in range(iterations):
+                with span("query", "runner", dbms=dbms_type, **options):
+                    result = query_func(query, resolve_parameters(parameters), **call_options)
+                metrics = _extract_metrics(result)
+                times.append(_extract_elapsed(dbms_type, result))
+                round_trips.append(metrics['fetch_round_trips'])
+                estimated_round_trips.append(metrics['fetch_round_trips_est'])
+                returned.append(metrics['rows'])
+                time.sleep(0.2)
+
+            tracemalloc.start()
+            try:
+                query_func(query, resolve_parameters(parameters), **call_options)
+                _, peak_bytes = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            known_round_trips = [r for r in round_trips if r is not None]
+            known_estimates = [r for r in estimated_round_trips if r is not None]
+            times.sort()
+            row = {
+                **options,
+                'iterations': len(times),
+                'rows': returned[-1],
+                'fetch_round_trips': sum(known_round_trips) / len(known_round_trips) if known_round_trips else None,
+                'fetch_round_trips_est': sum(known_estimates) / len(known_estimates) if known_estimates else None,
+                'mean_ms': sum(times) / len(times),
+                'p50_ms': percentile(times, 50),
+                'p95_ms': percentile(times, 95),
+                'peak_client_memory_mb': peak_bytes / (1024 * 1024),
+            }
+            rows.append(row)
+            round_trip_label = (f"{row['fetch_round_trips']}" if row['fetch_round_trips'] is not None
+                                else f"~{row['fetch_round_trips_est']}")
+            print(f"  --> {options}: p50 {row['p50_ms']:.2f} ms | round-trip {round_trip_label} | "
+                  f"picco memoria {row['peak_client_memory_mb']:.1f} MB")
+    finally:
+        close_func()
+
+    _write_rows_csv(batch_csv, rows)
+    print(f"[BATCH] Salvato: {batch_csv}\n")
+    return rows
+
+
+def execute_transport_matrix(
+    dbms_type,
+    connect_func,
+    close_func,
+    query_func,
+    query,
+    parameters=None,
+    profiles=None,
+    iterations=5,
+    query_options=None,
+    output_prefix="query"
+):
+    """
+    Riesegue la query con ogni profilo di trasporto (compressione, keep-alive, opzioni
+    Bolt) e salva latenza, tempo di connessione e byte trasferiti per ciascuno.
+
+    Le opzioni di trasporto si fissano alla creazione del client: per ogni profilo
+    il runner si riconnette con connect_func(transport_options=...). I byte ricevuti
+    vengono da /proc/net/dev (traffico dell'intera macchina client, vedi
+    resource_sampler.read_network_bytes) e misurano l'effetto della compressione.
+    I profili che il driver non riesce ad applicare (connect_func solleva ValueError,
+    es. compressore non installato) vengono saltati e non compaiono nel CSV.
+
+    Args:
+        dbms_type (str): tipo DBMS (es. 'neo4j', 'mongodb', 'arangodb')
+        connect_func (callable): funzione per connettere, con argomento transport_options
+        close_func (callable): funzione per chiudere la connessione
+        query_func (callable): funzione per lanciare la query
+        query: query da eseguire
+        parameters (dict | callable): parametri opzionali o generatore
+        profiles (dict): nome del profilo -> opzioni di trasporto (es. {'zstd': {'compressors': 'zstd'}})
+        iterations (int): esecuzioni misurate per profilo, dopo una di riscaldamento
+        query_options (dict): opzioni di query_func comuni a tutti i profili (es. consume)
+        output_prefix (str): prefisso file di output
+
+    Output:
+        - Un CSV con una riga per profilo (es: query2_mongodb_transport.csv)
+    """
+    transport_csv = f"{output_prefix}_{dbms_type}_transport.csv"
+    profiles = profiles or {'default': {}}
+    query_options = query_options or {}
+    rows = []
+
+    print(f"[TRANSPORT] {dbms_type}: {len(profiles)} profili x {iterations} iterazioni")
+    for name, transport_options in profiles.items():
+        connect_start = time.perf_counter()
+        try:
+            connect_func(transport_options=transport_options)
+        except ValueError as e:
+            # Opzione non applicabile dal driver (es. compressore senza il modulo installato)
+            print(f"[TRANSPORT] profilo {name} saltato: {e}")
+            continue
+        connect_ms = (time.perf_counter() - connect_start) * 1000
+        try:
+            query_func(query, resolve_parameters(parameters), **query_options)
+
+            times, first_row_times, returned = [], [], []
+            rx_start, tx_start = read_network_bytes()
+            for _ in range(iterations):
+                with span("query", "runner", dbms=dbms_type, transport=name):
+                    result = query_func(query, resolve_parameters(parameters), **query_options)
+                metrics = _extract_metrics(result)
+                times.append(_extract_elapsed(dbms_type, result))
+                first_row_times.append(metrics['time_to_first_row_ms'])
+                returned.append(metrics['rows'])
+            rx_end, tx_end = read_network_bytes()
+        finally:
+            close_func()
+
+        times.sort()
+        known_first_rows = sorted(t for t in first_row_times if t is not None)
+        row = {
+            'transport': name,
+            'transport_options': json.dumps(transport_options, sort_keys=True, default=str),
+            'iterations': len(times),
+            'rows': returned[-1],
+            'connect_ms': connect_ms,
+            'mean_ms': sum(times) / len(times),
+            'p50_ms': percentile(times, 50),
+            'p95_ms': percentile(times, 95),
+            'p50_time_to_first_row_ms': percentile(known_first_rows, 50) if known_first_rows else None,
+            'rx_bytes_per_query': (rx_end - rx_start) / len(times) if rx_start is not None else None,
+            'tx_bytes_per_query': (tx_end - tx_start) / len(times) if tx_start is not None else None,
+        }
+        rows.append(row)
+        rx = row['rx_bytes_per_query']
+        rx_label = f"{rx / (1024 * 1024):.2f} MB" if rx is not None else "n/d"
+        print(f"  --> {name}: p50 {row['p50_ms']:.2f} ms | connect {connect_ms:.1f} ms | rx/query {rx_label}")
+        time.sleep(0.5)
+
+    _write_rows_csv(transport_csv, rows)
+    print(f"[TRANSPORT] Salvato: {transport_csv}\n")
+    return rows
@@ -0,0 +1,168 @@
+import math
+import random
+from datetime import date, timedelta
+
+
+class Param:
+    """
+    Segnaposto di un parametro in una pipeline MongoDB.
+
+    Neo4j ($nome) e ArangoDB (@nome) hanno parametri nativi, le pipeline di
+    aggregazione no: i segnaposto vengono sostituiti con bind_parameters()
+    prima dell'invio.
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Param({self.name!r})"
+
+
+def bind_parameters(template, parameters):
+    """
+    Sostituisce ricorsivamente i Param di una pipeline con i valori dati.
+
+    Args:
+        template: pipeline (liste/dict annidati) con segnaposto Param
+        parameters (dict): valori per nome del parametro
+
+    Returns:
+        copia della pipeline con i valori al posto dei segnaposto
+    """
+    if isinstance(template, Param):
+        return parameters[template.name]
+    if isinstance(template, dict):
+        return {key: bind_parameters(value, parameters) for key, value in template.items()}
+    if isinstance(template, list):
+        return [bind_parameters(value, parameters) for value in template]
+    return template
+
+
+def resolve_parameters(parameters):
+    """
+    Restituisce i parametri per una singola esecuzione: se parameters è un
+    generatore (callable) ne estrae un nuovo set, altrimenti lo restituisce invariato.
+    """
+    return parameters() if callable(parameters) else parameters
+
+
+class ParameterSequence:
+    """
+    Sequenza riproducibile di set di parametri: ogni chiamata ne genera uno nuovo.
+
+    Il seed dipende solo da query e ripetizione (non dal DBMS), quindi ogni DBMS
+    riceve esattamente la stessa sequenza di parametri.
+
+    Esempio:
+        params = ParameterSequence(partial(random_companies_parameters, company_ids=ids), seed="42/q2/r1")
+        params()  # {'aziende': [...]}
+    """
+
+    def __init__(self, generate, seed=0):
+        """
+        Args:
+            generate (callable): funzione (rng) -> dict di parametri
+            seed: seed del generatore (int o str)
+        """
+        self.generate = generate
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+    def __call__(self):
+        return self.generate(self._rng)
+
+    def for_worker(self, index):
+        """
+        Sequenza indipendente per il client index in un processo separato: una copia
+        serializzata ripartirebbe dallo stesso stato, e tutti i client invierebbero gli
+        stessi parametri. Il seed derivato dipende solo da seed e index, quindi resta
+        uguale tra i DBMS.
+        """
+        return ParameterSequence(self.generate, seed=f"{self.seed}/worker{index}")
+
+
+# Domini dei parametri casuali di Q1, dagli estremi della query letterale
+AMOUNT_BOUNDS = (100.0, 500000.0)
+VAT_RATES = (0.0, 0.04, 0.05, 0.10, 0.22)
+DATE_BOUNDS = (date(2020, 1, 1), date(2024, 12, 31))
+
+# Filtri di Q1 che non selezionano nulla: usati nello sweep di selettività,
+# dove la selettività è controllata solo dall'intervallo su importo_eur
+OPEN_RANGE_FILTERS = {'min_aliquota': 0.0, 'data_da': '1900-01-01', 'data_a': '2100-12-31'}
+
+
+def random_range_parameters(rng, amount_bounds=AMOUNT_BOUNDS, vat_rates=VAT_RATES, date_bounds=DATE_BOUNDS):
+    """
+    Intervalli casuali per i filtri di Q1: importo (estremo inferiore log-uniforme,
+    ampiezza da 2x a 1000x), aliquota minima e finestra di date da 30 giorni all'intero dominio.
+
+    Returns:
+        dict: min_importo, max_importo, min_aliquota, data_da, data_a (date ISO)
+    """
+    low, high = amount_bounds
+    min_importo = math.exp(rng.uniform(math.log(low), math.log(high)))
+    max_importo = min(high, min_importo * rng.uniform(2.0, 1000.0))
+
+    first_day, last_day = date_bounds
+    total_days = (last_day - first_day).days
+    window_days = rng.randint(min(30, total_days), total_days)
+    start = first_day + timedelta(days=rng.randint(0, total_days - window_days))
+
+    return {
+        'min_importo': round(min_importo, 2),
+        'max_importo': round(max_importo, 2),
+        'min_aliquota': rng.choice(vat_rates),
+        'data_da': start.isoformat(),
+        'data_a': (start + timedelta(days=window_days)).isoformat(),
+    }
+
+
+def random_companies_parameters(rng, company_ids, count=25):
+    """
+    Campione casuale di aziende di partenza per le query di join/traversal.
+
+    Args:
+        rng (random.Random): generatore
+        company_ids (list): id_azienda disponibili (ordinati, per riproducibilità)
+        count (int): aziende per esecuzione
+
+    Returns:
+        dict: {'aziende': [...]}
+    """
+    return {'aziende': rng.sample(company_ids, min(count, len(company_ids)))}
+
+
+def range_for_selectivity(sorted_values, selectivity):
+    """
+    Estremi esclusivi (low, high) di un filtro low < x < high che seleziona circa
+    la frazione richiesta dei valori, partendo dal più piccolo.
+
+    Con valori ripetuti la selettività effettiva può discostarsi: il numero di righe
+    restituite va sempre registrato.
+
+    Args:
+        sorted_values (list): valori della colonna, ordinati
+        selectivity (float): frazione obiettivo (0-1]
+
+    Returns:
+        tuple: (low, high)
+    """
+    if not sorted_values:
+        raise ValueError("Nessun valore per calcolare la selettività")
+    count = min(len(sorted_values), max(1, round(selectivity * len(sorted_values))))
+    low = sorted_values[0] - 1
+    high = sorted_values[count] if count < len(sorted_values) else sorted_values[-1] + 1
+    return low, high
+
+
+def result_values(result, field):
+    """
+    Estrae una colonna dai risultati di un connector (records Neo4j o documents
+    MongoDB/ArangoDB), scartando i valori mancanti.
+    """
+    rows = result['records'] if 'records' in result else result['documents']
+    values = (row.get(field) if isinstance(row, dict) else row[field] for row in rows)
+    return [value for value in values if value is not None]
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+# Colonne aggiunte ai CSV del runner per ogni iterazione
+RESOURCE_COLUMNS = [
+    'cpu_percent',
+    'rss_max_mb',
+    'read_bytes',
+    'write_bytes',
+    'ctx_switches',
+]
+
+# Nomi dei processi server per DBMS (Neo4j gira in una JVM: si cerca "neo4j" nella cmdline)
+DBMS_PROCESS_NAMES = {
+    'mongodb': ['mongod'],
+    'arangodb': ['arangod'],
+    'neo4j': ['neo4j'],
+}
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def find_pids(process_names):
+    """
+    Cerca in /proc i processi il cui nome (comm) coincide con uno dei nomi dati,
+    oppure la cui riga di comando contiene il nome (es. la JVM di Neo4j).
+
+    Args:
+        process_names (list): nomi da cercare (es. ['mongod'])
+
+    Returns:
+        list: PID trovati (vuota se /proc non è disponibile)
+    """
+    pids = []
+    if not os.path.isdir('/proc'):
+        return pids
+    own_pid = os.getpid()
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit() or int(entry) == own_pid:
+            continue
+        try:
+            with open(f'/proc/{entry}/comm') as f:
+                comm = f.read().strip()
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode(errors='replace')
+        except OSError:
+            continue
+        if any(name == comm or (comm == 'java' and name in cmdline) for name in process_names):
+            pids.append(int(entry))
+    return pids
+
+
+def read_network_bytes():
+    """
+    Byte ricevuti e inviati da tutte le interfacce di rete (/proc/net/dev), loopback compresa.
+
+    I contatori sono del namespace di rete, non del processo: i delta sono significativi
+    solo se durante la misura il client è l'unico a generare traffico. Se il DBMS gira
+    sulla stessa macchina il traffico passa dall'interfaccia di loopback, che conta
+    ogni byte sia in rx sia in tx: rx e tx riportano allora entrambi il totale delle
+    due direzioni (richieste più risposte), non il solo traffico ricevuto o inviato.
+
+    Returns:
+        tuple: (rx_bytes, tx_bytes), (None, None) se /proc/net/dev non è disponibile
+    """
+    rx_bytes, tx_bytes = 0, 0
+    try:
+        with open('/proc/net/dev') as f:
+            for line in f.readlines()[2:]:
+                fields = line.split(':', 1)[1].split()
+                rx_bytes += int(fields[0])
+                tx_bytes += int(fields[8])
+    except (OSError, IndexError, ValueError):
+        return None, None
+    return rx_bytes, tx_bytes
+
+
+def _read_proc_counters(pid):
+    """
+    Legge i contatori cumulativi di un processo da /proc/<pid>/{stat,status,io}.
+
+    Returns:
+        dict: cpu_ticks, rss_kb, read_bytes, write_bytes, ctx_switches (None se il processo non esiste più)
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # comm può contenere spazi: i campi numerici iniziano dopo l'ultima ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        counters = {'cpu_ticks': int(fields[11]) + int(fields[12])}  # utime + stime
+
+        rss_kb, ctx_switches = 0, 0
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss_kb = int(line.split()[1])
+                elif line.startswith(('voluntary_ctxt_switches:', 'nonvoluntary_ctxt_switches:')):
+                    ctx_switches += int(line.split()[1])
+        counters['rss_kb'] = rss_kb
+        counters['ctx_switches'] = ctx_switches
+    except (OSError, IndexError, ValueError):
+        return None
+
+    # /proc/<pid>/io richiede lo stesso utente del processo (o root)
+    counters['read_bytes'] = counters['write_bytes'] = None
+    try:
+        with open(f'/proc/{pid}/io') as f:
+            for line in f:
+                key, value = line.split(':')
+                if key in ('read_bytes', 'write_bytes'):
+                    counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+class ResourceSampler:
+    """
+    Campiona in background CPU, RSS, I/O e context switch dei processi server di un DBMS.
+
+    Il runner delimita ogni iterazione con begin()/end(): i due campioni sincroni
+    ai bordi danno delta esatti dei contatori, quelli del thread in background
+    servono per il picco di RSS all'interno della finestra.
+
+    Esempio:
+        with ResourceSampler(DBMS_PROCESS_NAMES['mongodb']) as sampler:
+            window = sampler.begin()
+            ...  # query
+            summary = sampler.end(window)
+    """
+
+    def __init__(self, process_names=None, pids=None, interval_s=0.1, max_samples=100000):
+        """
+        Args:
+            process_names (list): nomi dei processi da cercare (ignorato se pids è dato)
+            pids (list): PID espliciti dei processi server
+            interval_s (float): intervallo di campionamento del thread in background
+            max_samples (int): campioni conservati al massimo (memoria limitata nei run lunghi)
+        """
+        self.process_names = process_names or []
+        self.pids = list(pids) if pids else []
+        self.interval_s = interval_s
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not self.pids:
+            self.pids = find_pids(self.process_names)
+        if not self.pids:
+            print(f"[RESOURCES] Nessun processo trovato per {self.process_names}: campionamento disattivato")
+            return self
+        print(f"[RESOURCES] Campionamento PID {self.pids} ogni {self.interval_s * 1000:.0f} ms")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            self.sample_now()
+
+    def sample_now(self):
+        """Registra un campione sincrono e ne restituisce l'istante (time.perf_counter)."""
+        timestamp = time.perf_counter()
+        totals = {'cpu_ticks': 0, 'rss_kb': 0, 'read_bytes': None, 'write_bytes': None, 'ctx_switches': 0}
+        for pid in self.pids:
+            counters = _read_proc_counters(pid)
+            if counters is None:
+                continue
+            for key, value in counters.items():
+                if value is not None:
+                    totals[key] = (totals[key] or 0) + value
+        with self._lock:
+            self._samples.append((timestamp, totals))
+        return timestamp
+
+    def begin(self):
+        """Apre una finestra di misura: restituisce il suo istante di inizio."""
+        if self.process_names and self.pids and not any(os.path.exists(f'/proc/{pid}') for pid in self.pids):
+            # Server riavviato (es. true-cold): si cercano i nuovi processi
+            self.pids = find_pids(self.process_names)
+        return self.sample_now() if self.pids else None
+
+    def end(self, window_start):
+        """
+        Chiude la finestra aperta da begin() e riassume le risorse usate al suo interno.
+
+        Returns:
+            dict: valori per RESOURCE_COLUMNS (None se il campionamento non è attivo)
+        """
+        if window_start is None:
+            return {column: None for column in RESOURCE_COLUMNS}
+        window_end = self.sample_now()
+        with self._lock:
+            window = [s for t, s in self._samples if window_start <= t <= window_end]
+        first, last = window[0], window[-1]
+        elapsed_s = window_end - window_start
+
+        def delta(key):
+            if first[key] is None or last[key] is None:
+                return None
+            return last[key] - first[key]
+
+        return {
+            'cpu_percent': delta('cpu_ticks') / _CLK_TCK / elapsed_s * 100 if elapsed_s > 0 else 0.0,
+            'rss_max_mb': max(s['rss_kb'] for s in window) / 1024,
+            'read_bytes': delta('read_bytes'),
+            'write_bytes': delta('write_bytes'),
+            'ctx_switches': delta('ctx_switches'),
+        }
@@ -0,0 +1,161 @@
+import csv
+import hashlib
+import os
+import re
+from datetime import date, datetime
+
+
+# Attributi di sistema esclusi dal confronto (_id di MongoDB, _key/_rev di ArangoDB)
+SYSTEM_FIELDS = {'_id', '_key', '_rev'}
+
+# Cifre significative per i float: assorbe le differenze di rappresentazione tra motori
+FLOAT_DIGITS = 9
+
+_MASK = (1 << 64) - 1
+
+
+def normalize_value(value):
+    """
+    Rappresentazione canonica (stringa) di un valore restituito da un driver:
+    float interi come interi, float arrotondati a FLOAT_DIGITS cifre, date in ISO
+    (neo4j.time.Date compreso), liste elemento per elemento, dict per chiave.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return format(value, f".{FLOAT_DIGITS}g")
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(normalize_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{key}:{normalize_value(value[key])}" for key in sorted(value)) + "}"
+    return str(value)
+
+
+def normalize_row(row):
+    """
+    Riga canonica indipendente da nomi e ordine delle colonne: i tre DBMS usano
+    alias diversi (a.nome / azienda / nome_azienda), quindi si confronta il
+    multinsieme dei valori della riga.
+    """
+    if isinstance(row, dict):
+        values = [value for key, value in row.items() if key not in SYSTEM_FIELDS]
+    elif hasattr(row, 'values'):
+        values = row.values()  # neo4j.Record
+    else:
+        values = [row]
+    return "\x1f".join(sorted(normalize_value(value) for value in values))
+
+
+class ResultDigest:
+    """
+    Hash del risultato indipendente dall'ordine delle righe, calcolato in streaming.
+
+    Ogni riga normalizzata viene ridotta a 64 bit (BLAKE2b) e sommata modulo 2^64:
+    la somma è commutativa, quindi l'ordine non conta, e a differenza dello XOR
+    le righe duplicate non si annullano. La memoria usata è costante.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._sum = 0
+
+    def update(self, row):
+        row_hash = hashlib.blake2b(normalize_row(row).encode(), digest_size=8).digest()
+        self._sum = (self._sum + int.from_bytes(row_hash, 'big')) & _MASK
+        self.rows += 1
+
+    def hexdigest(self):
+        return f"{self.rows}:{self._sum:016x}"
+
+
+# {dbms}_query{n}_{dbms}_{mode}.csv, come scritto da main.run_cell
+_RESULT_FILE = re.compile(r"^(?P<dbms>[a-z0-9]+)_query(?P<query>\d+)_(?P=dbms)_(?P<mode>cold|warm)\.csv$")
+
+
+def check_result_equivalence(results_dir, output_csv=None):
+    """
+    Confronta i digest dei risultati tra DBMS per ogni query, scala e iterazione.
+
+    Legge ricorsivamente i CSV cold/warm con la colonna result_digest. Una query è
+    segnalata come 'mismatch' se per la stessa iterazione (stessi parametri) i DBMS
+    restituiscono digest diversi, come 'unstable' se un DBMS restituisce digest diversi
+    tra le iterazioni di una query letterale (es. LIMIT senza ORDER BY).
+
+    Args:
+        results_dir (str): cartella dei risultati
+        output_csv (str): report da scrivere (default {results_dir}/result_equivalence.csv)
+
+    Returns:
+        list: righe del report (una per cartella e query)
+    """
+    groups = {}
+    for root, _, files in os.walk(results_dir):
+        for fname in files:
+            match = _RESULT_FILE.match(fname)
+            if not match:
+                continue
+            with open(os.path.join(root, fname), newline="") as f:
+                reader = csv.DictReader(f)
+                if 'result_digest' not in (reader.fieldnames or []):
+                    continue
+                by_iteration = {
+                    int(row['iteration']): (row['result_digest'], row.get('parameters', ''))
+                    for row in reader if row['result_digest']
+                }
+            if by_iteration:
+                key = (os.path.relpath(root, results_dir), int(match['query']))
+                groups.setdefault(key, {}).setdefault(match['dbms'], {}).update(
+                    {(match['mode'], iteration): value for iteration, value in by_iteration.items()}
+                )
+
+    report = []
+    for (location, query), by_dbms in sorted(groups.items()):
+        status = "ok" if len(by_dbms) > 1 else "single_dbms"
+        mismatched = 0
+        common = set.intersection(*(set(iterations) for iterations in by_dbms.values()))
+        for iteration in common:
+            if len({by_dbms[dbms][iteration][0] for dbms in by_dbms}) > 1:
+                mismatched += 1
+        if mismatched:
+            status = "mismatch"
+        else:
+            for iterations in by_dbms.values():
+                literal = all(not parameters for _, parameters in iterations.values())
+                if literal and len({digest for digest, _ in iterations.values()}) > 1:
+                    status = "unstable"
+        first_digests = {
+            dbms: iterations[min(iterations)][0] for dbms, iterations in sorted(by_dbms.items())
+        }
+        report.append({
+            'location': location,
+            'query': query,
+            'status': status,
+            'compared_iterations': len(common),
+            'mismatched_iterations': mismatched,
+            **{f"{dbms}_digest": digest for dbms, digest in first_digests.items()},
+        })
+        if status in ("mismatch", "unstable"):
+            print(f"[DIGEST] [WARNING] {location} query{query}: {status} -> {first_digests}")
+
+    output_csv = output_csv or os.path.join(results_dir, "result_equivalence.csv")
+    fieldnames = []
+    for row in report:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+    with open(output_csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames or ['location'], restval="")
+        writer.writeheader()
+        writer.writerows(report)
+    print(f"[DIGEST] {sum(r['status'] == 'ok' for r in report)}/{len(report)} query equivalenti. Report: {output_csv}")
+    return report
@@ -0,0 +1,433 @@
+import argparse
+import csv
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+from importlib import metadata
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+
+# Pacchetto del driver Python per DBMS (versione registrata in driver_version)
+DRIVER_PACKAGES = {
+    'neo4j': 'neo4j',
+    'mongodb': 'pymongo',
+    'arangodb': 'python-arango',
+}
+
+# Colonne di partizione: una cartella dbms=.../scale=... per combinazione, così i filtri
+# su DBMS e scala escludono interi file prima della lettura
+PARTITION_SCHEMA = pa.schema([
+    ('dbms', pa.string()),
+    ('scale', pa.int32()),
+])
+
+# Colonne scritte nei file Parquet (una riga per iterazione)
+FILE_SCHEMA = pa.schema([
+    # Run
+    ('run_id', pa.string()),
+    ('started_at', pa.timestamp('s')),
+    ('git_revision', pa.string()),
+    ('hostname', pa.string()),
+    ('os', pa.string()),
+    ('cpu_model', pa.string()),
+    ('cpu_count', pa.int32()),
+    ('memory_total_gb', pa.float64()),
+    ('python_version', pa.string()),
+    ('driver_version', pa.string()),
+    # Cella
+    ('query', pa.int32()),
+    ('mode', pa.string()),
+    ('repeat', pa.int32()),
+    ('query_set', pa.string()),
+    # Iterazione
+    ('iteration', pa.int32()),
+    ('warmup', pa.bool_()),
+    ('execution_time_ms', pa.float64()),
+    ('rows', pa.int64()),
+    ('time_to_first_row_ms', pa.float64()),
+    ('time_to_last_row_ms', pa.float64()),
+    ('fetch_round_trips', pa.float64()),
+    ('fetch_round_trips_est', pa.float64()),
+    ('rows_per_round_trip', pa.float64()),
+    ('server_time_ms', pa.float64()),
+    ('server_first_row_ms', pa.float64()),
+    ('client_overhead_ms', pa.float64()),
+    ('result_digest', pa.string()),
+    ('result_bytes', pa.int64()),
+    ('cpu_percent', pa.float64()),
+    ('rss_max_mb', pa.float64()),
+    ('read_bytes', pa.int64()),
+    ('write_bytes', pa.int64()),
+    ('ctx_switches', pa.int64()),
+    ('parameters', pa.string()),
+    ('flushed_levels', pa.string()),
+])
+
+STORE_SCHEMA = pa.unify_schemas([FILE_SCHEMA, PARTITION_SCHEMA])
+
+# Cartella dello store, relativa alla cartella dei risultati
+DEFAULT_STORE_DIR = "results_store"
+
+# Dimensioni che identificano una cella del benchmark
+CELL_KEYS = ['dbms', 'scale', 'query', 'mode']
+
+# Selettore di run che unisce tutti i run di una cella (di default si usa l'ultimo)
+ALL_RUNS = "all"
+
+
+def _git_revision():
+    """Commit corrente del repository (con suffisso +dirty se ci sono modifiche), None fuori da git."""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_dir, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{revision}+dirty" if dirty else revision
+
+
+def _read_proc_field(path, key):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(key):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return None
+
+
+def _package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def collect_run_metadata():
+    """
+    Descrive l'esecuzione corrente: id del run, revisione git, macchina e versioni dei driver.
+
+    Returns:
+        dict: valori delle colonne di run di FILE_SCHEMA; driver_versions per DBMS
+    """
+    mem_total = _read_proc_field('/proc/meminfo', 'MemTotal')
+    return {
+        'run_id': uuid.uuid4().hex[:12],
+        'started_at': datetime.now().replace(microsecond=0),
+        'git_revision': _git_revision(),
+        'hostname': platform.node(),
+        'os': platform.platform(),
+        'cpu_model': _read_proc_field('/proc/cpuinfo', 'model name') or platform.processor() or None,
+        'cpu_count': os.cpu_count(),
+        'memory_total_gb': int(mem_total.split()[0]) / (1024 * 1024) if mem_total else None,
+        'python_version': platform.python_version(),
+        'driver_versions': {dbms: _package_version(package) for dbms, package in DRIVER_PACKAGES.items()},
+    }
+
+
+def _coerce(value, arrow_type):
+    """Converte un valore (anche letto da CSV come stringa) nel tipo della colonna."""
+    if value is None or value == "":
+        return None
+    if pa.types.is_boolean(arrow_type):
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "1.0")
+        return bool(value)
+    if pa.types.is_integer(arrow_type):
+        return int(float(value))
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    if pa.types.is_timestamp(arrow_type):
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+    return str(value)
+
+
+class ResultsStore:
+    """
+    Store colonnare (dataset Parquet) di tutte le iterazioni di tutti i run.
+
+    Ogni append() scrive un nuovo file nella partizione dbms=.../scale=..., con un nome
+    che contiene l'id del run: i file non vengono mai riscritti, quindi più worker
+    possono scrivere in store separati che si uniscono copiando i file (merge_stores).
+
+    Le dimensioni della cella (query, modalità, ripetizione, ...) si fissano con
+    with_dimensions(); i metadati del run sono raccolti una volta sola.
+
+    Esempio:
+        store = ResultsStore("runs/results_store")
+        cell_store = store.with_dimensions(dbms="neo4j", scale=100, query=2, repeat=1)
+        cell_store.append(iteration_rows, mode="warm")
+    """
+
+    def __init__(self, path, run_metadata=None, dimensions=None):
+        """
+        Args:
+            path (str): cartella del dataset
+            run_metadata (dict): metadati del run (default collect_run_metadata())
+            dimensions (dict): valori fissi delle colonne di cella
+        """
+        self.path = path
+        self.run_metadata = run_metadata if run_metadata is not None else collect_run_metadata()
+        self.dimensions = dict(dimensions or {})
+
+    def with_dimensions(self, **dimensions):
+        """Restituisce uno store sullo stesso dataset con altre dimensioni fisse."""
+        return ResultsStore(self.path, self.run_metadata, {**self.dimensions, **dimensions})
+
+    def append(self, rows, **dimensions):
+        """
+        Aggiunge allo store le righe delle iterazioni (come scritte nei CSV del runner).
+
+        Args:
+            rows (list): dict per iterazione; le chiavi fuori da FILE_SCHEMA sono ignorate
+            **dimensions: dimensioni aggiuntive (es. mode="cold"); dbms e scale sono obbligatorie
+
+        Returns:
+            int: righe scritte
+        """
+        if not rows:
+            return 0
+        fixed = {**self.dimensions, **dimensions}
+        run = {key: value for key, value in self.run_metadata.items() if key != 'driver_versions'}
+        run['driver_version'] = self.run_metadata.get('driver_versions', {}).get(fixed.get('dbms'))
+        records = [
+            {
+                field.name: _coerce(row.get(field.name, fixed.get(field.name, run.get(field.name))), field.type)
+                for field in STORE_SCHEMA
+            }
+            for row in rows
+        ]
+        table = pa.Table.from_pylist(records, schema=STORE_SCHEMA)
+        # Nome univoco per append: più celle dello stesso run scrivono nella stessa partizione
+        ds.write_dataset(
+            table,
+            self.path,
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+            basename_template=f"{self.run_metadata['run_id']}-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return len(records)
+
+
+def open_dataset(path):
+    """Apre lo store come pyarrow.dataset.Dataset con lo schema tipizzato."""
+    return ds.dataset(
+        path,
+        schema=STORE_SCHEMA,
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+    )
+
+
+def load_results(path, columns=None, include_warmup=False, **filters):
+    """
+    Legge dallo store solo le righe e le colonne richieste.
+
+    I filtri sono applicati da pyarrow prima della lettura: quelli su dbms e scale
+    escludono le partizioni, gli altri usano le statistiche dei row group.
+
+    Args:
+        path (str): cartella del dataset
+        columns (list): colonne da leggere (default tutte)
+        include_warmup (bool): include le iterazioni di warm-up
+        **filters: colonna=valore oppure colonna=[valori] (es. scale=100, mode="warm", query=[1, 2])
+
+    Returns:
+        pandas.DataFrame
+    """
+    expression = None if include_warmup else (ds.field('warmup') == False)  # noqa: E712
+    for column, value in filters.items():
+        if value is None:
+            continue
+        condition = ds.field(column).isin(list(value)) if isinstance(value, (list, tuple, set)) \
+            else ds.field(column) == value
+        expression = condition if expression is None else expression & condition
+    return open_dataset(path).to_table(columns=columns, filter=expression).to_pandas()
+
+
+def latest_run_per_cell(frame, keys=CELL_KEYS):
+    """
+    Tiene, per ogni cella, solo le righe del run più recente (started_at; i run importati
+    da CSV, senza data, contano come i più vecchi). Ripetere il benchmark aggiunge run
+    allo store: senza selezione le statistiche mescolerebbero revisioni e macchine diverse.
+
+    Args:
+        frame (pandas.DataFrame): righe dello store con le colonne keys, run_id e started_at
+        keys (list): colonne che identificano la cella
+
+    Returns:
+        pandas.DataFrame: le righe del run selezionato per ogni cella
+    """
+    if frame.empty:
+        return frame
+    runs = frame.groupby(keys + ['run_id'], dropna=False, observed=True)['started_at'].max().reset_index()
+    runs = runs.sort_values(['started_at', 'run_id'], na_position='first', kind='stable')
+    latest = runs.drop_duplicates(keys, keep='last')[keys + ['run_id']]
+    return frame.merge(latest, on=keys + ['run_id'])
+
+
+def load_run_times(path, run_id=None, git_revision=None, **filters):
+    """
+    Tempi di esecuzione (senza warm-up) dello store, un run per cella.
+
+    Args:
+        path (str): cartella del dataset
+        run_id (str): run da usare; default l'ultimo run di ogni cella, ALL_RUNS per unire tutti i run
+        git_revision (str): considera solo i run di questa revisione (e tra questi l'ultimo)
+        **filters: altri filtri di load_results (es. scale=100, mode="warm")
+
+    Returns:
+        pandas.DataFrame: colonne dbms, scale, query, mode, execution_time_ms
+    """
+    frame = load_results(path, columns=CELL_KEYS + ['run_id', 'started_at', 'execution_time_ms'],
+                         run_id=None if run_id == ALL_RUNS else run_id, git_revision=git_revision, **filters)
+    if run_id != ALL_RUNS:
+        frame = latest_run_per_cell(frame)
+    return frame[CELL_KEYS + ['execution_time_ms']]
+
+
+def merge_stores(input_paths, output_path):
+    """
+    Unisce gli store dei worker copiando i file Parquet nelle stesse partizioni.
+
+    Returns:
+        int: file copiati
+    """
+    copied = 0
+    for input_path in input_paths:
+        if not os.path.isdir(input_path):
+            continue
+        for root, _, files in os.walk(input_path):
+            for fname in files:
+                if not fname.endswith(".parquet"):
+                    continue
+                target_dir = os.path.join(output_path, os.path.relpath(root, input_path))
+                os.makedirs(target_dir, exist_ok=True)
+                shutil.copy2(os.path.join(root, fname), os.path.join(target_dir, fname))
+                copied += 1
+    print(f"[STORE] Copiati {copied} file in {output_path}")
+    return copied
+
+
+# {dbms}_query{n}_{dbms}_{mode}.csv, nella struttura {scale}/ o {scale}/repeat{r}/
+_CSV_FILE = re.compile(r"^(?P<dbms>[a-z0-9]+)_query(?P<query>\d+)_(?P=dbms)_(?P<mode>cold|warm)\.csv$")
+
+
+def iter_csv_results(base_dir):
+    """
+    Scorre i CSV cold/warm nella struttura {scale}/{file}.csv e {scale}/repeat{r}/{file}.csv.
+
+    Yields:
+        tuple: (dimensioni della cella: dbms, scale, query, mode, repeat; righe del CSV)
+    """
+    for scale in sorted(os.listdir(base_dir)):
+        scale_dir = os.path.join(base_dir, scale)
+        if not scale.isdigit() or not os.path.isdir(scale_dir):
+            continue
+        for root, _, files in os.walk(scale_dir):
+            repeat_dir = os.path.basename(root)
+            repeat = int(repeat_dir[len("repeat"):]) if repeat_dir.startswith("repeat") else None
+            for fname in sorted(files):
+                match = _CSV_FILE.match(fname)
+                if not match:
+                    continue
+                with open(os.path.join(root, fname), newline="") as f:
+                    rows = list(csv.DictReader(f))
+                dimensions = {'dbms': match['dbms'], 'scale': int(scale), 'query': int(match['query']),
+                              'mode': match['mode'], 'repeat': repeat}
+                yield dimensions, rows
+
+
+def import_csv_results(base_dir, store_path):
+    """
+    Importa nello store i CSV cold/warm già esistenti (vedi iter_csv_results).
+    Hardware, driver e revisione non sono noti e restano nulli.
+
+    Args:
+        base_dir (str): cartella con le sottocartelle di scala (es. '.')
+        store_path (str): cartella dello store
+
+    Returns:
+        int: righe importate
+    """
+    run_metadata = {'run_id': f"csv-{uuid.uuid4().hex[:8]}", 'driver_versions': {}}
+    store = ResultsStore(store_path, run_metadata)
+    imported = 0
+    for dimensions, rows in iter_csv_results(base_dir):
+        imported += store.append([{'warmup': 0, **row} for row in rows], **dimensions)
+    print(f"[STORE] Importate {imported} righe da {base_dir} in {store_path}")
+    return imported
+
+
+def _is_store(path):
+    return any(entry.startswith("dbms=") for entry in os.listdir(path))
+
+
+def load_execution_times(path, run_id=None, git_revision=None):
+    """
+    Tempi di esecuzione (senza warm-up) di un insieme di risultati.
+
+    Args:
+        path (str): store colonnare, cartella dei risultati che lo contiene, oppure
+            albero di CSV ({scale}/{dbms}_query{n}_{dbms}_{mode}.csv)
+        run_id (str): run dello store da usare; default l'ultimo run di ogni cella,
+            ALL_RUNS per unire tutti i run
+        git_revision (str): considera solo i run di questa revisione (e tra questi l'ultimo)
+
+    Returns:
+        pandas.DataFrame: colonne dbms, scale, query, mode, execution_time_ms
+    """
+    if os.path.isdir(os.path.join(path, DEFAULT_STORE_DIR)):
+        path = os.path.join(path, DEFAULT_STORE_DIR)
+    if _is_store(path):
+        return load_run_times(path, run_id, git_revision)
+    if run_id is not None or git_revision is not None:
+        raise ValueError(f"{path} non è uno store: run_id e git_revision non applicabili")
+
+    frames = []
+    for dimensions, rows in iter_csv_results(path):
+        steady = [row for row in rows if row.get('warmup', '0') in ('0', '', None)]
+        frames.append(pd.DataFrame({
+            **{key: dimensions[key] for key in CELL_KEYS},
+            'execution_time_ms': pd.to_numeric([row['execution_time_ms'] for row in steady]),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=CELL_KEYS + ['execution_time_ms'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Store colonnare dei risultati del benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="importa i CSV cold/warm esistenti")
+    import_parser.add_argument("base_dir", help="cartella con le sottocartelle di scala (es. '.')")
+    import_parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="cartella dello store")
+    summary_parser = subparsers.add_parser("summary", help="righe per run, DBMS, scala e modalità")
+    summary_parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="cartella dello store")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "import":
+        import_csv_results(args.base_dir, args.store)
+    elif args.command == "summary":
+        df = load_results(args.store, columns=['run_id', 'git_revision', 'dbms', 'scale', 'mode'],
+                          include_warmup=True)
+        print(df.groupby(['run_id', 'git_revision', 'dbms', 'scale', 'mode'], dropna=False).size().to_string())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import math
+
+import numpy as np
+from scipy import stats
+
+
+# Extrapolation targets, as multiples of the largest measured dataset size
+EXTRAPOLATION_FACTORS = (2, 5, 10)
+
+# Candidate models: name -> (transform of the size, fitted in log space)
+MODELS = {
+    "power": (np.log, True),
+    "linear": (lambda n: n, False),
+    "nlogn": (lambda n: n * np.log(n), False),
+}
+
+
+def _fit_line(x, count, mean, std):
+    """
+    Ordinary least squares y = a + b*x over all samples, from per-size sufficient
+    statistics (x is constant within a size, so the fit equals the one on raw samples,
+    and the one on size means weighted by their sample counts).
+
+    SSE = within-size scatter + size-mean residuals; it feeds the likelihood. The
+    variances used for intervals come from the size-mean residuals, with sizes - 2
+    degrees of freedom: samples of one size share the same dataset and run, so they
+    are not independent evidence about the trend across sizes.
+
+    - s2: residual variance per unit weight (count-weighted mean residuals), for the
+      uncertainty of the fitted line
+    - s2_sizes: variance of a size mean around the line (unweighted mean residuals)
+    - s2_within: pooled within-size variance of a single execution
+    """
+    total = count.sum()
+    x_bar = (count * x).sum() / total
+    y_bar = (count * mean).sum() / total
+    sxx = (count * (x - x_bar) ** 2).sum()
+    slope = (count * (x - x_bar) * (mean - y_bar)).sum() / sxx
+    intercept = y_bar - slope * x_bar
+    within = ((count - 1) * np.nan_to_num(std) ** 2).sum()
+    residuals = mean - intercept - slope * x
+    between = (count * residuals ** 2).sum()
+    dof = len(x) - 2
+    return {
+        "intercept": intercept, "slope": slope, "sse": within + between, "n": total, "dof": dof,
+        "x_bar": x_bar, "sxx": sxx, "s2": between / dof if dof > 0 else np.nan,
+        "s2_sizes": (residuals ** 2).sum() / dof if dof > 0 else np.nan,
+        "s2_within": within / (total - len(x)) if total > len(x) else 0.0,
+    }
+
+
+def _log_likelihood(line):
+    """Gaussian log-likelihood at the MLE of the residual variance."""
+    n, sse = line["n"], max(line["sse"], 1e-300)
+    return -n / 2 * (math.log(2 * math.pi * sse / n) + 1)
+
+
+def _interval(line, x0, confidence, prediction):
+    """
+    Confidence (mean) or prediction (new observation) interval at x0. A new execution
+    adds to the uncertainty of the line the deviation of its size from the trend and
+    the scatter within the size.
+    """
+    t_crit = stats.t.ppf((1 + confidence) / 2, line["dof"])
+    leverage = 1 / line["n"] + (x0 - line["x_bar"]) ** 2 / line["sxx"]
+    variance = line["s2"] * leverage
+    if prediction:
+        variance += line["s2_sizes"] + line["s2_within"]
+    half_width = t_crit * math.sqrt(variance)
+    center = line["intercept"] + line["slope"] * x0
+    return center, center - half_width, center + half_width
+
+
+def fit_scaling(sizes, cells, confidence=0.95, factors=EXTRAPOLATION_FACTORS):
+    """
+    Fits latency against dataset size for one (dbms, query) and ranks the models by AIC.
+
+    - power: log t = log a + k log n. The exponent k comes with a t-based CI.
+    - linear: t = a + b n
+    - nlogn: t = a + b n log n
+
+    The power law is fitted in log space. Its AIC is moved to the latency scale with
+    the Jacobian of the log transform (log-likelihood minus the sum of log t), so all
+    three AICs refer to the same data. Predictions at `factors` times the largest
+    size come with prediction intervals for a single execution. For the power law
+    the point prediction is the back-transformed (geometric mean) latency.
+
+    The exponent CI and the prediction intervals use the scatter of the size means
+    around the fitted line, with a t quantile on sizes - 2 degrees of freedom: with
+    three or four sizes they are wide, as the data warrant.
+
+    Args:
+        sizes (list): dataset sizes (e.g. [25, 50, 75, 100])
+        cells (list): per size, dict with n, mean, std, log_mean, log_std (see plot_stats)
+            or None when the size is missing
+        confidence (float): level of the exponent CI and of the prediction intervals
+        factors (tuple): extrapolation multiples of the largest size
+
+    Returns:
+        list: one dict per model, sorted by AIC (empty if fewer than 3 sizes or 4 samples)
+    """
+    present = [(size, cell) for size, cell in zip(sizes, cells) if cell and cell["n"] > 0]
+    if len(present) < 3:
+        return []
+    size = np.array([float(s) for s, _ in present])
+    count = np.array([c["n"] for _, c in present], dtype=float)
+    if count.sum() < 4:
+        return []
+    # Jacobian term: sum of log t over all samples
+    log_sum = sum(c["n"] * c["log_mean"] for _, c in present)
+    targets = [size.max() * factor for factor in factors]
+
+    fits = []
+    for name, (transform, log_space) in MODELS.items():
+        if log_space:
+            mean = np.array([c["log_mean"] for _, c in present])
+            std = np.array([c["log_std"] if c["log_std"] is not None else np.nan for _, c in present])
+        else:
+            mean = np.array([c["mean"] for _, c in present])
+            std = np.array([c["std"] if c["std"] is not None else np.nan for _, c in present])
+        line = _fit_line(transform(size), count, mean, std)
+        log_likelihood = _log_likelihood(line) - (log_sum if log_space else 0.0)
+        fit = {
+            "model": name,
+            "aic": 2 * 3 - 2 * log_likelihood,   # intercept, slope, residual variance
+            "intercept": float(line["intercept"]),
+            "slope": float(line["slope"]),
+            "samples": int(line["n"]),
+            "sizes": len(present),
+        }
+        if log_space:
+            t_crit = stats.t.ppf((1 + confidence) / 2, line["dof"])
+            se_slope = math.sqrt(line["s2"] / line["sxx"])
+            fit["exponent"] = float(line["slope"])
+            fit["exponent_ci_low"] = float(line["slope"] - t_crit * se_slope)
+            fit["exponent_ci_high"] = float(line["slope"] + t_crit * se_slope)
+        predictions = []
+        for target in list(size) + targets:
+            center, low, high = _interval(line, float(transform(np.array(target))), confidence, prediction=True)
+            if log_space:
+                center, low, high = math.exp(center), math.exp(low), math.exp(high)
+            predictions.append({"size": float(target), "predicted_ms": center, "pi_low_ms": low, "pi_high_ms": high})
+        fit["predictions"] = predictions
+        fits.append(fit)
+
+    fits.sort(key=lambda fit: fit["aic"])
+    best_aic = fits[0]["aic"]
+    weights = [math.exp(-(fit["aic"] - best_aic) / 2) for fit in fits]
+    for rank, (fit, weight) in enumerate(zip(fits, weights), start=1):
+        fit["rank"] = rank
+        fit["delta_aic"] = fit["aic"] - best_aic
+        fit["akaike_weight"] = weight / sum(weights)
+    return fits
+
+
+def fits_to_rows(fits, **dimensions):
+    """Flattens fit_scaling() output into CSV rows (one per model and predicted size)."""
+    rows = []
+    for fit in fits:
+        base = {key: value for key, value in fit.items() if key != "predictions"}
+        for prediction in fit["predictions"]:
+            rows.append({**dimensions, **base, **prediction})
+    return rows
@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Eventi registrati (None = tracing disattivato, gli span non costano quasi nulla)
+_events = None
+_lock = threading.Lock()
+
+
+def enable_tracing():
+    """Attiva la registrazione degli span (azzera eventuali eventi precedenti)"""
+    global _events
+    with _lock:
+        _events = []
+
+
+def disable_tracing():
+    """Disattiva la registrazione degli span e scarta gli eventi"""
+    global _events
+    with _lock:
+        _events = None
+
+
+def is_tracing_enabled():
+    return _events is not None
+
+
+@contextmanager
+def span(name, category="benchmark", **args):
+    """
+    Misura una fase come evento "complete" (ph = "X") del formato Chrome trace-event.
+
+    Il contesto restituisce il dict degli argomenti dello span, che può essere
+    arricchito durante la fase (es. numero di righe lette):
+
+        with span("fetch", "neo4j") as span_args:
+            ...
+            span_args["rows"] = len(records)
+
+    Args:
+        name (str): nome della fase (es. 'execute', 'fetch')
+        category (str): categoria, tipicamente il DBMS o 'runner'
+        **args: argomenti da allegare all'evento
+    """
+    if _events is None:
+        yield args
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield args
+    finally:
+        end_ns = time.perf_counter_ns()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_ns / 1000,  # microsecondi
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        }
+        with _lock:
+            if _events is not None:
+                _events.append(event)
+
+
+def export_chrome_trace(path):
+    """
+    Salva gli span registrati in formato Chrome trace-event JSON
+    (apribile con chrome://tracing o https://ui.perfetto.dev).
+
+    Args:
+        path (str): file di output
+
+    Returns:
+        int: numero di eventi esportati
+    """
+    with _lock:
+        events = list(_events or [])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+    print(f"[TRACE] Salvati {len(events)} span in {path}")
+    return len(events)